@@ -0,0 +1,124 @@
+import random
+
+# Relative weights of binary operators in generated expressions
+DEFAULT_OPERATORS = {'+': 4, '-': 4, '*': 3, '/': 2, '//': 1, '%': 1, '**': 1}
+# Operators that may join any two subexpressions, the others only join integer literals
+_COMPOSABLE = ('+', '-', '*', '/')
+
+
+class CorpusSpec:
+    """
+    Parameters of a generated corpus of expressions
+
+    Parameters:
+        count (int): number of expressions
+        length (int): number of operands in an expression
+        depth (int): maximum nesting depth of brackets
+        operators (dict[str, int]): relative weights of binary operators
+        float_ratio (float): share of float literals
+        bigint_ratio (float): share of operands replaced with 'big ** power' chains
+        error_rate (float): share of expressions with an injected error
+        seed (int): seed of the random generator
+
+    """
+    def __init__(self, count: int = 1000, length: int = 8, depth: int = 3,
+                 operators: dict[str, int] | None = None, float_ratio: float = 0.2,
+                 bigint_ratio: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.count = count
+        self.length = length
+        self.depth = depth
+        self.operators = operators or DEFAULT_OPERATORS
+        self.float_ratio = float_ratio
+        self.bigint_ratio = bigint_ratio
+        self.error_rate = error_rate
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+PRESETS = {
+    'short': CorpusSpec(count=2000, length=4, depth=1),
+    'long': CorpusSpec(count=200, length=200, depth=4),
+    'nested': CorpusSpec(count=500, length=16, depth=12),
+    'bigint': CorpusSpec(count=200, length=6, depth=2, operators={'*': 3, '+': 1, '-': 1},
+                         float_ratio=0.0, bigint_ratio=0.5),
+    'float': CorpusSpec(count=1000, length=12, depth=3, operators={'+': 2, '-': 2, '*': 2, '/': 2},
+                        float_ratio=0.9),
+    'errors': CorpusSpec(count=1000, length=8, depth=3, error_rate=0.5),
+}
+
+
+def _literal(generator: random.Random, spec: CorpusSpec) -> str:
+    if generator.random() < spec.bigint_ratio:
+        return f'{generator.randint(10 ** 8, 10 ** 9 - 1)} ** {generator.randint(500, 999)}'
+
+    special = {op: weight for op, weight in spec.operators.items() if op not in _COMPOSABLE}
+    if special and generator.random() < sum(special.values()) / sum(spec.operators.values()):
+        # Integer-only operators and powers get small integer operands, so valid expressions stay valid
+        operator = generator.choices(list(special), list(special.values()))[0]
+        if operator == '**':
+            return f'{generator.randint(1, 9)} ** {generator.randint(0, 5)}'
+        return f'({generator.randint(1, 99999)} {operator} {generator.randint(1, 999)})'
+
+    if generator.random() < spec.float_ratio:
+        return f'{generator.uniform(0, 1000):.3f}'
+    return str(generator.randint(1, 99999))
+
+
+def _expression(generator: random.Random, spec: CorpusSpec, operands: int, depth: int) -> str:
+    if operands <= 1:
+        return _literal(generator, spec)
+
+    composable = {op: weight for op, weight in spec.operators.items() if op in _COMPOSABLE} or {'+': 1}
+    operator = generator.choices(list(composable), list(composable.values()))[0]
+
+    nested = depth < spec.depth and generator.random() < 0.5
+    child_depth = depth + 1 if nested else depth
+    left_operands = generator.randint(1, operands - 1)
+    left = _expression(generator, spec, left_operands, child_depth)
+    right = _expression(generator, spec, operands - left_operands, child_depth)
+
+    if nested:
+        return f'({left} {operator} {right})'
+    return f'{left} {operator} {right}'
+
+
+def _inject_error(generator: random.Random, expression: str) -> str:
+    kind = generator.randrange(4)
+    position = generator.randrange(len(expression) + 1)
+    if kind == 0:
+        return expression[:position] + '&' + expression[position:]
+    if kind == 1:
+        return '(' + expression
+    if kind == 2:
+        return expression + ' / 0'
+    return expression + ' +'
+
+
+def generate_corpus(spec: CorpusSpec) -> list[str]:
+    """
+    Generates expressions described by a spec. The same spec always gives the same corpus.
+
+    Parameters:
+        spec (CorpusSpec): parameters of the corpus.
+
+    Returns:
+        list[str]: raw infix expressions.
+    """
+
+    generator = random.Random(spec.seed)
+    corpus = []
+    for _ in range(spec.count):
+        expression = _nest(generator, spec, _expression(generator, spec, spec.length, 0))
+        if generator.random() < spec.error_rate:
+            expression = _inject_error(generator, expression)
+        corpus.append(expression)
+    return corpus
+
+
+def _nest(generator: random.Random, spec: CorpusSpec, expression: str) -> str:
+    levels = generator.randint(0, spec.depth)
+    for _ in range(levels):
+        expression = f'({expression} + {generator.randint(1, 9)})'
+    return expression
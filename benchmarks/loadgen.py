@@ -0,0 +1,136 @@
+"""
+Load generator for the calculator server (src/server.py).
+
+    python -m benchmarks.loadgen --preset short --connections 8 --pipeline 64
+    python -m benchmarks.loadgen --port 8765 --count 100000
+
+Without --port a server is started in the same process on a free localhost port.
+"""
+from . import corpus as corpus_module
+from .pipeline import percentile
+
+from calculator_functions.calculator import Calculator
+from server import start_server
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Any
+import argparse
+import asyncio
+import sys
+import time
+
+
+async def _connection(host: str, port: int, expressions: list[str], pipeline: int,
+                      latencies: list[int]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    clock = time.perf_counter_ns
+    sent: deque[int] = deque()
+    window = asyncio.Semaphore(pipeline)
+    errors = 0
+
+    async def send() -> None:
+        for expression in expressions:
+            await window.acquire()
+            sent.append(clock())
+            writer.write((expression + '\n').encode())
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in expressions:
+        line = await reader.readline()
+        latencies.append(clock() - sent.popleft())
+        window.release()
+        if b' error: ' in line:
+            errors += 1
+    await sender
+
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+
+async def run_load(host: str, port: int, expressions: list[str], connections: int = 4,
+                   pipeline: int = 64) -> dict[str, Any]:
+    """
+    Sends expressions over several connections, keeping up to `pipeline` requests
+    of every connection in flight, and measures the responses.
+
+    Parameters:
+        host (str): address of the server.
+        port (int): port of the server.
+        expressions (list[str]): expressions, split evenly between connections.
+        connections (int): number of concurrent connections.
+        pipeline (int): maximum number of unanswered requests per connection.
+
+    Returns:
+        dict: count, errors, elapsed seconds, throughput per second and
+        latency percentiles in nanoseconds.
+    """
+
+    latencies: list[int] = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _connection(host, port, expressions[i::connections], pipeline, latencies) for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'errors': sum(errors),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ns': {
+            'p50': percentile(latencies, 0.50),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0,
+        },
+    }
+
+
+async def run_local(expressions: list[str], connections: int = 4, pipeline: int = 64,
+                    calculator: Calculator | None = None) -> dict[str, Any]:
+    """
+    Starts a server on a free localhost port and runs the load against it.
+    """
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        server = await start_server(calculator or Calculator(cache_size=4096), executor)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            return await run_load('127.0.0.1', port, expressions, connections, pipeline)
+
+
+def format_load(report: dict[str, Any]) -> str:
+    latency = report['latency_ns']
+    return (f"{report['count']} requests ({report['errors']} errors) in {report['elapsed_s']:.2f} s, "
+            f"{report['throughput_per_s']:.0f} req/s, p50 {latency['p50'] / 1e3:.1f} us, "
+            f"p99 {latency['p99'] / 1e3:.1f} us, max {latency['max'] / 1e3:.1f} us")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Load generator for the calculator server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='port of a running server, otherwise one is started locally')
+    parser.add_argument('--preset', default='short', choices=list(corpus_module.PRESETS))
+    parser.add_argument('--count', type=int, help='number of expressions')
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--pipeline', type=int, default=64, help='unanswered requests per connection')
+    args = parser.parse_args(argv)
+
+    spec = corpus_module.PRESETS[args.preset]
+    if args.count is not None:
+        spec = corpus_module.CorpusSpec(**{**spec.to_dict(), 'count': args.count})
+    expressions = corpus_module.generate_corpus(spec)
+
+    if args.port is None:
+        report = asyncio.run(run_local(expressions, args.connections, args.pipeline))
+    else:
+        report = asyncio.run(run_load(args.host, args.port, expressions, args.connections, args.pipeline))
+    print(format_load(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Benchmarks of the calculator pipeline stage by stage.
+
+    python -m benchmarks.pipeline run --output baseline.json
+    python -m benchmarks.pipeline run --baseline baseline.json --output current.json
+    python -m benchmarks.pipeline compare baseline.json current.json
+"""
+from . import corpus as corpus_module
+
+from calculator_functions.backends import BACKENDS, get_backend
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.evaluator import EvaluatorRPN
+from calculator_functions.shunting_yard import ShunringYardAlgorithm
+from calculator_functions.tokenizer import Tokenizer
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+STAGES = ('tokenize', 'shunting_yard', 'evaluate', 'calculate')
+
+
+def percentile(sorted_values: list[int], fraction: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure(func: Callable[[Any], Any], items: list[Any], repeat: int = 3) -> dict[str, Any]:
+    """
+    Times a function over every item and measures the peak memory of one pass.
+
+    Parameters:
+        func (Callable): stage to measure, ParsingError, ValueError and ArithmeticError count as errors.
+        items (list): inputs of the stage.
+        repeat (int): number of timed passes, every latency is kept.
+
+    Returns:
+        dict: count, errors, throughput per second, latency percentiles in
+        nanoseconds and peak memory in bytes.
+    """
+
+    latencies = []
+    errors = 0
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        errors = 0
+        for item in items:
+            start = clock()
+            try:
+                func(item)
+            except (ParsingError, ValueError, ArithmeticError):
+                errors += 1
+            latencies.append(clock() - start)
+
+    tracemalloc.start()
+    for item in items:
+        try:
+            func(item)
+        except (ParsingError, ValueError, ArithmeticError):
+            pass
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies) / repeat
+    return {
+        'count': len(items),
+        'errors': errors,
+        'throughput_per_s': len(items) / (total / 1e9) if total else 0.0,
+        'latency_ns': {
+            'p50': percentile(latencies, 0.50),
+            'p90': percentile(latencies, 0.90),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0,
+        },
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _try(func: Callable[[Any], Any], items: Iterable[Any]) -> list[Any]:
+    results = []
+    for item in items:
+        try:
+            results.append(func(item))
+        except (ParsingError, ValueError, ArithmeticError):
+            pass
+    return results
+
+
+def benchmark_corpus(expressions: list[str], repeat: int = 3, calculator: Calculator | None = None,
+                     backend: str = 'native') -> dict[str, dict[str, Any]]:
+    """
+    Benchmarks every stage on a corpus. Each stage gets the successful outputs
+    of the previous one, so its numbers are not mixed with earlier failures.
+
+    Parameters:
+        expressions (list[str]): raw infix expressions.
+        repeat (int): number of timed passes.
+        calculator (Calculator | None): calculator for the end-to-end stage.
+        backend (str): numeric backend of the stages and the default calculator.
+
+    Returns:
+        dict[str, dict]: measurements per stage.
+    """
+
+    numeric_backend = get_backend(backend)
+    tokenizer = Tokenizer(numeric_backend.max_length, numeric_backend.convert, numeric_backend.registry)
+    shunting_yard = ShunringYardAlgorithm(numeric_backend.registry)
+    evaluator = EvaluatorRPN(backend=numeric_backend)
+    calculator = calculator or Calculator(backend=backend)
+
+    tokens = [t for t in _try(tokenizer.parse_tokens, expressions) if t]
+    rpn = _try(shunting_yard.shunting_yard, tokens)
+
+    return {
+        'tokenize': measure(tokenizer.parse_tokens, expressions, repeat),
+        'shunting_yard': measure(shunting_yard.shunting_yard, tokens, repeat),
+        'evaluate': measure(evaluator.evaluate_of_rpn, rpn, repeat),
+        'calculate': measure(calculator.calculate, expressions, repeat),
+    }
+
+
+def run(presets: list[str], count: int | None = None, repeat: int = 3,
+        calculator: Calculator | None = None, backend: str = 'native') -> dict[str, Any]:
+    """
+    Generates the corpora of the given presets and benchmarks them.
+
+    Parameters:
+        presets (list[str]): names from corpus.PRESETS.
+        count (int | None): overrides the number of expressions of every preset.
+        repeat (int): number of timed passes.
+        calculator (Calculator | None): calculator for the end-to-end stage.
+        backend (str): numeric backend, see benchmark_corpus.
+
+    Returns:
+        dict: report with metadata and measurements per corpus.
+    """
+
+    report: dict[str, Any] = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'backend': backend,
+        },
+        'corpora': {},
+    }
+    for name in presets:
+        spec = corpus_module.PRESETS[name]
+        if count is not None:
+            spec = corpus_module.CorpusSpec(**{**spec.to_dict(), 'count': count})
+        expressions = corpus_module.generate_corpus(spec)
+        report['corpora'][name] = {
+            'spec': spec.to_dict(),
+            'stages': benchmark_corpus(expressions, repeat, calculator, backend),
+        }
+    return report
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.10) -> list[str]:
+    """
+    Finds stages that got slower or use more memory than in the baseline.
+
+    Parameters:
+        baseline (dict): earlier report.
+        current (dict): new report.
+        threshold (float): allowed relative change, 0.10 means 10%.
+
+    Returns:
+        list[str]: descriptions of regressions, empty if there are none.
+    """
+
+    regressions = []
+    for name, corpus in current['corpora'].items():
+        base_corpus = baseline['corpora'].get(name)
+        if base_corpus is None:
+            continue
+        for stage, now in corpus['stages'].items():
+            before = base_corpus['stages'].get(stage)
+            if before is None:
+                continue
+            checks = (
+                ('p50 latency', before['latency_ns']['p50'], now['latency_ns']['p50'], True),
+                ('p99 latency', before['latency_ns']['p99'], now['latency_ns']['p99'], True),
+                ('throughput', before['throughput_per_s'], now['throughput_per_s'], False),
+                ('peak memory', before['peak_memory_bytes'], now['peak_memory_bytes'], True),
+            )
+            for metric, old, new, higher_is_worse in checks:
+                if not old:
+                    continue
+                change = (new - old) / old
+                if (higher_is_worse and change > threshold) or (not higher_is_worse and -change > threshold):
+                    regressions.append(f'{name}/{stage}: {metric} {old:.0f} -> {new:.0f} ({change:+.1%})')
+    return regressions
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [f"{'corpus':<8} {'stage':<14} {'items/s':>12} {'p50 us':>10} {'p90 us':>10} "
+             f"{'p99 us':>10} {'peak KiB':>10} {'errors':>7}"]
+    for name, corpus in report['corpora'].items():
+        for stage, m in corpus['stages'].items():
+            latency = m['latency_ns']
+            lines.append(f"{name:<8} {stage:<14} {m['throughput_per_s']:>12.0f} {latency['p50'] / 1e3:>10.1f} "
+                         f"{latency['p90'] / 1e3:>10.1f} {latency['p99'] / 1e3:>10.1f} "
+                         f"{m['peak_memory_bytes'] / 1024:>10.1f} {m['errors']:>7}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of the calculator pipeline')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='benchmark generated corpora')
+    run_parser.add_argument('--preset', nargs='+', default=list(corpus_module.PRESETS),
+                            choices=list(corpus_module.PRESETS))
+    run_parser.add_argument('--count', type=int, help='number of expressions per corpus')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--backend', default='native', choices=BACKENDS)
+    run_parser.add_argument('--output', help='save the report as JSON')
+    run_parser.add_argument('--baseline', help='compare with a saved report')
+    run_parser.add_argument('--threshold', type=float, default=0.10)
+
+    compare_parser = commands.add_parser('compare', help='compare two saved reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run(args.preset, args.count, args.repeat, backend=args.backend)
+        print(format_report(report))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    else:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(args.current, encoding='utf-8') as file:
+            report = json.load(file)
+
+    regressions = compare(baseline, report, args.threshold)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if not regressions:
+        print('No regressions')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
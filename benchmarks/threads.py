@@ -0,0 +1,217 @@
+"""
+Throughput of one Calculator shared by 1..N threads, compared with a process pool.
+
+    python -m benchmarks.threads --preset short --threads 1 2 4 8
+    python -m benchmarks.threads --preset bigint --cache-size 0 --output threads.json
+
+On a standard build the GIL lets one thread calculate at a time; the report says which build
+ran it, so runs on a free-threaded build (python3.13t and later) can be told apart.
+"""
+from . import corpus as corpus_module
+
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+
+from datetime import datetime, timezone
+from typing import Any
+import argparse
+import json
+import os
+import platform
+import sys
+import sysconfig
+import threading
+import time
+
+
+def gil_enabled() -> bool:
+    # sys._is_gil_enabled exists since 3.13; older versions always have the GIL
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def free_threaded_build() -> bool:
+    return bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+
+
+def _key(result: Any) -> tuple:
+    if isinstance(result, ParsingError):
+        return type(result), str(result)
+    return type(result), result
+
+
+def measure_threads(calculator: Calculator, expressions: list[str], threads: int,
+                    rounds: int = 1) -> dict[str, Any]:
+    """
+    Calculates expressions with threads sharing one calculator, every thread
+    taking every threads-th expression, and times all threads together.
+
+    Parameters:
+        calculator (Calculator): the shared calculator.
+        expressions (list[str]): raw infix expressions.
+        threads (int): number of threads.
+        rounds (int): passes of every thread over its expressions.
+
+    Returns:
+        dict: threads, count, elapsed seconds, throughput per second and
+        the results of the last round in input order.
+    """
+
+    slices = [expressions[i::threads] for i in range(threads)]
+    outputs: list[list[Any]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def work(index: int) -> None:
+        calculate = calculator.calculate_or_error
+        barrier.wait()
+        for _ in range(rounds):
+            outputs[index] = [calculate(expression) for expression in slices[index]]
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    results: list[Any] = [None] * len(expressions)
+    for i, output in enumerate(outputs):
+        results[i::threads] = output
+    count = len(expressions) * rounds
+    return {
+        'threads': threads,
+        'count': count,
+        'elapsed_s': elapsed,
+        'throughput_per_s': count / elapsed if elapsed else 0.0,
+        'results': results,
+    }
+
+
+def measure_processes(calculator: Calculator, expressions: list[str], workers: int,
+                      rounds: int = 1) -> dict[str, Any]:
+    """
+    Calculates expressions with a started pool from calculator.create_pool.
+    Starting the processes is not timed.
+    """
+
+    with calculator.create_pool(workers) as executor:
+        calculator.calculate_many(['0'] * workers, executor=executor, chunksize=1)
+        chunksize = max(1, len(expressions) // (workers * 4))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            calculator.calculate_many(expressions, executor=executor, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+
+    count = len(expressions) * rounds
+    return {
+        'processes': workers,
+        'count': count,
+        'elapsed_s': elapsed,
+        'throughput_per_s': count / elapsed if elapsed else 0.0,
+    }
+
+
+def run(preset: str = 'short', count: int | None = None, threads: list[int] | None = None,
+        rounds: int = 3, cache_size: int | None = 4096, processes: bool = True) -> dict[str, Any]:
+    """
+    Measures the scaling of one shared calculator over thread counts and,
+    for comparison, of process pools of the same sizes.
+
+    Parameters:
+        preset (str): name from corpus.PRESETS.
+        count (int | None): overrides the number of expressions of the preset.
+        threads (list[int] | None): thread counts, defaults to 1, 2, 4 and 8.
+        rounds (int): passes over the corpus per measurement.
+        cache_size (int | None): RPN cache of the shared calculator, None to disable.
+        processes (bool): also measure process pools.
+
+    Returns:
+        dict: report with the build (GIL enabled or free-threaded) and a row per
+        thread count: throughput, speedup over one thread and the number of results
+        that differ from a single-threaded calculation.
+    """
+
+    spec = corpus_module.PRESETS[preset]
+    if count is not None:
+        spec = corpus_module.CorpusSpec(**{**spec.to_dict(), 'count': count})
+    expressions = corpus_module.generate_corpus(spec)
+    expected = [_key(result) for result in Calculator().calculate_many(expressions, workers=1)]
+
+    report: dict[str, Any] = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'gil_enabled': gil_enabled(),
+            'free_threaded_build': free_threaded_build(),
+            'preset': preset,
+            'count': len(expressions),
+            'rounds': rounds,
+            'cache_size': cache_size,
+        },
+        'threads': [],
+        'processes': [],
+    }
+
+    calculator = Calculator(cache_size=cache_size)
+    # Fills the cache, so every thread count measures the same warm calculator
+    calculator.calculate_many(expressions, workers=1)
+    base = None
+    for n in threads or [1, 2, 4, 8]:
+        row = measure_threads(calculator, expressions, n, rounds)
+        results = row.pop('results')
+        row['mismatches'] = sum(_key(result) != key for result, key in zip(results, expected))
+        base = base or row['throughput_per_s']
+        row['speedup'] = row['throughput_per_s'] / base if base else 0.0
+        report['threads'].append(row)
+
+        if processes and n > 1:
+            process_row = measure_processes(calculator, expressions, n, rounds)
+            process_row['speedup'] = process_row['throughput_per_s'] / base if base else 0.0
+            report['processes'].append(process_row)
+    return report
+
+
+def format_report(report: dict[str, Any]) -> str:
+    meta = report['meta']
+    build = 'free-threaded' if meta['free_threaded_build'] else 'standard'
+    lines = [f"{meta['implementation']} {meta['python'].split()[0]}, {build} build, "
+             f"GIL {'enabled' if meta['gil_enabled'] else 'disabled'}, {meta['cpus']} CPUs, "
+             f"{meta['preset']} x {meta['count']}",
+             f"{'mode':<10} {'workers':>7} {'items/s':>10} {'speedup':>8} {'mismatches':>10}"]
+    for row in report['threads']:
+        lines.append(f"{'threads':<10} {row['threads']:>7} {row['throughput_per_s']:>10.0f} "
+                     f"{row['speedup']:>8.2f} {row['mismatches']:>10}")
+    for row in report['processes']:
+        lines.append(f"{'processes':<10} {row['processes']:>7} {row['throughput_per_s']:>10.0f} "
+                     f"{row['speedup']:>8.2f} {'':>10}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Thread scaling of a shared calculator')
+    parser.add_argument('--preset', default='short', choices=list(corpus_module.PRESETS))
+    parser.add_argument('--count', type=int, help='number of expressions')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--cache-size', type=int, default=4096, help='size of the RPN cache, 0 to disable')
+    parser.add_argument('--no-processes', action='store_true', help='do not measure process pools')
+    parser.add_argument('--output', help='save the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.preset, args.count, args.threads, args.rounds, args.cache_size or None,
+                 not args.no_processes)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    # A result that differs from the single-threaded one means the calculator is not thread-safe
+    return 1 if any(row['mismatches'] for row in report['threads']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
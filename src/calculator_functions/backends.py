@@ -0,0 +1,94 @@
+from .operators import (BINARY_OPERATORS, UNARY_OPERATORS, FUNCTIONS, FRACTION_BINARY_OPERATORS,
+                        FRACTION_UNARY_OPERATORS, FRACTION_FUNCTIONS, MAX_LENGTH_OF_NUMBER, decimal_operators)
+from .registry import OperatorRegistry, DEFAULT_REGISTRY
+
+from decimal import Context, Decimal
+from fractions import Fraction
+from typing import Any, Callable
+
+BACKENDS = ('native', 'fraction', 'decimal')
+# Literals of the exact backends may be longer, their operations do not lose precision
+MAX_LENGTH_OF_EXACT_NUMBER = 100
+
+
+class NumericBackend:
+    """
+    The number type of a calculation: how literals are converted,
+    which operator functions are applied and how long a literal may be.
+    `operations` is the dispatch table of the registry: function and arity by opcode
+
+    Parameters:
+        name (str): 'native', 'fraction' or 'decimal'
+        convert (Callable[[str], Any] | None): converts a literal, None for int/float
+        binary_operators (dict): table in the format of BINARY_OPERATORS
+        unary_operators (dict): table in the format of UNARY_OPERATORS
+        max_length (int): maximum number of characters of a literal
+        context (Context | None): decimal context of the 'decimal' backend
+        functions (dict | None): table in the format of FUNCTIONS
+        registry (OperatorRegistry | None): opcodes of operators and functions
+
+    """
+    def __init__(self, name: str, convert: Callable[[str], Any] | None, binary_operators: dict,
+                 unary_operators: dict, max_length: int, context: Context | None = None,
+                 functions: dict | None = None, registry: OperatorRegistry | None = None):
+        self.name = name
+        self.convert = convert
+        self.binary_operators = binary_operators
+        self.unary_operators = unary_operators
+        self.max_length = max_length
+        self.context = context
+        self.functions = functions if functions is not None else FUNCTIONS
+        self.registry = registry or DEFAULT_REGISTRY
+        self.operations = self.registry.operations(binary_operators, unary_operators, self.functions)
+
+
+def get_backend(name: str = 'native', context: Context | None = None, max_length: int | None = None,
+                functions: dict[str, tuple[Callable, int]] | None = None) -> NumericBackend:
+    """
+    Creates a numeric backend by name.
+
+    Parameters:
+        name (str): 'native' (int and float), 'fraction' (exact rationals)
+            or 'decimal' (decimal floating point rounded with a context).
+        context (Context | None): decimal context, defaults to 28 significant digits.
+        max_length (int | None): maximum number of characters of a literal, defaults
+            to MAX_LENGTH_OF_NUMBER for 'native' and MAX_LENGTH_OF_EXACT_NUMBER otherwise.
+        functions (dict[str, tuple[Callable, int]] | None): user-defined functions,
+            name -> (function, number of arguments), see OperatorRegistry.register_function.
+
+    Returns:
+        NumericBackend: backend for Tokenizer, EvaluatorRPN and Calculator.
+
+    Exceptions:
+        ValueError:
+            - Unknown backend
+            - A context for a backend other than 'decimal'
+            - An invalid function
+    """
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'")
+    if context is not None and name != 'decimal':
+        raise ValueError("A decimal context requires the 'decimal' backend")
+
+    registry = DEFAULT_REGISTRY
+    if functions:
+        registry = DEFAULT_REGISTRY.copy()
+        for function_name, (func, arity) in functions.items():
+            registry.register_function(function_name, func, arity)
+
+    if name == 'native':
+        return NumericBackend(name, None, BINARY_OPERATORS, UNARY_OPERATORS,
+                              max_length or MAX_LENGTH_OF_NUMBER, functions=FUNCTIONS, registry=registry)
+    if name == 'fraction':
+        return NumericBackend(name, Fraction, FRACTION_BINARY_OPERATORS, FRACTION_UNARY_OPERATORS,
+                              max_length or MAX_LENGTH_OF_EXACT_NUMBER, functions=FRACTION_FUNCTIONS,
+                              registry=registry)
+
+    context = context if context is not None else Context()
+    binary_operators, unary_operators, decimal_functions = decimal_operators(context)
+    return NumericBackend(name, Decimal, binary_operators, unary_operators,
+                          max_length or MAX_LENGTH_OF_EXACT_NUMBER, context, decimal_functions, registry)
+
+
+NATIVE_BACKEND = get_backend()
@@ -0,0 +1,123 @@
+from .tokenizer import Token
+from .errors import BudgetExceededError
+from .operators import MAX_POWER
+
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any
+import math
+import time
+
+_LOG2_10 = math.log2(10)
+
+
+class EvaluationBudget:
+    """
+    Limits of one evaluation, so a hostile expression can not pin a core
+
+    Parameters:
+        max_bits (int | None): maximum bit length of an exact result of '*' or '**'
+            (an integer, the numerator and denominator of a fraction or the integer
+            part of a decimal), estimated from the operands before the operation is computed
+        max_operations (int | None): maximum number of operators evaluated
+        time_limit (float | None): wall-clock seconds for one evaluation, checked
+            before every operation
+
+    """
+    def __init__(self, max_bits: int | None = None, max_operations: int | None = None,
+                 time_limit: float | None = None):
+        self.max_bits = max_bits
+        self.max_operations = max_operations
+        self.time_limit = time_limit
+
+    def deadline(self) -> float | None:
+        """
+        Returns the moment (time.monotonic) an evaluation started now must end by.
+        """
+
+        if self.time_limit is None:
+            return None
+        return time.monotonic() + self.time_limit
+
+    def check(self, token: Token, operands: tuple, operations: int, deadline: float | None) -> None:
+        """
+        Checks the limits before an operation is computed.
+
+        Parameters:
+            token (Token): operator token.
+            operands (tuple): operands of the operator.
+            operations (int): number of operators evaluated, including this one.
+            deadline (float | None): result of deadline() for this evaluation.
+
+        Exceptions:
+            BudgetExceededError:
+                - Too many operations
+                - Time limit exceeded
+                - Result too large
+        """
+
+        if self.max_operations is not None and operations > self.max_operations:
+            raise BudgetExceededError(f'More than {self.max_operations} operations', token.position)
+        if deadline is not None and time.monotonic() > deadline:
+            raise BudgetExceededError(f'Time limit of {self.time_limit} s exceeded', token.position)
+        if self.max_bits is not None and len(operands) == 2 and self.exceeds_bits(token.value, *operands):
+            raise BudgetExceededError(f'Result would exceed {self.max_bits} bits', token.position)
+
+    def exceeds_bits(self, operator: str, left: Any, right: Any) -> bool:
+        """
+        Tells whether an exact result of '*' or '**' would be longer than max_bits.
+        Floats are not checked. Operations that raise their own error (e.g. too high
+        a power) are not reported, so that error keeps its priority.
+        """
+
+        if self.max_bits is None or _bits(left) is None or _bits(right) is None:
+            return False
+        return estimate_bits(operator, left, right) > self.max_bits
+
+
+def _bits(value: Any) -> int | None:
+    # Bit length of an exact value, None for floats
+    if type(value) is int:
+        return value.bit_length()
+    if isinstance(value, Fraction):
+        return value.numerator.bit_length() + value.denominator.bit_length()
+    if isinstance(value, Decimal) and value.is_finite():
+        return 0 if not value else max(math.ceil((value.adjusted() + 1) * _LOG2_10), 0)
+    return None
+
+
+def estimate_bits(operator: str, left: int | Fraction | Decimal, right: int | Fraction | Decimal) -> int:
+    """
+    Estimates the bit length of an exact result without computing it: the bit
+    length of an integer, the sum of the bit lengths of the numerator and the
+    denominator of a fraction, the bit length of the integer part of a decimal.
+
+    Parameters:
+        operator (str): binary operator.
+        left (int | Fraction | Decimal): left operand.
+        right (int | Fraction | Decimal): right operand.
+
+    Returns:
+        int: estimated bit length, 0 for operators whose result does not grow.
+    """
+
+    if operator == '*':
+        return (_bits(left) or 0) + (_bits(right) or 0)
+    if operator != '**' or right > MAX_POWER:
+        return 0
+    if isinstance(left, Decimal):
+        # Decimals are rounded to the precision of the context, only the integer part grows
+        if right <= 0 or not left or left.adjusted() < 0:
+            return 0
+        return math.ceil(float(right) * (left.adjusted() + 1) * _LOG2_10)
+    if isinstance(right, Decimal):
+        if right != right.to_integral_value():
+            return 0
+        right = int(right)
+    # A fractional exponent gives a float, and so does a negative one on an integer
+    if right.denominator != 1 or (right < 0 and type(left) is int):
+        return 0
+    numerator, denominator = left.numerator, left.denominator
+    if abs(numerator) <= 1 and denominator == 1:
+        return 0
+    return math.ceil(abs(int(right)) * (math.log2(abs(numerator)) + math.log2(denominator)))
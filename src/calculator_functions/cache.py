@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from typing import NamedTuple
+import threading
+
+from .tokenizer import Token
+from .errors import ParsingError
+
+# Whitespace characters are replaced one-to-one, so token positions stay valid
+_WHITESPACE = str.maketrans('\t\n\r\v\f', '     ')
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class RPNCache:
+    """
+    A size-bounded LRU cache of expressions converted to RPN.
+    Parsing errors are stored as well, so repeated invalid input fails fast.
+
+    The cache may be shared by threads: every operation holds a lock for a few
+    dictionary operations, never while an expression is parsed. Two threads that
+    miss the same expression both parse it and store equal entries
+
+    """
+    def __init__(self, max_size: int):
+        if max_size <= 0:
+            raise ValueError('Cache size must be positive')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, list[Token] | ParsingError] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(expression: str) -> str:
+        """
+        Builds a cache key from an expression.
+
+        Whitespace is normalized without moving any character, because cached
+        tokens keep their positions for error messages.
+
+        Parameters:
+            expression (str): raw infix expression.
+
+        Returns:
+            str: cache key.
+        """
+
+        return expression.translate(_WHITESPACE).rstrip()
+
+    def get(self, key: str) -> list[Token] | ParsingError | None:
+        """
+        Returns a cached RPN or parsing error and marks it as recently used.
+
+        Parameters:
+            key (str): normalized expression.
+
+        Returns:
+            list[Token] | ParsingError | None: cached entry, None on a miss.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: list[Token] | ParsingError) -> None:
+        """
+        Stores an entry, evicting the least recently used one when the cache is full.
+
+        Parameters:
+            key (str): normalized expression.
+            entry (list[Token] | ParsingError): RPN or parsing error to store.
+        """
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.max_size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
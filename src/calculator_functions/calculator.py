@@ -1,26 +1,119 @@
-from .tokenizer import Tokenizer
+from .tokenizer import Tokenizer, PostfixTokenizer, Token
 from .shunting_yard import ShunringYardAlgorithm
 from .evaluator import EvaluatorRPN
+from .budget import EvaluationBudget
+from .backends import get_backend
+from .cache import RPNCache
+from .compiler import CompiledExpression
+from .dag import ExpressionDAG
+from .serialization import ExpressionLibrary, write_library
+from .optimizer import RPNOptimizer
+from .parallel import ParallelEvaluator, MIN_PARALLEL_COST
+from .pratt import PrattEvaluator
+from .stats import CalculatorStats, operand_stack_depth
+from .vectorized import VectorizedEvaluatorRPN
+from .validation import Diagnostic, Validator
 from .errors import ParsingError
 
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from decimal import Context
+from typing import Any, Callable, Iterable, Iterator
+import copy
+import functools
+import os
+import time
+
+# Batches smaller than this are calculated serially, a process pool costs more than it saves
+PARALLEL_THRESHOLD = 2048
+
+_worker_calculator: 'Calculator | None' = None
+
+
+def _init_worker(settings: dict[str, Any]) -> None:
+    global _worker_calculator
+    _worker_calculator = Calculator(**settings)
+
+
+def _calculate_in_worker(expression: str, postfix: bool = False) -> int | float | ParsingError:
+    assert _worker_calculator is not None
+    return _worker_calculator.calculate_or_error(expression, postfix)
+
+
+def _evaluate_in_worker(rpn: list[Token], variables: dict[str, Any]) -> int | float:
+    assert _worker_calculator is not None
+    return _worker_calculator.evaluator.evaluate_of_rpn(rpn, variables)
+
+
 class Calculator:
     """
     An expression calculator that parses an infix arithmetic expression,
     converts it to Reverse Poland Notation (RPN) using the shunting-yard algorithm
     and evaluate a result
 
+    One calculator may be shared by threads. The tokenizer, shunting-yard, optimizer
+    and evaluators keep all state of a call in local variables; the RPN cache and the
+    statistics are the only shared mutable state and hold a lock for a few dictionary
+    operations. RPN lists returned by to_rpn are shared and must not be modified
+
+    Parameters:
+        cache_size (int | None): if set, keeps up to this many RPN results
+            (and parsing errors) in an LRU cache, see calculator.cache.info()
+        optimize (bool): simplify the RPN with RPNOptimizer (constant folding,
+            identities) before evaluation
+        engine (str): 'rpn' converts to RPN and evaluates it, 'pratt' evaluates
+            while parsing with PrattEvaluator (no RPN list, so calculate does not
+            use the cache). Results and errors are the same
+        instrument (bool): collect per-stage timings, token counts, stack depths
+            and errors in calculator.stats (CalculatorStats)
+        max_bits (int | None): maximum bit length of an integer result of '*' or '**'
+        max_operations (int | None): maximum number of operators in one evaluation
+        time_limit (float | None): wall-clock seconds for one evaluation.
+            Exceeding any limit raises BudgetExceededError; limits need engine='rpn'
+        backend (str): number type of literals and results, 'native' (int and float),
+            'fraction' (exact rationals) or 'decimal' (see backends.get_backend)
+        decimal_context (Context | None): precision and rounding of the 'decimal' backend
+        max_number_length (int | None): maximum number of characters of a literal,
+            10 for 'native' and 100 for the other backends by default
+        cse (bool): evaluate the RPN as a hash-consed DAG (ExpressionDAG), so repeated
+            subexpressions are computed once. Pays off on large generated expressions
+        functions (dict[str, tuple[Callable, int]] | None): user-defined functions,
+            name -> (function, number of arguments), called as name(a, b) next to the
+            built-in sqrt, max and min. They must be picklable to be used by create_pool
+
     """
-    def __init__(self):
-        self.tokenizer = Tokenizer()
-        self.shunting_yard = ShunringYardAlgorithm()
-        self.evaluator = EvaluatorRPN()
+    def __init__(self, cache_size: int | None = None, optimize: bool = False, engine: str = 'rpn',
+                 instrument: bool = False, max_bits: int | None = None, max_operations: int | None = None,
+                 time_limit: float | None = None, backend: str = 'native', decimal_context: Context | None = None,
+                 max_number_length: int | None = None, cse: bool = False,
+                 functions: dict[str, tuple[Callable, int]] | None = None):
+        if engine not in ('rpn', 'pratt'):
+            raise ValueError(f"Unknown engine '{engine}'")
+        if cse and engine == 'pratt':
+            raise ValueError("Common-subexpression elimination is not supported by the 'pratt' engine")
+        budget = None
+        if max_bits is not None or max_operations is not None or time_limit is not None:
+            if engine == 'pratt':
+                raise ValueError("Evaluation budgets are not supported by the 'pratt' engine")
+            budget = EvaluationBudget(max_bits, max_operations, time_limit)
+        self.backend = get_backend(backend, decimal_context, max_number_length, functions)
+        self.tokenizer = Tokenizer(self.backend.max_length, self.backend.convert, self.backend.registry)
+        self.postfix_tokenizer = PostfixTokenizer(self.backend.max_length, self.backend.convert, self.backend.registry)
+        self.shunting_yard = ShunringYardAlgorithm(self.backend.registry)
+        self.validator = Validator(self.backend.max_length, self.backend.registry)
+        self.evaluator = EvaluatorRPN(budget, self.backend)
+        self.pratt = PrattEvaluator(self.backend) if engine == 'pratt' else None
+        self.optimizer = RPNOptimizer(budget, self.backend) if optimize else None
+        self.cache = RPNCache(cache_size) if cache_size else None
+        self.stats = CalculatorStats() if instrument else None
+        self.cse = cse
 
-    def calculate(self, expression: str) -> int | float:
+    def calculate(self, expression: str, variables: dict[str, int | float] | None = None) -> int | float:
         """
         Parses, compiles to RPN, and evaluates an infix arithmetic expression.
 
         Parameters:
             expression (str): raw infix expression.
+            variables (dict[str, int | float] | None): values of named variables.
 
         Returns:
             int | float: computed result.
@@ -31,14 +124,19 @@ class Calculator:
             - Calculation errors
         """
 
-        try:
-            tokens = self.tokenizer.parse_tokens(expression)
-            if not tokens:
-                raise ParsingError("Empty expression", 0, 'Invalid expression')
+        if self.stats is not None:
+            return self._calculate_instrumented(expression, variables)
 
-            rpn = self.shunting_yard.shunting_yard(tokens)
+        try:
+            if self.pratt is not None:
+                result = self.pratt.evaluate(self._tokenize(expression), variables)
+            else:
+                rpn = self.to_rpn(expression)
 
-            result = self.evaluator.evaluate_of_rpn(rpn)
+                if self.cse:
+                    result = ExpressionDAG(rpn, self.evaluator).evaluate(variables)
+                else:
+                    result = self.evaluator.evaluate_of_rpn(rpn, variables)
 
             return result
 
@@ -46,3 +144,445 @@ class Calculator:
             raise
         except ValueError as e:
             raise ParsingError(f"{e}", 0, 'Calculation')
+
+    def _calculate_instrumented(self, expression: str, variables: dict[str, int | float] | None) -> int | float:
+        stats = self.stats
+        assert stats is not None
+        clock = time.perf_counter_ns
+        start = clock()
+        error_type = None
+
+        try:
+            try:
+                if self.pratt is not None:
+                    tokens = self._tokenize(expression)
+                    evaluated = clock()
+                    stats.record_stage('tokenize', evaluated - start)
+                    stats.record_tokens(len(tokens))
+                    result = self.pratt.evaluate(tokens, variables)
+                else:
+                    rpn = self.to_rpn(expression)
+                    stats.record_operand_depth(operand_stack_depth(rpn, self.backend.registry))
+                    evaluated = clock()
+                    if self.cse:
+                        result = ExpressionDAG(rpn, self.evaluator).evaluate(variables)
+                    else:
+                        result = self.evaluator.evaluate_of_rpn(rpn, variables)
+                stats.record_stage('evaluate', clock() - evaluated)
+
+                return result
+
+            except ValueError as e:
+                raise ParsingError(f"{e}", 0, 'Calculation')
+
+        except ParsingError as e:
+            error_type = e.error_type
+            raise
+        finally:
+            stats.record_call(clock() - start, error_type)
+
+    def calculate_stream(self, chunks: Iterable[str], variables: dict[str, int | float] | None = None) -> int | float:
+        """
+        Calculates an expression given in chunks (see tokenizer.read_chunks) with a lazy
+        pipeline: tokens are yielded as the chunks are read, the shunting-yard yields
+        RPN tokens as soon as it can and the evaluator consumes them at once. Memory is
+        bounded by the operator and operand stacks, not by the length of the expression.
+
+        The result and the error are the same as of calculate on the joined chunks:
+        after an error the rest of the input is still tokenized, because errors of
+        earlier stages take priority. The cache, optimizer, Pratt engine and
+        statistics are not used.
+
+        Parameters:
+            chunks (Iterable[str]): parts of a raw infix expression.
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: computed result.
+
+        Exceptions:
+            - Empty expression
+            - Issues during parsing of shunting-yard
+            - Calculation errors
+        """
+
+        tokens = self._iter_tokens(chunks)
+        rpn = self.shunting_yard.iter_rpn(tokens)
+        try:
+            try:
+                return self.evaluator.evaluate_of_rpn(rpn, variables)
+            except (ParsingError, ValueError, ArithmeticError) as e:
+                error = e
+            # Let errors of the shunting-yard and then of the tokenizer further in the input win
+            try:
+                for _ in rpn:
+                    pass
+            except ParsingError as e:
+                error = e
+            for _ in tokens:
+                pass
+            raise error
+
+        except ParsingError:
+            raise
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    def calculate_postfix(self, expression: str | Iterable[str],
+                          variables: dict[str, int | float] | None = None) -> int | float:
+        """
+        Calculates an expression written in postfix notation (RPN), e.g. '3 4 + 2 *'
+        (see PostfixTokenizer). Tokens stream from the postfix tokenizer straight into
+        the evaluator, which checks the number of operands of every operator as it
+        goes; there is no shunting-yard, operator stack or token list. The first error
+        in the input is raised. The budget is applied; the cache, optimizer, Pratt
+        engine, common subexpressions and statistics are not used.
+
+        Parameters:
+            expression (str | Iterable[str]): postfix expression, or its chunks
+                (see tokenizer.read_chunks).
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: computed result.
+
+        Exceptions:
+            - Empty expression
+            - Errors of the postfix tokenizer
+            - Calculation errors
+        """
+
+        chunks = (expression,) if isinstance(expression, str) else expression
+        try:
+            return self.evaluator.evaluate_of_rpn(self._iter_tokens(chunks, self.postfix_tokenizer), variables)
+        except ParsingError:
+            raise
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    def _iter_tokens(self, chunks: Iterable[str],
+                     tokenizer: Tokenizer | PostfixTokenizer | None = None) -> Iterator[Token]:
+        empty = True
+        for token in (tokenizer or self.tokenizer).iter_tokens(chunks):
+            empty = False
+            yield token
+        if empty:
+            raise ParsingError("Empty expression", 0, 'Invalid expression')
+
+    def calculate_parallel(self, expression: str, variables: dict[str, int | float] | None = None,
+                           executor: Executor | None = None, workers: int | None = None,
+                           min_cost: int = MIN_PARALLEL_COST) -> int | float:
+        """
+        Same as calculate, but independent subtrees whose estimated cost is at least
+        min_cost are evaluated in parallel (see ParallelEvaluator). Pays off on huge
+        integers, e.g. (a**999 * b**999) + (c**999 * d**999); cheap expressions are
+        evaluated inline and never wait for a worker.
+
+        Parameters:
+            expression (str): raw infix expression.
+            variables (dict[str, int | float] | None): values of named variables.
+            executor (Executor | None): pool from create_pool (or a thread pool),
+                reused between calls. Without it a pool of workers processes is
+                started for the call.
+            workers (int | None): number of processes of that pool, defaults to the number of CPUs.
+            min_cost (int): estimated cost of a subtree worth a worker.
+
+        Returns:
+            int | float: the result of calculate.
+
+        Exceptions:
+            The errors of calculate.
+            ValueError:
+                - The calculator has an evaluation budget
+        """
+
+        if self.evaluator.budget is not None:
+            raise ValueError('Evaluation budgets are not supported by parallel evaluation')
+        if executor is None:
+            with self.create_pool(workers or os.cpu_count() or 1) as pool:
+                return self.calculate_parallel(expression, variables, pool, min_cost=min_cost)
+
+        task = _evaluate_in_worker if isinstance(executor, ProcessPoolExecutor) else None
+        evaluator = ParallelEvaluator(self.evaluator, executor, task, min_cost)
+        try:
+            return evaluator.evaluate_of_rpn(self.to_rpn(expression), variables)
+        except ParsingError:
+            raise
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    def calculate_or_error(self, expression: str, postfix: bool = False) -> int | float | ParsingError:
+        """
+        Same as calculate (calculate_postfix with postfix=True), but returns
+        a ParsingError instead of raising it. Other errors of the evaluation
+        (an overflow, an exception of a user-defined function) are returned
+        as calculation errors, so one expression never stops a batch.
+        """
+
+        try:
+            if postfix:
+                return self.calculate_postfix(expression)
+            return self.calculate(expression)
+        except ParsingError as e:
+            return e
+        except Exception as e:
+            return ParsingError(str(e) or type(e).__name__, 0, 'Calculation')
+
+    def validate(self, expression: str, variables: Iterable[str] | None = None) -> list[Diagnostic]:
+        """
+        Finds all syntax errors of an expression in one pass, without raising
+        (see Validator). An empty list means calculate raises no syntax error;
+        errors of values (division by zero, budgets) are not checked.
+
+        Parameters:
+            expression (str): raw infix expression.
+            variables (Iterable[str] | None): names of the variables that will be bound,
+                None to skip the check of variables.
+
+        Returns:
+            list[Diagnostic]: position, error type and message of every error.
+        """
+
+        return self.validator.validate(expression, variables)
+
+    def check_many(self, expressions: Iterable[str],
+                   variables: Iterable[str] | None = None) -> list[list[Diagnostic]]:
+        """
+        Validates expressions, a list of diagnostics per expression in input order.
+        """
+
+        names = None if variables is None else set(variables)
+        validate = self.validator.validate
+        return [validate(expression, names) for expression in expressions]
+
+    def calculate_many(self, expressions: Iterable[str], workers: int | None = None,
+                       chunksize: int = 256, executor: ProcessPoolExecutor | None = None,
+                       postfix: bool = False) -> list[int | float | ParsingError]:
+        """
+        Calculates a batch of expressions, spreading large batches across CPU cores
+        with a process pool. A failed expression does not stop the batch.
+
+        Parameters:
+            expressions (Iterable[str]): raw infix expressions.
+            workers (int | None): number of processes, defaults to the number of CPUs.
+                With one worker or a batch smaller than PARALLEL_THRESHOLD
+                the batch is calculated in the current process.
+            chunksize (int): number of expressions sent to a worker at once.
+            executor (ProcessPoolExecutor | None): a pool from create_pool, reused
+                between calls instead of starting new processes for every batch.
+            postfix (bool): the expressions are in postfix notation (see calculate_postfix).
+
+        Returns:
+            list[int | float | ParsingError]: a result or an error per expression,
+            in input order.
+        """
+
+        expressions = list(expressions)
+        task = functools.partial(_calculate_in_worker, postfix=True) if postfix else _calculate_in_worker
+        if executor is not None:
+            return list(executor.map(task, expressions, chunksize=chunksize))
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1 or len(expressions) < PARALLEL_THRESHOLD:
+            return [self.calculate_or_error(expression, postfix) for expression in expressions]
+
+        with self.create_pool(workers) as executor:
+            return list(executor.map(task, expressions, chunksize=chunksize))
+
+    def create_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Starts a process pool whose workers calculate with the same settings as this calculator.
+
+        Parameters:
+            workers (int): number of processes.
+
+        Returns:
+            ProcessPoolExecutor: pool to pass to calculate_many.
+        """
+
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self._settings(),))
+
+    def submit(self, executor: Executor, expression: str) -> Future:
+        """
+        Schedules calculate_or_error of one expression on an executor.
+        A pool from create_pool calculates in its workers, any other executor uses this calculator.
+
+        Parameters:
+            executor (Executor): pool from create_pool or a thread pool.
+            expression (str): raw infix expression.
+
+        Returns:
+            Future: future of a result or a ParsingError.
+        """
+
+        if isinstance(executor, ProcessPoolExecutor):
+            return executor.submit(_calculate_in_worker, expression)
+        return executor.submit(self.calculate_or_error, expression)
+
+    def _settings(self) -> dict[str, Any]:
+        return {
+            'cache_size': self.cache.max_size if self.cache is not None else None,
+            'optimize': self.optimizer is not None,
+            'engine': 'pratt' if self.pratt is not None else 'rpn',
+            'instrument': self.stats is not None,
+            'cse': self.cse,
+            'max_bits': self.budget.max_bits if self.budget is not None else None,
+            'max_operations': self.budget.max_operations if self.budget is not None else None,
+            'time_limit': self.budget.time_limit if self.budget is not None else None,
+            'backend': self.backend.name,
+            'decimal_context': self.backend.context,
+            'max_number_length': self.backend.max_length,
+            'functions': self.backend.registry.functions or None,
+        }
+
+    @property
+    def budget(self) -> EvaluationBudget | None:
+        return self.evaluator.budget
+
+    def calculate_vectorized(self, expression: str, variables: dict[str, Any], errors: str = 'raise') -> Any:
+        """
+        Evaluates an infix expression once over whole NumPy arrays bound to variables.
+        Requires NumPy.
+
+        Parameters:
+            expression (str): raw infix expression.
+            variables (dict[str, array_like]): arrays of variable values.
+            errors (str): 'raise' or 'mask', see VectorizedEvaluatorRPN.
+
+        Returns:
+            numpy.ndarray | numpy.ma.MaskedArray: computed results.
+
+        Exceptions:
+            - Empty expression
+            - Issues during parsing of shunting-yard
+            - Calculation errors
+            - ValueError if the backend is not 'native'
+        """
+
+        if self.backend.name != 'native':
+            raise ValueError("Vectorized evaluation requires the 'native' backend")
+        evaluator = VectorizedEvaluatorRPN(errors)
+
+        try:
+            rpn = self.to_rpn(expression)
+
+            return evaluator.evaluate_of_rpn(rpn, variables)
+
+        except ParsingError:
+            raise
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    def compile(self, expression: str) -> CompiledExpression | ExpressionDAG:
+        """
+        Parses an infix expression once and returns an object that can be
+        evaluated many times without tokenizing and shunting-yard.
+
+        Parameters:
+            expression (str): raw infix expression.
+
+        Returns:
+            CompiledExpression | ExpressionDAG: callable compiled expression,
+            an ExpressionDAG if the calculator was created with cse=True.
+
+        Exceptions:
+            ParsingError:
+                - Empty expression
+                - Errors of the tokenizer and shunting-yard
+        """
+
+        if self.cse:
+            return ExpressionDAG(self.to_rpn(expression), self.evaluator)
+        return CompiledExpression(self.to_rpn(expression), self.evaluator)
+
+    def save_library(self, path: str, expressions: Iterable[str]) -> int:
+        """
+        Compiles expressions and writes them to a binary file, see serialization.py.
+
+        Parameters:
+            path (str): file to write.
+            expressions (Iterable[str]): raw infix expressions.
+
+        Returns:
+            int: number of written expressions.
+
+        Exceptions:
+            ParsingError:
+                - Errors of the tokenizer and shunting-yard
+        """
+
+        return write_library(path, (self.to_rpn(expression) for expression in expressions))
+
+    def load_library(self, path: str) -> ExpressionLibrary:
+        """
+        Opens a file of save_library through mmap; its expressions are evaluated
+        with this calculator's evaluator (backend and budget).
+
+        Exceptions:
+            LibraryFormatError:
+                - The file is corrupt or has an unsupported version
+        """
+
+        return ExpressionLibrary(path, self.evaluator)
+
+    def to_rpn(self, expression: str) -> list[Token]:
+        """
+        Converts an infix expression to RPN, using the cache when it is enabled.
+
+        Parameters:
+            expression (str): raw infix expression.
+
+        Returns:
+            list[Token]: tokens in RPN order. The list may be shared with the cache
+            and must not be modified.
+
+        Exceptions:
+            ParsingError:
+                - Empty expression
+                - Errors of the tokenizer and shunting-yard
+        """
+
+        if self.cache is None:
+            return self._parse(expression)
+
+        key = self.cache.normalize(expression)
+        entry = self.cache.get(key)
+        if entry is None:
+            try:
+                entry = self._parse(expression)
+            except ParsingError as e:
+                entry = e
+            self.cache.put(key, entry)
+
+        if isinstance(entry, ParsingError):
+            # A copy, so threads raising the cached error do not share its traceback
+            raise copy.copy(entry)
+        return entry
+
+    def _tokenize(self, expression: str) -> list[Token]:
+        tokens = self.tokenizer.parse_tokens(expression)
+        if not tokens:
+            raise ParsingError("Empty expression", 0, 'Invalid expression')
+        return tokens
+
+    def _parse(self, expression: str) -> list[Token]:
+        if self.stats is not None:
+            clock = time.perf_counter_ns
+            start = clock()
+            tokens = self._tokenize(expression)
+            converted = clock()
+            self.stats.record_stage('tokenize', converted - start)
+            self.stats.record_tokens(len(tokens))
+            rpn, depth = self.shunting_yard.shunting_yard_with_depth(tokens)
+            self.stats.record_stage('shunting_yard', clock() - converted)
+            self.stats.record_operator_depth(depth)
+        else:
+            tokens = self._tokenize(expression)
+
+            rpn = self.shunting_yard.shunting_yard(tokens)
+        if self.optimizer is not None:
+            rpn = self.optimizer.optimize(rpn)
+
+        return rpn
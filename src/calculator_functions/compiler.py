@@ -0,0 +1,131 @@
+from .tokenizer import Token, Variable, NUMBER_TYPES
+from .evaluator import EvaluatorRPN
+from .errors import ParsingError
+
+OP_CONSTANT = 0
+OP_UNARY = 1
+OP_BINARY = 2
+OP_VARIABLE = 3
+OP_CALL = 4
+
+
+class CompiledExpression:
+    """
+    An expression compiled from RPN into a flat list of instructions
+    (opcode, payload, position) with operator functions resolved ahead of time.
+    Functions of one or two arguments compile to the instructions of operators,
+    others to OP_CALL with the payload (function, arity).
+    The object can be evaluated any number of times.
+    An evaluator with a budget evaluates the RPN itself, so the limits are checked
+
+    """
+    def __init__(self, rpn: list[Token], evaluator: EvaluatorRPN | None = None):
+        self.rpn = rpn
+        self.evaluator = evaluator or EvaluatorRPN()
+        self.code, self.is_valid = self._compile(rpn, self.evaluator.operations)
+
+    @staticmethod
+    def _compile(rpn: list[Token], operations: list[tuple]) -> tuple[list[tuple], bool]:
+        """
+        Resolves operators of an RPN and checks the stack depth statically.
+
+        Parameters:
+            rpn (List[Token]): tokens in RPN order.
+            operations (list[tuple]): dispatch table of the numeric backend by opcode.
+
+        Returns:
+            tuple[list, bool]: instructions and whether the stack never runs
+            out of operands and ends with exactly one result.
+        """
+
+        code: list[tuple] = []
+        depth = 0
+        is_valid = True
+
+        for token in rpn:
+            value = token.value
+            if isinstance(value, NUMBER_TYPES):
+                code.append((OP_CONSTANT, value, token.position))
+                depth += 1
+            elif isinstance(value, Variable):
+                code.append((OP_VARIABLE, value.name, token.position))
+                depth += 1
+            elif token.opcode is not None:
+                func, arity = operations[token.opcode]
+                if arity == 1:
+                    code.append((OP_UNARY, func, token.position))
+                elif arity == 2:
+                    code.append((OP_BINARY, func, token.position))
+                else:
+                    code.append((OP_CALL, (func, arity), token.position))
+                if depth < arity:
+                    is_valid = False
+                depth -= arity - 1
+
+        return code, is_valid and depth == 1
+
+    def evaluate(self, variables: dict[str, int | float] | None = None) -> int | float:
+        """
+        Evaluates the compiled expression.
+
+        Parameters:
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: computed result.
+
+        Exceptions:
+            ParsingError:
+                - Not enough operands for operation
+                - Too many operands
+                - Unknown variable
+                - Calculation errors
+            BudgetExceededError:
+                - A limit of the evaluator budget would be exceeded
+        """
+
+        if variables is None:
+            variables = {}
+
+        try:
+            if not self.is_valid or self.evaluator.budget is not None:
+                # Malformed input keeps the exact error order of the evaluator
+                return self.evaluator.evaluate_of_rpn(self.rpn, variables)
+
+            stack: list[int | float] = []
+            push = stack.append
+            pop = stack.pop
+
+            for opcode, payload, position in self.code:
+                if opcode == OP_CONSTANT:
+                    push(payload)
+                elif opcode == OP_BINARY:
+                    right = pop()
+                    stack[-1] = payload(stack[-1], right)
+                elif opcode == OP_UNARY:
+                    stack[-1] = payload(stack[-1])
+                elif opcode == OP_VARIABLE:
+                    try:
+                        push(variables[payload])
+                    except KeyError:
+                        raise ParsingError(payload, position, 'Unknown variable') from None
+                else:
+                    func, arity = payload
+                    arguments = stack[-arity:]
+                    del stack[-arity:]
+                    push(func(*arguments))
+
+            return stack[0]
+
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    @property
+    def variables(self) -> list[str]:
+        """
+        Names of variables used by the expression, in order of first use.
+        """
+
+        return list(dict.fromkeys(payload for opcode, payload, _ in self.code if opcode == OP_VARIABLE))
+
+    __call__ = evaluate
@@ -0,0 +1,157 @@
+from .tokenizer import Token, Variable, NUMBER_TYPES
+from .evaluator import EvaluatorRPN
+from .errors import ParsingError
+from .compiler import OP_CONSTANT, OP_UNARY, OP_BINARY, OP_VARIABLE, OP_CALL
+
+from typing import Any
+
+
+class ExpressionDAG:
+    """
+    An RPN turned into a hash-consed DAG: equal subexpressions become one node,
+    so each distinct subexpression is evaluated once and its value reused.
+
+    Nodes are (opcode, payload, token, left, right) in the order their first
+    occurrence is completed in the RPN, which is the order EvaluatorRPN computes
+    them in. A failing node therefore fails first and at the same token as without
+    the DAG. Literals are keyed by type and representation, so 1, 1.0 and
+    Decimal('1.0') stay different nodes. A call of a function with more than two
+    arguments keeps the tuple of its argument nodes in left. With a budget,
+    max_operations counts distinct operations
+
+    """
+    def __init__(self, rpn: list[Token], evaluator: EvaluatorRPN | None = None):
+        self.rpn = rpn
+        self.evaluator = evaluator or EvaluatorRPN()
+        self.nodes, self.root = self._build(rpn, self.evaluator.operations)
+
+    @staticmethod
+    def _build(rpn: list[Token], operations: list[tuple]) -> tuple[list[tuple], int | None]:
+        """
+        Hash-conses the subexpressions of an RPN.
+
+        Parameters:
+            rpn (List[Token]): tokens in RPN order.
+            operations (list[tuple]): dispatch table of the numeric backend by opcode.
+
+        Returns:
+            tuple[list, int | None]: nodes and the index of the root, None if the
+            RPN is malformed (it is then evaluated by the evaluator to keep its errors).
+        """
+
+        nodes: list[tuple] = []
+        index_of: dict[tuple, int] = {}
+        stack: list[int] = []
+
+        for token in rpn:
+            value = token.value
+            if isinstance(value, NUMBER_TYPES):
+                key: tuple = (int, value) if type(value) is int else (type(value), repr(value))
+                node: tuple = (OP_CONSTANT, value, token, 0, 0)
+            elif isinstance(value, Variable):
+                key = (Variable, value.name)
+                node = (OP_VARIABLE, value.name, token, 0, 0)
+            elif token.opcode is not None:
+                func, arity = operations[token.opcode]
+                if len(stack) < arity:
+                    return [], None
+                if arity == 1:
+                    operand = stack.pop()
+                    key = (value, operand)
+                    node = (OP_UNARY, func, token, operand, 0)
+                elif arity == 2:
+                    right = stack.pop()
+                    left = stack.pop()
+                    key = (value, left, right)
+                    node = (OP_BINARY, func, token, left, right)
+                else:
+                    arguments = tuple(stack[-arity:])
+                    del stack[-arity:]
+                    key = (value, arguments)
+                    node = (OP_CALL, func, token, arguments, 0)
+            else:
+                return [], None
+
+            index = index_of.get(key)
+            if index is None:
+                index = index_of[key] = len(nodes)
+                nodes.append(node)
+            stack.append(index)
+
+        if len(stack) != 1:
+            return [], None
+        return nodes, stack[0]
+
+    def evaluate(self, variables: dict[str, Any] | None = None) -> Any:
+        """
+        Evaluates every node once.
+
+        Parameters:
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: computed result.
+
+        Exceptions:
+            ParsingError:
+                - Not enough operands for operation
+                - Too many operands
+                - Unknown variable
+                - Calculation errors
+            BudgetExceededError:
+                - A limit of the evaluator budget would be exceeded
+        """
+
+        if variables is None:
+            variables = {}
+
+        try:
+            if self.root is None:
+                return self.evaluator.evaluate_of_rpn(self.rpn, variables)
+
+            budget = self.evaluator.budget
+            if budget is not None:
+                operations = 0
+                deadline = budget.deadline()
+
+            values: list[Any] = []
+            push = values.append
+
+            for opcode, payload, token, left, right in self.nodes:
+                if opcode == OP_CONSTANT:
+                    push(payload)
+                elif opcode == OP_BINARY:
+                    if budget is not None:
+                        operations += 1
+                        budget.check(token, (values[left], values[right]), operations, deadline)
+                    push(payload(values[left], values[right]))
+                elif opcode == OP_UNARY:
+                    if budget is not None:
+                        operations += 1
+                        budget.check(token, (values[left],), operations, deadline)
+                    push(payload(values[left]))
+                elif opcode == OP_VARIABLE:
+                    if payload not in variables:
+                        raise ParsingError(payload, token.position, 'Unknown variable')
+                    push(variables[payload])
+                else:
+                    arguments = tuple(values[index] for index in left)
+                    if budget is not None:
+                        operations += 1
+                        budget.check(token, arguments, operations, deadline)
+                    push(payload(*arguments))
+
+            return values[self.root]
+
+        except ValueError as e:
+            raise ParsingError(f"{e}", 0, 'Calculation')
+
+    @property
+    def variables(self) -> list[str]:
+        """
+        Names of variables used by the expression, in order of first use.
+        """
+
+        return list(dict.fromkeys(token.value.name for token in self.rpn if isinstance(token.value, Variable)))
+
+    __call__ = evaluate
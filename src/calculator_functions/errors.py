@@ -6,7 +6,27 @@ class ParsingError(Exception):
         self.position = position
         self.error_type = error_type
 
+    def __reduce__(self):
+        # Keeps the error picklable, so it can be returned from worker processes
+        return (self.__class__, (self.message, self.position, self.error_type))
+
     def __str__(self):
         if self.position is not None:
             return f"{self.error_type} error: {self.message} at position {self.position}"
         return f"{self.error_type} error: {self.message}"
+
+
+class BudgetExceededError(ParsingError):
+    """
+    An evaluation would exceed a limit of EvaluationBudget
+
+    """
+    def __init__(self, message: str, position: None | int, error_type: str = 'Budget exceeded'):
+        super().__init__(message, position, error_type)
+
+
+class LibraryFormatError(ValueError):
+    """
+    A file of compiled expressions is corrupt or has an unsupported version
+
+    """
@@ -1,14 +1,27 @@
-from .tokenizer import Token
+from .tokenizer import Token, Variable, NUMBER_TYPES
 from .errors import ParsingError
-from .operators import BINARY_OPERATORS, UNARY_OPERATORS
+from .budget import EvaluationBudget
+from .backends import NumericBackend, NATIVE_BACKEND
+from .registry import BINARY, UNARY
+
+from typing import Any, Iterable
 
 class EvaluatorRPN:
-    def evaluate_of_rpn(self, rpn: list[Token]) -> int | float:
+    def __init__(self, budget: EvaluationBudget | None = None, backend: NumericBackend = NATIVE_BACKEND):
+        self.budget = budget
+        self.backend = backend
+        self.binary_operators = backend.binary_operators
+        self.unary_operators = backend.unary_operators
+        self.operations = backend.operations
+
+    def evaluate_of_rpn(self, rpn: Iterable[Token], variables: dict[str, int | float] | None = None) -> int | float:
             """
             Evaluates an expression given in Reverse Polish Notation (RPN).
 
             Parameters:
-                rpn (List[Token]): tokens in RPN order.
+                rpn (Iterable[Token]): tokens in RPN order, a list or a lazy iterator
+                    (ShunringYardAlgorithm.iter_rpn); only the operand stack is kept.
+                variables (dict[str, int | float] | None): values of named variables.
 
             Returns:
                 int | float: Computed result.
@@ -17,35 +30,64 @@ class EvaluatorRPN:
                 ParsingError:
                     - Not enough operands for operation
                     - If final stack contain more than one result
+                    - Unknown variable
+                BudgetExceededError:
+                    - A limit of the budget would be exceeded
                 ValueError:
                     - Arithemtic errors inside operators
             """
 
-            stack = []
+            # Numbers of the backend
+            stack: list[Any] = []
+            operations = self.operations
+            budget = self.budget
+            if budget is not None:
+                operations_count = 0
+                deadline = budget.deadline()
 
             for token in rpn:
-                if isinstance(token.value, (int, float)):
-                    stack.append(token.value)
-                else:
-                    if token.value in UNARY_OPERATORS:
-                        op_func = UNARY_OPERATORS[token.value][0]
-                        if len(stack) < 1:
-                            raise ParsingError(f'Not enough operands for a unary operator {token.value}',\
-                                                token.position, 'Calculation')
-                        operand: int | float = stack.pop()
-                        result = op_func(operand)
-                        stack.append(result)
-                    elif token.value in BINARY_OPERATORS:
-                        op_binary_func = BINARY_OPERATORS[token.value][0]
-                        if len(stack) < 2:
-                            raise ParsingError(f'Not enough operands for a binary operator {token.value}',\
-                                                token.position, 'Calculation')
+                opcode = token.opcode
+                if opcode is not None:
+                    op_func, arity = operations[opcode]
+                    if len(stack) < arity:
+                        raise ParsingError(self._not_enough_operands(token, opcode), token.position, 'Calculation')
+                    if arity == 2:
                         right: int | float = stack.pop()
                         left: int | float = stack.pop()
-                        result = op_binary_func(left, right)
-                        stack.append(result)
+                        if budget is not None:
+                            operations_count += 1
+                            budget.check(token, (left, right), operations_count, deadline)
+                        result = op_func(left, right)
+                    elif arity == 1:
+                        operand: int | float = stack.pop()
+                        if budget is not None:
+                            operations_count += 1
+                            budget.check(token, (operand,), operations_count, deadline)
+                        result = op_func(operand)
+                    else:
+                        arguments = stack[-arity:]
+                        del stack[-arity:]
+                        if budget is not None:
+                            operations_count += 1
+                            budget.check(token, tuple(arguments), operations_count, deadline)
+                        result = op_func(*arguments)
+                    stack.append(result)
+                elif isinstance(token.value, NUMBER_TYPES):
+                    stack.append(token.value)
+                elif isinstance(token.value, Variable):
+                    if variables is None or token.value.name not in variables:
+                        raise ParsingError(token.value.name, token.position, 'Unknown variable')
+                    stack.append(variables[token.value.name])
 
             if len(stack) != 1:
                 raise ParsingError("Too many operands", None, 'Invalid expression')
 
             return stack[0]
+
+    def _not_enough_operands(self, token: Token, opcode: int) -> str:
+        kind = self.backend.registry.kinds[opcode]
+        if kind == BINARY:
+            return f'Not enough operands for a binary operator {token.value}'
+        if kind == UNARY:
+            return f'Not enough operands for a unary operator {token.value}'
+        return f'Not enough arguments for a function {token.value}'
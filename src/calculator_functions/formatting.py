@@ -0,0 +1,57 @@
+import json
+
+from .errors import ParsingError
+
+from typing import Any
+
+
+def format_result(result: int | float) -> str:
+    """
+    Formats a result for output, floats with an integer value are shown as integers.
+    """
+
+    if isinstance(result, float) and result.is_integer():
+        return str(int(result))
+    return str(result)
+
+
+def _output_error(error: ValueError) -> ParsingError:
+    # A result that can not be written: more digits than int -> str allows, or a non-finite float in JSON
+    return ParsingError(f'{error}', None, 'Output')
+
+
+def format_plain(result: int | float | ParsingError) -> str:
+    if isinstance(result, ParsingError):
+        return str(result)
+    try:
+        return format_result(result)
+    except ValueError as e:
+        return str(_output_error(e))
+
+
+def format_json(expression: str, result: int | float | ParsingError) -> str:
+    """
+    Formats a result or an error as a single JSON line.
+
+    Parameters:
+        expression (str): raw infix expression.
+        result (int | float | ParsingError): result of the expression.
+
+    Returns:
+        str: JSON object with 'expression' and either 'result' or 'error'
+        (type, message, position). Fraction and Decimal results are strings, so no digits are lost.
+        A result that can not be written (too many digits, infinity or NaN) becomes an 'Output' error.
+    """
+
+    if not isinstance(result, ParsingError):
+        try:
+            value = result if isinstance(result, (int, float)) else str(result)
+            return json.dumps({'expression': expression, 'result': value}, allow_nan=False)
+        except ValueError as e:
+            result = _output_error(e)
+
+    record: dict[str, Any] = {
+        'expression': expression,
+        'error': {'type': result.error_type, 'message': result.message, 'position': result.position},
+    }
+    return json.dumps(record)
@@ -1,6 +1,11 @@
+from decimal import Context, Decimal, DecimalException, DivisionByZero, Overflow
+from fractions import Fraction
+from typing import Callable
+import math
+
 MAX_LENGTH_OF_NUMBER = 10
 MAX_POWER = 999
-CHARS_OF_OPERATOR = '+-*/%()'
+CHARS_OF_OPERATOR = '+-*/%(),'
 
 def _division(x: int | float, y: int | float) -> float:
         if y == 0:
@@ -44,3 +49,157 @@ UNARY_OPERATORS = {
 }
 
 OPERATORS = {**BINARY_OPERATORS, **UNARY_OPERATORS}
+
+def _sqrt(x: int | float) -> float:
+        if x < 0:
+            raise ValueError('Negative number under the root')
+        try:
+            return math.sqrt(x)
+        except OverflowError:
+            raise ValueError('Too large a number under the root')
+
+# Functions called as name(a, b), with the number of arguments
+FUNCTIONS = {
+    'sqrt': (_sqrt, 1),
+    'max': (max, 2),
+    'min': (min, 2),
+}
+
+
+# Exact backends: literals are Fraction or Decimal, '//' and '%' require integer values
+# and round the quotient down like the native operators
+
+# Powers with a fractional exponent and sqrt give floats, which are never integers here,
+# like in the native backend
+def _is_integer(x: Fraction | float) -> bool:
+        return not isinstance(x, float) and x.denominator == 1
+
+def _fraction_floor_division(x: Fraction, y: Fraction) -> Fraction:
+        if not _is_integer(x) or not _is_integer(y):
+            raise ValueError("Operator // requires integers")
+        if y == 0:
+            raise ValueError("Division by zero")
+        return Fraction(x // y)
+
+def _fraction_mod_division(x: Fraction, y: Fraction) -> Fraction:
+        if not _is_integer(x) or not _is_integer(y):
+            raise ValueError("Operator % requires integers")
+        if y == 0:
+            raise ValueError("Division by zero")
+        return x % y
+
+def _fraction_power(x: Fraction, y: Fraction) -> Fraction | float:
+        if x < 0 and not _is_integer(y):
+            raise ValueError('Negative number under the root')
+        if y > MAX_POWER:
+            raise ValueError('Too high a power to be raised')
+        return x ** y
+
+FRACTION_BINARY_OPERATORS = {
+    **BINARY_OPERATORS,
+    '**': (_fraction_power, 4, 'right'),
+    '//': (_fraction_floor_division, 2, 'left'),
+    '%': (_fraction_mod_division, 2, 'left'),
+}
+
+FRACTION_UNARY_OPERATORS = UNARY_OPERATORS
+
+# A square root of a fraction is not exact, like a power with a fractional exponent
+FRACTION_FUNCTIONS = FUNCTIONS
+
+
+def _decimal_error(error: DecimalException, invalid: str) -> ValueError:
+        # A trap of the context as the error the other backends give, invalid for the rest
+        if isinstance(error, DivisionByZero):
+            return ValueError('Division by zero')
+        if isinstance(error, Overflow):
+            return ValueError('Too large a number')
+        return ValueError(invalid)
+
+
+def decimal_operators(context: Context) -> tuple[dict, dict, dict]:
+    """
+    Builds operator tables whose functions round with a decimal context.
+
+    Parameters:
+        context (Context): precision, rounding and traps of the calculation.
+
+    Returns:
+        tuple[dict, dict, dict]: binary operators, unary operators and functions
+        in the format of BINARY_OPERATORS, UNARY_OPERATORS and FUNCTIONS.
+    """
+
+    def is_integer(x: Decimal) -> bool:
+        return x == x.to_integral_value()
+
+    def checked(operation: Callable[..., Decimal], invalid: str) -> Callable[..., Decimal]:
+        # The operation with the traps of the context raised as ValueError
+        def call(*arguments: Decimal) -> Decimal:
+            try:
+                return operation(*arguments)
+            except DecimalException as e:
+                raise _decimal_error(e, invalid) from None
+        return call
+
+    add = checked(context.add, 'Invalid addition')
+    subtract = checked(context.subtract, 'Invalid subtraction')
+
+    def division(x: Decimal, y: Decimal) -> Decimal:
+        if y == 0:
+            raise ValueError('Division by zero')
+        try:
+            return context.divide(x, y)
+        except DecimalException as e:
+            raise _decimal_error(e, 'Invalid division') from None
+
+    def floor_divmod(x: Decimal, y: Decimal, operator: str) -> tuple[Decimal, Decimal]:
+        if not is_integer(x) or not is_integer(y):
+            raise ValueError(f"Operator {operator} requires integers")
+        if y == 0:
+            raise ValueError("Division by zero")
+        try:
+            quotient, remainder = context.divmod(x, y)
+        except DecimalException as e:
+            raise _decimal_error(e, 'Quotient has more digits than the decimal precision') from None
+        # Decimal rounds the quotient towards zero, the native operators round it down
+        if remainder and (remainder < 0) != (y < 0):
+            return subtract(quotient, 1), add(remainder, y)
+        return quotient, remainder
+
+    def power(x: Decimal, y: Decimal) -> Decimal:
+        if x < 0 and not is_integer(y):
+            raise ValueError('Negative number under the root')
+        if y > MAX_POWER:
+            raise ValueError('Too high a power to be raised')
+        try:
+            return context.power(x, y)
+        except DecimalException as e:
+            raise _decimal_error(e, 'Invalid power') from None
+
+    def sqrt(x: Decimal) -> Decimal:
+        if x < 0:
+            raise ValueError('Negative number under the root')
+        try:
+            return context.sqrt(x)
+        except DecimalException as e:
+            raise _decimal_error(e, 'Invalid square root') from None
+
+    binary = {
+        '+': (add, 1, 'left'),
+        '-': (subtract, 1, 'left'),
+        '*': (checked(context.multiply, 'Invalid multiplication'), 2, 'left'),
+        '/': (division, 2, 'left'),
+        '**': (power, 4, 'right'),
+        '//': (lambda x, y: floor_divmod(x, y, '//')[0], 2, 'left'),
+        '%': (lambda x, y: floor_divmod(x, y, '%')[1], 2, 'left'),
+    }
+    unary = {
+        '~': (checked(context.minus, 'Invalid negation'), 5, 'left'),
+        '$': (lambda x: x, 5, 'left'),
+    }
+    functions = {
+        'sqrt': (sqrt, 1),
+        'max': (max, 2),
+        'min': (min, 2),
+    }
+    return binary, unary, functions
@@ -0,0 +1,138 @@
+from .tokenizer import Token, Variable, NUMBER_TYPES
+from .budget import EvaluationBudget
+from .backends import NumericBackend, NATIVE_BACKEND
+
+# Marks an operand on the simulated stack whose value is not known before evaluation
+_UNKNOWN = object()
+
+
+class RPNOptimizer:
+    """
+    Simplifies an RPN between the shunting-yard and the evaluator:
+    folds constant subexpressions, removes unary plus, collapses double negation
+    and drops identities x * 1, 1 * x, x + 0, 0 + x, x - 0.
+
+    An operation is folded only if computing it succeeds, so every error of
+    operators.py is still raised at evaluation time. Functions registered by the
+    user are never folded, they may return a different value on every call.
+    Identities are applied only to integer literals of the native backend, so they
+    do not change the type of a result (decimal operations round to the context).
+    With a budget, operations whose result would exceed budget.max_bits are not folded,
+    and nothing is folded if the budget limits the operations or the time: folding runs
+    before the evaluation, where they are counted and the deadline starts.
+    Constants are folded with the operators and functions of the numeric backend
+
+    """
+    def __init__(self, budget: EvaluationBudget | None = None, backend: NumericBackend = NATIVE_BACKEND):
+        self.budget = budget
+        self.operations = backend.operations
+        self.fold = budget is None or (budget.max_operations is None and budget.time_limit is None)
+        self.identities = backend.name == 'native'
+        registry = backend.registry
+        self.user_functions = {registry.opcodes[name] for name in registry.functions}
+
+    def optimize(self, rpn: list[Token]) -> list[Token]:
+        """
+        Returns a simplified copy of an RPN.
+
+        Parameters:
+            rpn (List[Token]): tokens in RPN order.
+
+        Returns:
+            List[Token]: simplified tokens in RPN order. A malformed RPN
+            (unknown tokens, not enough or too many operands) is returned
+            unchanged, so the evaluator reports its errors as usual.
+        """
+
+        operations = self.operations
+        fold = self.fold
+        user_functions = self.user_functions
+        output: list[Token] = []
+        # (index in output where the operand starts, its value or _UNKNOWN)
+        stack: list[tuple[int, object]] = []
+
+        for token in rpn:
+            value = token.value
+
+            if isinstance(value, NUMBER_TYPES):
+                stack.append((len(output), value))
+                output.append(token)
+
+            elif isinstance(value, Variable):
+                stack.append((len(output), _UNKNOWN))
+                output.append(token)
+
+            elif token.opcode is not None:
+                func, arity = operations[token.opcode]
+                if len(stack) < arity:
+                    return rpn
+                foldable = fold and token.opcode not in user_functions
+
+                if arity == 1:
+                    start, operand = stack[-1]
+                    if value == '$':
+                        continue
+                    if foldable and operand is not _UNKNOWN:
+                        try:
+                            folded = func(operand)
+                        except (ValueError, ArithmeticError):
+                            pass
+                        else:
+                            output[start:] = [Token(folded, output[start].position)]
+                            stack[-1] = (start, folded)
+                            continue
+                    if value == '~' and output[-1].value == '~':
+                        output.pop()
+                    else:
+                        output.append(token)
+                    stack[-1] = (start, _UNKNOWN)
+                    continue
+
+                arguments = stack[-arity:]
+                del stack[-arity:]
+                start = arguments[0][0]
+                known = [operand for _, operand in arguments]
+
+                if foldable and all(operand is not _UNKNOWN for operand in known) and not (
+                        arity == 2 and self.budget is not None and self.budget.exceeds_bits(value, *known)
+                    ):
+                    try:
+                        folded = func(*known)
+                    except (ValueError, ArithmeticError):
+                        pass
+                    else:
+                        output[start:] = [Token(folded, output[start].position)]
+                        stack.append((start, folded))
+                        continue
+
+                if arity != 2 or not self.identities:
+                    output.append(token)
+                else:
+                    (left_start, left), (right_start, right) = arguments
+                    if self._is_identity(value, right, right_operand=True):
+                        del output[right_start:]
+                    elif self._is_identity(value, left, right_operand=False):
+                        del output[left_start:right_start]
+                    else:
+                        output.append(token)
+                stack.append((start, _UNKNOWN))
+
+            else:
+                return rpn
+
+        if len(stack) != 1:
+            return rpn
+
+        return output
+
+    @staticmethod
+    def _is_identity(operator: str, operand: object, right_operand: bool) -> bool:
+        if type(operand) is not int:
+            return False
+        if operator == '*':
+            return operand == 1
+        if operator == '+':
+            return operand == 0
+        if operator == '-':
+            return right_operand and operand == 0
+        return False
@@ -0,0 +1,279 @@
+from .tokenizer import Token, Variable, NUMBER_TYPES
+from .evaluator import EvaluatorRPN
+from .errors import ParsingError
+from .operators import MAX_POWER
+from .registry import BINARY, UNARY
+
+from concurrent.futures import Executor, Future
+from fractions import Fraction
+from typing import Any, Callable
+
+# Estimated cost of a subtree worth sending to a worker, in units of
+# CPython digit products (about 10 ns each, so about 10 ms)
+MIN_PARALLEL_COST = 1_000_000
+# CPython multiplies by Karatsuba from this many 30-bit digits on
+_KARATSUBA_CUTOFF = 70
+
+
+def multiplication_cost(left_bits: int, right_bits: int) -> int:
+    """
+    Estimated cost of multiplying integers of these bit lengths, in digit products.
+    """
+
+    small, large = sorted((left_bits // 30 + 1, right_bits // 30 + 1))
+    if small <= _KARATSUBA_CUTOFF:
+        return small * large
+    return int(large / small * small ** 1.585)
+
+
+def _bits(value: Any) -> int | None:
+    # Bit length of an exact value, None for floats and decimals, whose operations are cheap
+    if type(value) is int:
+        return value.bit_length()
+    if isinstance(value, Fraction):
+        return value.numerator.bit_length() + value.denominator.bit_length()
+    return None
+
+
+class ParallelEvaluator:
+    """
+    Evaluates an RPN as an expression tree, sending expensive independent subtrees
+    to an executor while the rest is evaluated in the current process.
+
+    A subtree is a contiguous slice of the RPN. Its cost is estimated from the bit
+    lengths of literals and variables: '+' and '-' are linear, '*', '/', '//' and '%'
+    cost a multiplication, '**' the squarings of its result (its bit length is the
+    bit length of the base times the exponent, at most MAX_POWER when the exponent is
+    not a literal or a variable). Floats and decimals cost nothing. Where two or more
+    children of a node cost at least min_cost, all but the most expensive one are
+    submitted; everything else, including cheap subtrees, is evaluated inline.
+
+    Results are the same as EvaluatorRPN.evaluate_of_rpn. Errors too: an error is
+    raised only after every submitted subtree that comes before it in the RPN has
+    finished, and the first error in RPN order is raised. A malformed RPN is
+    evaluated by the evaluator to keep its errors
+
+    Parameters:
+        evaluator (EvaluatorRPN): evaluator of the inline part, without a budget
+        executor (Executor): pool for the subtrees
+        task (Callable | None): called in the executor with a slice of the RPN and
+            the variables it uses, defaults to evaluator.evaluate_of_rpn (for threads)
+        min_cost (int): estimated cost of a subtree worth submitting
+
+    """
+    def __init__(self, evaluator: EvaluatorRPN, executor: Executor,
+                 task: Callable[[list[Token], dict[str, Any]], Any] | None = None,
+                 min_cost: int = MIN_PARALLEL_COST):
+        if evaluator.budget is not None:
+            raise ValueError('Evaluation budgets are not supported by parallel evaluation')
+        self.evaluator = evaluator
+        self.executor = executor
+        self.task = task or evaluator.evaluate_of_rpn
+        self.min_cost = min_cost
+        self.operations = evaluator.operations
+        self.registry = evaluator.backend.registry
+        self.exact_division = evaluator.backend.name == 'fraction'
+
+    def plan(self, rpn: list[Token], variables: dict[str, Any] | None = None) -> list[tuple[int, int]] | None:
+        """
+        Chooses the subtrees to submit.
+
+        Parameters:
+            rpn (list[Token]): tokens in RPN order.
+            variables (dict[str, Any] | None): values of named variables.
+
+        Returns:
+            list[tuple[int, int]] | None: start and end (inclusive) of every submitted
+            slice of the RPN in RPN order, None if the RPN is malformed.
+        """
+
+        starts, children, costs = self._tree(rpn, variables)
+        if not costs:
+            return None
+
+        min_cost = self.min_cost
+        submitted: list[tuple[int, int]] = []
+        index = len(rpn) - 1
+        while index is not None:
+            heavy = [child for child in children[index] if costs[child] >= min_cost]
+            if len(heavy) >= 2:
+                kept = max(heavy, key=costs.__getitem__)
+                submitted.extend((starts[child], child) for child in heavy if child != kept)
+            else:
+                kept = heavy[0] if heavy else None
+            index = kept
+        submitted.sort()
+        return submitted
+
+    def _tree(self, rpn: list[Token], variables: dict[str, Any] | None) -> tuple[list, list, list]:
+        """
+        Builds the expression tree: for every RPN index the start of its subtree,
+        the indexes of its children and the estimated cost of the subtree.
+        All lists are empty if the RPN is malformed.
+        """
+
+        operations = self.operations
+        registry = self.registry
+        starts: list[int] = []
+        children: list[tuple[int, ...]] = []
+        costs: list[int] = []
+        bits: list[int | None] = []
+        # Values of literals and variables, for exponents
+        values: list[Any] = []
+        stack: list[int] = []
+
+        for index, token in enumerate(rpn):
+            value = token.value
+            if token.opcode is not None:
+                arity = operations[token.opcode][1]
+                if len(stack) < arity:
+                    return [], [], []
+                arguments = tuple(stack[-arity:])
+                del stack[-arity:]
+                name = registry.names[token.opcode]
+                result_bits, cost = self._estimate(name, registry.kinds[token.opcode],
+                                                   [bits[i] for i in arguments], values[arguments[-1]])
+                starts.append(starts[arguments[0]])
+                children.append(arguments)
+                costs.append(cost + sum(costs[i] for i in arguments))
+                bits.append(result_bits)
+                values.append(None)
+            elif isinstance(value, NUMBER_TYPES) or isinstance(value, Variable):
+                if isinstance(value, Variable):
+                    value = variables.get(value.name) if variables is not None else None
+                starts.append(index)
+                children.append(())
+                costs.append(0)
+                bits.append(_bits(value))
+                values.append(value)
+            else:
+                return [], [], []
+            stack.append(index)
+
+        if len(stack) != 1:
+            return [], [], []
+        return starts, children, costs
+
+    def _estimate(self, name: str, kind: str, bits: list[int | None], last: Any) -> tuple[int | None, int]:
+        """
+        Estimated bit length of the result and cost of one operation.
+
+        Parameters:
+            name (str): operator or function.
+            kind (str): BINARY, UNARY or FUNCTION.
+            bits (list[int | None]): bit lengths of the operands, None for inexact numbers.
+            last (Any): value of the last operand if it is a literal or a variable.
+        """
+
+        if kind == UNARY:
+            return bits[0], 0 if bits[0] is None else bits[0] // 30 + 1
+        known = [length for length in bits if length is not None]
+        if len(known) != len(bits):
+            return None, 1
+        if kind != BINARY:
+            # sqrt gives a float, the others are assumed to return one of their arguments
+            result_bits = None if name == 'sqrt' else max(known)
+            return result_bits, sum(length // 30 + 1 for length in known)
+
+        left, right = known
+        if name == '+' or name == '-':
+            return max(left, right) + 1, max(left, right) // 30 + 1
+        if name == '*':
+            return left + right, multiplication_cost(left, right)
+        if name == '**':
+            if type(last) is int:
+                if last < 0 or last > MAX_POWER:
+                    return None, 1
+                exponent = last
+            else:
+                exponent = min(1 << min(right, 10), MAX_POWER)
+            result_bits = left * exponent
+            return result_bits, 2 * multiplication_cost(result_bits // 2, result_bits // 2)
+        if name == '/':
+            return (left + right if self.exact_division else None), multiplication_cost(left, right)
+        if name == '//':
+            return max(left - right, 1), multiplication_cost(left, right)
+        return right, multiplication_cost(left, right)
+
+    def evaluate_of_rpn(self, rpn: list[Token], variables: dict[str, int | float] | None = None) -> int | float:
+        """
+        Evaluates an RPN, submitting expensive independent subtrees to the executor.
+
+        Parameters:
+            rpn (list[Token]): tokens in RPN order.
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: the result of EvaluatorRPN.evaluate_of_rpn.
+
+        Exceptions:
+            The errors of EvaluatorRPN.evaluate_of_rpn.
+        """
+
+        submitted = self.plan(rpn, variables)
+        if not submitted:
+            return self.evaluator.evaluate_of_rpn(rpn, variables)
+
+        pending: dict[int, tuple[int, Future]] = {}
+        for start, end in submitted:
+            used = {token.value.name for token in rpn[start:end + 1] if isinstance(token.value, Variable)}
+            arguments = {name: variables[name] for name in used if name in variables} if variables else {}
+            pending[start] = (end, self.executor.submit(self.task, rpn[start:end + 1], arguments))
+
+        try:
+            return self._evaluate(rpn, variables, pending)
+        finally:
+            for _, future in pending.values():
+                future.cancel()
+
+    def _evaluate(self, rpn: list[Token], variables: dict[str, int | float] | None,
+                  pending: dict[int, tuple[int, Future]]) -> int | float:
+        operations = self.operations
+        # Values and futures of submitted subtrees
+        stack: list[Any] = []
+        index = 0
+        n = len(rpn)
+
+        while index < n:
+            entry = pending.get(index)
+            if entry is not None:
+                end, future = entry
+                stack.append(future)
+                index = end + 1
+                continue
+
+            token = rpn[index]
+            try:
+                opcode = token.opcode
+                if opcode is not None:
+                    op_func, arity = operations[opcode]
+                    arguments = stack[-arity:]
+                    del stack[-arity:]
+                    for i, argument in enumerate(arguments):
+                        if isinstance(argument, Future):
+                            arguments[i] = argument.result()
+                    stack.append(op_func(*arguments))
+                elif isinstance(token.value, NUMBER_TYPES):
+                    stack.append(token.value)
+                else:
+                    name = token.value.name
+                    if variables is None or name not in variables:
+                        raise ParsingError(name, token.position, 'Unknown variable')
+                    stack.append(variables[name])
+            except Exception:
+                self._raise_earlier(index, pending)
+                raise
+            index += 1
+
+        # The root is never submitted
+        return stack[0]
+
+    @staticmethod
+    def _raise_earlier(index: int, pending: dict[int, tuple[int, Future]]) -> None:
+        # The serial evaluator would have failed in a subtree before index first
+        for start in sorted(pending):
+            if start >= index:
+                break
+            future = pending[start][1]
+            if future.exception() is not None:
+                future.result()
@@ -0,0 +1,137 @@
+from .tokenizer import Token, Variable, NUMBER_TYPES
+from .shunting_yard import ShunringYardAlgorithm
+from .evaluator import EvaluatorRPN
+from .backends import NumericBackend, NATIVE_BACKEND
+from .registry import BINARY, UNARY
+
+from typing import Any
+
+
+class _Mismatch(Exception):
+    """
+    The tokens are not a well-formed infix expression (or a variable is unbound)
+    """
+
+
+class _Parser:
+    __slots__ = ('tokens', 'index', 'variables', 'operations', 'kinds', 'priorities', 'right_associative')
+
+    def __init__(self, tokens: list[Token], variables: dict[str, int | float], backend: NumericBackend):
+        self.tokens = tokens
+        self.index = 0
+        self.variables = variables
+        self.operations = backend.operations
+        self.kinds = backend.registry.kinds
+        self.priorities = backend.registry.priorities
+        self.right_associative = backend.registry.right_associative
+
+    def expression(self, min_priority: int) -> Any:
+        left = self.operand()
+        tokens = self.tokens
+        n = len(tokens)
+        kinds = self.kinds
+
+        while self.index < n:
+            opcode = tokens[self.index].opcode
+            if opcode is None or kinds[opcode] != BINARY:
+                break
+
+            priority = self.priorities[opcode]
+            if priority < min_priority:
+                break
+
+            self.index += 1
+            right = self.expression(priority if self.right_associative[opcode] else priority + 1)
+            left = self.operations[opcode][0](left, right)
+
+        return left
+
+    def operand(self) -> Any:
+        if self.index >= len(self.tokens):
+            raise _Mismatch
+        token = self.tokens[self.index]
+        value = token.value
+        self.index += 1
+
+        if isinstance(value, NUMBER_TYPES):
+            return value
+        if isinstance(value, Variable):
+            if value.name not in self.variables:
+                raise _Mismatch
+            return self.variables[value.name]
+        if value == '(':
+            result = self.expression(0)
+            if self.index >= len(self.tokens) or self.tokens[self.index].value != ')':
+                raise _Mismatch
+            self.index += 1
+            return result
+        opcode = token.opcode
+        if opcode is None or self.kinds[opcode] == BINARY:
+            raise _Mismatch
+        op_func, arity = self.operations[opcode]
+        if self.kinds[opcode] == UNARY:
+            return op_func(self.expression(self.priorities[opcode] + 1))
+        return op_func(*self.arguments(arity))
+
+    def arguments(self, arity: int) -> list[Any]:
+        tokens = self.tokens
+        if self.index >= len(tokens) or tokens[self.index].value != '(':
+            raise _Mismatch
+        self.index += 1
+        arguments = [self.expression(0)]
+        while self.index < len(tokens) and tokens[self.index].value == ',':
+            self.index += 1
+            arguments.append(self.expression(0))
+        if len(arguments) != arity or self.index >= len(tokens) or tokens[self.index].value != ')':
+            raise _Mismatch
+        self.index += 1
+        return arguments
+
+
+class PrattEvaluator:
+    """
+    Evaluates infix tokens while parsing them with precedence climbing,
+    without building an RPN list. Priorities and associativity come from the
+    same operator tables as the shunting-yard.
+
+    Results and errors are identical to ShunringYardAlgorithm + EvaluatorRPN:
+    if the tokens are not a well-formed expression or an operation fails,
+    the tokens are passed to that pipeline, which reports the error at the
+    same position as without this evaluator
+
+    """
+    def __init__(self, backend: NumericBackend = NATIVE_BACKEND):
+        self.backend = backend
+        self.shunting_yard = ShunringYardAlgorithm(backend.registry)
+        self.evaluator = EvaluatorRPN(backend=backend)
+
+    def evaluate(self, tokens: list[Token], variables: dict[str, int | float] | None = None) -> int | float:
+        """
+        Evaluates an expression given as infix tokens.
+
+        Parameters:
+            tokens (List[Token]): infix tokens.
+            variables (dict[str, int | float] | None): values of named variables.
+
+        Returns:
+            int | float: computed result.
+
+        Exceptions:
+            ParsingError:
+                - Errors of the shunting-yard and the evaluator
+            ValueError:
+                - Arithemtic errors inside operators
+        """
+
+        if variables is None:
+            variables = {}
+
+        parser = _Parser(tokens, variables, self.backend)
+        try:
+            result = parser.expression(0)
+            if parser.index == len(tokens):
+                return result
+        except (_Mismatch, ValueError, ArithmeticError, RecursionError):
+            pass
+
+        return self.evaluator.evaluate_of_rpn(self.shunting_yard.shunting_yard(tokens), variables)
@@ -0,0 +1,108 @@
+from .operators import BINARY_OPERATORS, UNARY_OPERATORS, FUNCTIONS
+
+from typing import Callable
+
+BINARY = 'binary'
+UNARY = 'unary'
+FUNCTION = 'function'
+
+
+class OperatorRegistry:
+    """
+    Assigns integer opcodes to operators and functions. Tokens carry their opcode,
+    so the shunting-yard and the evaluators index lists instead of hashing strings.
+
+    Operators come first in the order of BINARY_OPERATORS and UNARY_OPERATORS, then the
+    functions of FUNCTIONS, so the opcodes of built-in names are the same in every registry.
+    Functions registered later get the next opcodes and never change the existing ones
+
+    """
+    def __init__(self):
+        self.opcodes: dict[str, int] = {}
+        self.names: list[str] = []
+        self.kinds: list[str] = []
+        self.arities: list[int] = []
+        # Priority and associativity of operators, functions have 0 and are placed by their brackets
+        self.priorities: list[int] = []
+        self.right_associative: list[bool] = []
+        # Implementations of registered functions, the same for every numeric backend
+        self.functions: dict[str, tuple[Callable, int]] = {}
+
+        for name, (_, priority, associativity) in BINARY_OPERATORS.items():
+            self._add(name, BINARY, 2, priority, associativity)
+        for name, (_, priority, associativity) in UNARY_OPERATORS.items():
+            self._add(name, UNARY, 1, priority, associativity)
+        for name, (_, arity) in FUNCTIONS.items():
+            self._add(name, FUNCTION, arity)
+
+    def _add(self, name: str, kind: str, arity: int, priority: int = 0,
+             associativity: str = 'left') -> int:
+        opcode = self.opcodes[name] = len(self.names)
+        self.names.append(name)
+        self.kinds.append(kind)
+        self.arities.append(arity)
+        self.priorities.append(priority)
+        self.right_associative.append(associativity == 'right')
+        return opcode
+
+    def register_function(self, name: str, func: Callable, arity: int) -> int:
+        """
+        Registers a function called as name(a, b, ...) with a fixed number of arguments.
+
+        Parameters:
+            name (str): name of the function, it can not be used as a variable.
+            func (Callable): the function, called with the values of the arguments.
+                A ValueError it raises becomes a calculation error.
+            arity (int): number of arguments, at least 1.
+
+        Returns:
+            int: opcode of the function.
+
+        Exceptions:
+            ValueError:
+                - The name is not a valid name or is already registered
+                - The arity is less than 1
+        """
+
+        if not name.isidentifier():
+            raise ValueError(f"Invalid function name '{name}'")
+        if name in self.opcodes:
+            raise ValueError(f"'{name}' is already registered")
+        if arity < 1:
+            raise ValueError('A function needs at least one argument')
+        self.functions[name] = (func, arity)
+        return self._add(name, FUNCTION, arity)
+
+    def copy(self) -> 'OperatorRegistry':
+        registry = OperatorRegistry()
+        for name, (func, arity) in self.functions.items():
+            registry.register_function(name, func, arity)
+        return registry
+
+    def operations(self, binary_operators: dict, unary_operators: dict,
+                   functions: dict) -> list[tuple[Callable, int]]:
+        """
+        Builds the dispatch table of a numeric backend.
+
+        Parameters:
+            binary_operators (dict): table in the format of BINARY_OPERATORS.
+            unary_operators (dict): table in the format of UNARY_OPERATORS.
+            functions (dict): table in the format of FUNCTIONS, registered functions
+                are added to it.
+
+        Returns:
+            list[tuple[Callable, int]]: function and arity of every opcode.
+        """
+
+        operations = []
+        for name, kind, arity in zip(self.names, self.kinds, self.arities):
+            if kind == BINARY:
+                operations.append((binary_operators[name][0], arity))
+            elif kind == UNARY:
+                operations.append((unary_operators[name][0], arity))
+            else:
+                operations.append(((self.functions.get(name) or functions[name])[0], arity))
+        return operations
+
+
+DEFAULT_REGISTRY = OperatorRegistry()
@@ -0,0 +1,318 @@
+from .tokenizer import Token, Variable
+from .evaluator import EvaluatorRPN
+from .budget import EvaluationBudget
+from .backends import get_backend
+from .compiler import CompiledExpression
+from .errors import LibraryFormatError
+
+from array import array
+from decimal import Context, Decimal
+from fractions import Fraction
+from typing import Any, Iterable
+import mmap
+import struct
+import sys
+import zlib
+
+# File layout, little-endian:
+#   header      magic, version, reserved, expressions, instructions, constants, data size, crc32 of the rest
+#   table       uint32 pairs (first instruction, instruction count) per expression
+#   operands    uint32 per instruction, index in the constant pool of a number or a variable name
+#   positions   uint32 per instruction, position of the token in the source expression
+#   offsets     uint32 per constant + 1, offsets of the constants in the data
+#   opcodes     uint8 per instruction
+#   data        per constant: kind byte and its bytes
+MAGIC = b'CRPN'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIII')
+
+OP_NUMBER = 0
+OP_NAME = 1
+# Opcodes of operators and built-in functions are 2 + index in this tuple; the order is part of
+# the format, names may only be appended
+OPERATOR_CODES = ('+', '-', '*', '/', '**', '//', '%', '~', '$', 'sqrt', 'max', 'min')
+_OPERATOR_OPCODES = {symbol: 2 + index for index, symbol in enumerate(OPERATOR_CODES)}
+
+KIND_INT = 0
+KIND_FLOAT = 1
+KIND_NAME = 2
+KIND_FRACTION = 3
+KIND_DECIMAL = 4
+_FLOAT = struct.Struct('<d')
+
+
+def _encode_constant(value: Any) -> bytes:
+    if isinstance(value, Variable):
+        return bytes((KIND_NAME,)) + value.name.encode()
+    if type(value) is int:
+        return bytes((KIND_INT,)) + value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    if type(value) is float:
+        return bytes((KIND_FLOAT,)) + _FLOAT.pack(value)
+    if type(value) is Fraction:
+        return bytes((KIND_FRACTION,)) + str(value).encode()
+    if type(value) is Decimal:
+        return bytes((KIND_DECIMAL,)) + str(value).encode()
+    if type(value) is str:
+        raise TypeError(f"Can not serialize the user-defined function '{value}'")
+    raise TypeError(f'Can not serialize a constant of type {type(value).__name__}')
+
+
+def _decode_constant(data: bytes) -> Any:
+    kind, body = data[0], data[1:]
+    if kind == KIND_INT:
+        return int.from_bytes(body, 'little', signed=True)
+    if kind == KIND_FLOAT:
+        if len(body) != _FLOAT.size:
+            raise ValueError(f'a float must have {_FLOAT.size} bytes, not {len(body)}')
+        return _FLOAT.unpack(body)[0]
+    if kind == KIND_NAME:
+        return Variable(body.decode())
+    if kind == KIND_FRACTION:
+        return Fraction(body.decode())
+    return Decimal(body.decode())
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_library(path: str, rpns: Iterable[list[Token]]) -> int:
+    """
+    Writes compiled expressions to a binary file for ExpressionLibrary.
+
+    Parameters:
+        path (str): file to write.
+        rpns (Iterable[List[Token]]): expressions in RPN order, e.g. from Calculator.to_rpn.
+
+    Returns:
+        int: number of written expressions.
+
+    Exceptions:
+        TypeError:
+            - A token is not a number, a variable or a name of OPERATOR_CODES
+              (user-defined functions can not be stored)
+    """
+
+    table = array('I')
+    operands = array('I')
+    positions = array('I')
+    opcodes = array('B')
+    constants: dict[bytes, int] = {}
+    pool: list[bytes] = []
+
+    for rpn in rpns:
+        table.append(len(opcodes))
+        table.append(len(rpn))
+        for token in rpn:
+            value = token.value
+            opcode = _OPERATOR_OPCODES.get(value) if isinstance(value, str) else None
+            if opcode is None:
+                encoded = _encode_constant(value)
+                index = constants.setdefault(encoded, len(pool))
+                if index == len(pool):
+                    pool.append(encoded)
+                opcode = OP_NAME if isinstance(value, Variable) else OP_NUMBER
+            else:
+                index = 0
+            opcodes.append(opcode)
+            operands.append(index)
+            positions.append(token.position)
+
+    offsets = array('I', [0])
+    for encoded in pool:
+        offsets.append(offsets[-1] + len(encoded))
+    data = b''.join(pool)
+
+    body = b''.join((_little_endian(table), _little_endian(operands), _little_endian(positions),
+                     _little_endian(offsets), opcodes.tobytes(), data))
+    header = HEADER.pack(MAGIC, VERSION, 0, len(table) // 2, len(opcodes), len(pool), len(data), zlib.crc32(body))
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(body)
+    return len(table) // 2
+
+
+class ExpressionLibrary:
+    """
+    Compiled expressions loaded from a file of write_library through a read-only mmap.
+    Every process that opens the file shares its pages; an expression is turned into
+    tokens on first use without tokenizing or the shunting-yard.
+
+    The header, sizes, checksum and every instruction are checked when the file is
+    opened, a corrupt file raises LibraryFormatError. A library is pickled by its path,
+    backend and budget, so it can be sent to worker processes, which open the file
+    themselves. Functions are not pickled, a library has only the built-in ones
+
+    Parameters:
+        path (str): file written by write_library
+        evaluator (EvaluatorRPN | None): evaluator (backend, budget) of evaluate
+
+    """
+    def __init__(self, path: str, evaluator: EvaluatorRPN | None = None):
+        self.path = path
+        self.evaluator = evaluator or EvaluatorRPN()
+        with open(path, 'rb') as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can not be mapped
+                raise LibraryFormatError(f'{path}: not a library of compiled expressions') from None
+        error: LibraryFormatError | None = None
+        try:
+            self._load()
+        except LibraryFormatError as e:
+            error = LibraryFormatError(*e.args)
+        if error is not None:
+            # The traceback of the first error, which holds views of the map, is gone here
+            self._map.close()
+            raise error
+        self._constants: dict[int, Any] = {}
+        self._compiled: dict[int, CompiledExpression] = {}
+
+    def _section(self, start: int, count: int) -> memoryview:
+        view = memoryview(self._map)[start:start + 4 * count].cast('I')
+        if sys.byteorder == 'big':
+            values = array('I', view)
+            values.byteswap()
+            return memoryview(values)
+        return view
+
+    def _load(self) -> None:
+        size = len(self._map)
+        if size < HEADER.size:
+            raise LibraryFormatError(f'{self.path}: not a library of compiled expressions')
+        magic, version, _, expressions, instructions, constants, data_size, crc = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise LibraryFormatError(f'{self.path}: not a library of compiled expressions')
+        if version != VERSION:
+            raise LibraryFormatError(f'{self.path}: unsupported version {version}, expected {VERSION}')
+
+        table_start = HEADER.size
+        operands_start = table_start + 8 * expressions
+        positions_start = operands_start + 4 * instructions
+        offsets_start = positions_start + 4 * instructions
+        opcodes_start = offsets_start + 4 * (constants + 1)
+        data_start = opcodes_start + instructions
+        if data_start + data_size != size:
+            raise LibraryFormatError(f'{self.path}: size {size} does not match the header')
+        if zlib.crc32(memoryview(self._map)[HEADER.size:]) != crc:
+            raise LibraryFormatError(f'{self.path}: checksum mismatch')
+
+        table = self._section(table_start, 2 * expressions)
+        operands = self._section(operands_start, instructions)
+        offsets = self._section(offsets_start, constants + 1)
+        opcodes = memoryview(self._map)[opcodes_start:data_start]
+        data = memoryview(self._map)[data_start:]
+
+        end = 0
+        for i in range(expressions):
+            if table[2 * i] != end:
+                raise LibraryFormatError(f'{self.path}: expression {i} does not follow the previous one')
+            end += table[2 * i + 1]
+        if end != instructions:
+            raise LibraryFormatError(f'{self.path}: expressions do not cover the instructions')
+
+        if offsets[0] != 0 or offsets[constants] != data_size:
+            raise LibraryFormatError(f'{self.path}: invalid constant pool')
+        kinds = []
+        for i in range(constants):
+            if offsets[i + 1] <= offsets[i] or data[offsets[i]] > KIND_DECIMAL:
+                raise LibraryFormatError(f'{self.path}: invalid constant {i}')
+            kinds.append(data[offsets[i]])
+
+        last_opcode = 1 + len(OPERATOR_CODES)
+        for i in range(instructions):
+            opcode = opcodes[i]
+            if opcode > last_opcode:
+                raise LibraryFormatError(f'{self.path}: invalid opcode {opcode} at instruction {i}')
+            if opcode <= OP_NAME:
+                index = operands[i]
+                if index >= constants or (kinds[index] == KIND_NAME) != (opcode == OP_NAME):
+                    raise LibraryFormatError(f'{self.path}: invalid operand at instruction {i}')
+
+        self._table = table
+        self._operands = operands
+        self._positions = self._section(positions_start, instructions)
+        self._offsets = offsets
+        self._opcodes = opcodes
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._table) // 2
+
+    def _constant(self, index: int) -> Any:
+        value = self._constants.get(index)
+        if value is None:
+            encoded = bytes(self._data[self._offsets[index]:self._offsets[index + 1]])
+            try:
+                value = _decode_constant(encoded)
+            except (ValueError, ArithmeticError) as e:
+                raise LibraryFormatError(f'{self.path}: invalid constant {index}: {e}') from None
+            self._constants[index] = value
+        return value
+
+    def rpn(self, index: int) -> list[Token]:
+        """
+        Returns the tokens of an expression in RPN order, with their source positions.
+
+        Parameters:
+            index (int): number of the expression in the order it was written.
+
+        Returns:
+            List[Token]: tokens in RPN order.
+        """
+
+        if not 0 <= index < len(self):
+            raise IndexError(f'Expression {index} out of range')
+        start = self._table[2 * index]
+        end = start + self._table[2 * index + 1]
+        constants = self._constants
+        constant = self._constant
+        return [
+            Token(OPERATOR_CODES[opcode - 2] if opcode > OP_NAME else
+                  constants[operand] if operand in constants else constant(operand), position)
+            for opcode, operand, position in zip(self._opcodes[start:end], self._operands[start:end],
+                                                 self._positions[start:end])
+        ]
+
+    def compile(self, index: int) -> CompiledExpression:
+        """
+        Returns the compiled expression, created on first use and then reused.
+        """
+
+        compiled = self._compiled.get(index)
+        if compiled is None:
+            compiled = self._compiled[index] = CompiledExpression(self.rpn(index), self.evaluator)
+        return compiled
+
+    def evaluate(self, index: int, variables: dict[str, Any] | None = None) -> Any:
+        """
+        Evaluates an expression, errors are the same as of CompiledExpression.evaluate.
+        """
+
+        return self.compile(index).evaluate(variables)
+
+    def close(self) -> None:
+        # Views of the map must be released before it can be closed
+        for view in (self._table, self._operands, self._positions, self._offsets, self._opcodes, self._data):
+            view.release()
+        self._map.close()
+
+    def __enter__(self) -> 'ExpressionLibrary':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> tuple:
+        backend = self.evaluator.backend
+        return (_open_library, (self.path, backend.name, backend.context, self.evaluator.budget))
+
+
+def _open_library(path: str, backend: str, context: Context | None,
+                  budget: EvaluationBudget | None) -> ExpressionLibrary:
+    # Opens a pickled library in a worker process
+    return ExpressionLibrary(path, EvaluatorRPN(budget, get_backend(backend, context)))
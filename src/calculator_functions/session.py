@@ -0,0 +1,171 @@
+from .calculator import Calculator
+from .compiler import CompiledExpression
+from .dag import ExpressionDAG
+from .errors import ParsingError
+from .tokenizer import Variable
+
+from collections import ChainMap
+from typing import Any, NamedTuple
+import re
+
+# 'name = expression', the name is a variable name of the tokenizer
+_ASSIGNMENT = re.compile(r'\s*([^\W\d]\w*)\s*=(.*)', re.DOTALL)
+
+ANSWER = 'ans'
+
+
+class SessionResult(NamedTuple):
+    name: str | None
+    value: Any
+    updated: dict[str, Any]
+
+
+class Session:
+    """
+    Named results of an interactive session, kept in a dependency graph like
+    the cells of a spreadsheet: 'a = 2 ** 500', 'b = a * 3', then 'a = 7'
+    recomputes b. 'ans' is the result of the last line, it is bound when a
+    definition is made and does not make the definition depend on later lines.
+
+    Every definition is compiled once; redefining a name evaluates only the
+    definitions that depend on it, with their compiled expressions
+
+    Parameters:
+        calculator (Calculator | None): calculator that compiles the expressions
+
+    """
+    def __init__(self, calculator: Calculator | None = None):
+        self.calculator = calculator or Calculator(cache_size=256)
+        self.definitions: dict[str, CompiledExpression | ExpressionDAG] = {}
+        self.values: dict[str, Any] = {}
+        # name -> names whose definitions use it
+        self.dependents: dict[str, set[str]] = {}
+        # name -> value of 'ans' when the name was defined
+        self.answers: dict[str, Any] = {}
+
+    def execute(self, line: str) -> SessionResult:
+        """
+        Executes an assignment 'name = expression' or evaluates an expression.
+
+        Parameters:
+            line (str): input line, error positions refer to it.
+
+        Returns:
+            SessionResult: assigned name (None for an expression), value and
+            recomputed dependents (a value or a ParsingError per name).
+
+        Exceptions:
+            ParsingError:
+                - Errors of the calculator
+                - Circular reference
+                - Invalid assignment
+        """
+
+        match = _ASSIGNMENT.fullmatch(line)
+        if match is None:
+            return SessionResult(None, self.evaluate(line), {})
+        name, expression = match.groups()
+        value, updated = self.assign(name, expression, match.start(2), match.start(1))
+        return SessionResult(name, value, updated)
+
+    def evaluate(self, expression: str, offset: int = 0) -> Any:
+        """
+        Evaluates an expression with the named results and stores the result as 'ans'.
+        """
+
+        value = self.calculator.compile(' ' * offset + expression).evaluate(self.values)
+        self.values[ANSWER] = value
+        return value
+
+    def assign(self, name: str, expression: str, offset: int = 0,
+               name_position: int = 0) -> tuple[Any, dict[str, Any]]:
+        """
+        Defines or redefines a name and recomputes the definitions that depend on it.
+
+        Parameters:
+            name (str): defined name.
+            expression (str): its expression.
+            offset (int): position of the expression in the input line.
+            name_position (int): position of the name in the input line.
+
+        Returns:
+            tuple[Any, dict[str, Any]]: value of the name and recomputed dependents
+            in the order they were evaluated. A dependent that fails gets its
+            ParsingError and is undefined until its inputs change again.
+        """
+
+        # 'ans' and the names of functions can not be redefined
+        if name == ANSWER or name in self.calculator.backend.registry.opcodes:
+            raise ParsingError(name, name_position, 'Invalid assignment')
+
+        compiled = self.calculator.compile(' ' * offset + expression)
+        uses = compiled.variables
+
+        affected = self._affected(name)
+        cycle = next((used for used in uses if used == name or used in affected), None)
+        if cycle is not None:
+            position = next(token.position for token in compiled.rpn
+                            if isinstance(token.value, Variable) and token.value.name == cycle)
+            raise ParsingError(cycle, position, 'Circular reference')
+
+        value = compiled.evaluate(self.values)
+
+        for used in self._uses(name):
+            self.dependents[used].discard(name)
+        for used in uses:
+            if used != ANSWER:
+                self.dependents.setdefault(used, set()).add(name)
+        self.definitions[name] = compiled
+        if ANSWER in uses:
+            self.answers[name] = self.values[ANSWER]
+        else:
+            self.answers.pop(name, None)
+        self.values[name] = value
+        self.values[ANSWER] = value
+
+        updated = {}
+        for dependent in affected:
+            try:
+                updated[dependent] = self._recompute(dependent)
+            except ParsingError as e:
+                self.values.pop(dependent, None)
+                updated[dependent] = e
+        return value, updated
+
+    def _uses(self, name: str) -> list[str]:
+        compiled = self.definitions.get(name)
+        if compiled is None:
+            return []
+        return [used for used in compiled.variables if used != ANSWER]
+
+    def _recompute(self, name: str) -> Any:
+        compiled = self.definitions[name]
+        if name in self.answers:
+            variables: Any = ChainMap({ANSWER: self.answers[name]}, self.values)
+        else:
+            variables = self.values
+        value = compiled.evaluate(variables)
+        self.values[name] = value
+        return value
+
+    def _affected(self, name: str) -> list[str]:
+        """
+        Returns the definitions that depend on a name directly or indirectly,
+        each after the definitions it uses.
+        """
+
+        order = []
+        seen = {name}
+        stack = [(name, iter(self.dependents.get(name, ())))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append((child, iter(self.dependents.get(child, ()))))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+        order.reverse()
+        return order[1:]
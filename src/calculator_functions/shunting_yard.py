@@ -1,8 +1,18 @@
-from .tokenizer import Token
+from .tokenizer import Token, OPERAND_TYPES
 from .errors import ParsingError
-from .operators import OPERATORS
+from .registry import OperatorRegistry, DEFAULT_REGISTRY, FUNCTION
+
+from typing import Iterable, Iterator
 
 class ShunringYardAlgorithm:
+    """
+    Parameters:
+        registry (OperatorRegistry): priorities, associativity and arities by opcode
+
+    """
+    def __init__(self, registry: OperatorRegistry = DEFAULT_REGISTRY):
+        self.registry = registry
+
     def shunting_yard(self, tokens: list[Token]) -> list[Token]:
             """
             Converts a list of infix tokens to Reverse Polish Notation (RPN)
@@ -18,50 +28,127 @@ class ShunringYardAlgorithm:
                 ParsingError:
                     - Unbalanced brackets
                     - Unknown operator
+                    - Invalid function call
+                    - Invalid number of arguments
+            """
+
+            return self.shunting_yard_with_depth(tokens)[0]
+
+    def shunting_yard_with_depth(self, tokens: list[Token]) -> tuple[list[Token], int]:
+            """
+            Same as shunting_yard, but also reports the maximum depth of the operator stack
+
+            Arguments:
+                tokens (List[Token]): infix tokens
+
+            Return:
+                tuple[List[Token], int]: tokens in RPN order and the maximum stack depth
+
+            Exceptions:
+                ParsingError:
+                    - Unbalanced brackets
+                    - Unknown operator
+                    - Invalid function call
+                    - Invalid number of arguments
+            """
+
+            depth = [0]
+            output = list(self._rpn(tokens, depth))
+            return output, depth[0]
+
+    def iter_rpn(self, tokens: Iterable[Token]) -> Iterator[Token]:
+            """
+            Converts infix tokens to RPN lazily: every token is yielded as soon as
+            the shunting-yard moves it to the output, so only the operator stack is kept
+
+            Arguments:
+                tokens (Iterable[Token]): infix tokens, e.g. from Tokenizer.iter_tokens
+
+            Return:
+                Iterator[Token]: tokens in RPN order
+
+            Exceptions:
+                ParsingError:
+                    - Unbalanced brackets
+                    - Unknown operator
+                    - Invalid function call
+                    - Invalid number of arguments
             """
 
-            output = []
-            stack = []
+            return self._rpn(tokens, [0])
+
+    def _rpn(self, tokens: Iterable[Token], depth: list[int]) -> Iterator[Token]:
+            # The shunting-yard of iter_rpn, depth[0] is raised to the maximum depth of the operator stack
+            stack: list[Token] = []
+            arguments: list[int | None] = []
+            registry = self.registry
+            priorities = registry.priorities
+            right_associative = registry.right_associative
+            kinds = registry.kinds
+            function = None
 
             for token in tokens:
-                if isinstance(token.value, (int, float)):
-                    output.append(token)
+                if function is not None and token.value != '(':
+                    raise ParsingError(function.value, function.position, 'Invalid function call')
+
+                if isinstance(token.value, OPERAND_TYPES):
+                    yield token
                 elif token.value == '(':
                     stack.append(token)
+                    arguments.append(None if function is None else 1)
+                    function = None
+                    if len(stack) > depth[0]:
+                        depth[0] = len(stack)
                 elif token.value == ')':
                     while stack and stack[-1].value != '(':
-                        output.append(stack.pop())
+                        yield stack.pop()
                     if not stack:
                         raise ParsingError(token.value,token.position,'Unbalanced brackets')
                     stack.pop()
+                    count = arguments.pop()
+                    if count is not None:
+                        yield self._call(stack.pop(), count)
+                elif token.value == ',':
+                    while stack and stack[-1].value != '(':
+                        yield stack.pop()
+                    if not stack or arguments[-1] is None:
+                        raise ParsingError(token.value, token.position, 'Invalid function call')
+                    arguments[-1] += 1
 
                 else:
-                    op_info = OPERATORS.get(token.value)
-                    if not op_info:
+                    opcode = token.opcode
+                    if opcode is None:
                         raise ParsingError(token.value, token.position, 'Unknown operator')
 
-                    _, priority, associativity = op_info
-
-                    while stack and stack[-1].value != '(':
-                        top_token = stack[-1]
-                        top_op_info = OPERATORS.get(top_token.value)
-                        if top_op_info is None:
-                            break
+                    if kinds[opcode] == FUNCTION:
+                        function = token
+                    else:
+                        priority = priorities[opcode]
+                        right = right_associative[opcode]
 
-                        top_priority = top_op_info[1]
+                        # Brackets have no opcode
+                        while stack and (top := stack[-1].opcode) is not None:
+                            top_priority = priorities[top]
 
-                        if (associativity == 'left' and priority <= top_priority) or \
-                            (associativity == 'right' and priority < top_priority):
-                            output.append(stack.pop())
-                        else:
-                            break
+                            if priority < top_priority or (priority == top_priority and not right):
+                                yield stack.pop()
+                            else:
+                                break
 
                     stack.append(token)
+                    if len(stack) > depth[0]:
+                        depth[0] = len(stack)
+
+            if function is not None:
+                raise ParsingError(function.value, function.position, 'Invalid function call')
 
             while stack:
                 op_token = stack.pop()
                 if op_token.value == '(':
                     raise ParsingError(op_token.value, op_token.position, "Unbalanced brackets")
-                output.append(op_token)
+                yield op_token
 
-            return output
+    def _call(self, function: Token, count: int) -> Token:
+        if function.opcode is None or count != self.registry.arities[function.opcode]:
+            raise ParsingError(function.value, function.position, 'Invalid number of arguments')
+        return function
@@ -0,0 +1,181 @@
+from .tokenizer import Token, OPERAND_TYPES
+from .registry import OperatorRegistry, DEFAULT_REGISTRY
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any
+import threading
+
+STAGES = ('tokenize', 'shunting_yard', 'evaluate', 'total')
+
+# Upper bounds of histogram buckets in nanoseconds: 1us, 2us, 4us ... ~1s
+BUCKET_BOUNDS_NS = tuple(1000 * 2 ** k for k in range(21))
+
+
+def operand_stack_depth(rpn: list[Token], registry: OperatorRegistry = DEFAULT_REGISTRY) -> int:
+    """
+    Computes the maximum depth of the operand stack EvaluatorRPN reaches on an RPN
+    without evaluating it.
+
+    Parameters:
+        rpn (List[Token]): tokens in RPN order.
+        registry (OperatorRegistry): arities of the opcodes.
+
+    Returns:
+        int: maximum number of operands on the stack.
+    """
+
+    arities = registry.arities
+    depth = max_depth = 0
+    for token in rpn:
+        value = token.value
+        if isinstance(value, OPERAND_TYPES):
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        elif token.opcode is not None:
+            depth -= arities[token.opcode] - 1
+    return max_depth
+
+
+class LatencyHistogram:
+    """
+    Counts latencies in buckets whose bounds double, from 1 microsecond to about 1 second
+
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def percentile(self, fraction: float) -> int | None:
+        """
+        Returns the upper bound of the bucket that holds the given share of latencies.
+
+        Parameters:
+            fraction (float): share of latencies, 0.99 for p99.
+
+        Returns:
+            int | None: bound in nanoseconds, None if nothing was recorded or
+            the latency is above the last bound.
+        """
+
+        if not self.count:
+            return None
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_NS, self.counts):
+            seen += count
+            if seen >= fraction * self.count:
+                return bound
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.count if self.count else 0.0,
+            'p50_ns': self.percentile(0.50),
+            'p99_ns': self.percentile(0.99),
+            'buckets': {f'<={bound}': count for bound, count in zip(BUCKET_BOUNDS_NS, self.counts) if count},
+            'overflow': self.counts[-1],
+        }
+
+
+class CalculatorStats:
+    """
+    Per-stage timings, sizes and errors of the calculations of one Calculator.
+    Enabled with Calculator(instrument=True), read with snapshot().
+    Records and snapshots hold a lock, so threads sharing the calculator do not lose counts
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.tokens_total = 0
+            self.tokens_max = 0
+            self.max_operator_stack_depth = 0
+            self.max_operand_stack_depth = 0
+            self.errors_by_type: Counter[str] = Counter()
+            self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+    def record_stage(self, stage: str, elapsed_ns: int) -> None:
+        with self._lock:
+            self.histograms[stage].record(elapsed_ns)
+
+    def record_tokens(self, count: int) -> None:
+        with self._lock:
+            self.tokens_total += count
+            if count > self.tokens_max:
+                self.tokens_max = count
+
+    def record_operator_depth(self, depth: int) -> None:
+        with self._lock:
+            if depth > self.max_operator_stack_depth:
+                self.max_operator_stack_depth = depth
+
+    def record_operand_depth(self, depth: int) -> None:
+        with self._lock:
+            if depth > self.max_operand_stack_depth:
+                self.max_operand_stack_depth = depth
+
+    def record_call(self, elapsed_ns: int, error_type: str | None) -> None:
+        with self._lock:
+            self.calls += 1
+            self.histograms['total'].record(elapsed_ns)
+            if error_type is not None:
+                self.errors_by_type[error_type] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns a copy of the collected statistics.
+
+        Returns:
+            dict: calls, errors by ParsingError.error_type, token counts,
+            maximum stack depths and a latency histogram per stage.
+        """
+
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': sum(self.errors_by_type.values()),
+            'errors_by_type': dict(self.errors_by_type),
+            'tokens': {'total': self.tokens_total, 'max': self.tokens_max},
+            'max_operator_stack_depth': self.max_operator_stack_depth,
+            'max_operand_stack_depth': self.max_operand_stack_depth,
+            'stages': {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+        }
+
+    def format(self) -> str:
+        """
+        Formats the statistics as text for the command line.
+        """
+
+        snapshot = self.snapshot()
+        lines = [
+            f"Calls: {snapshot['calls']}, errors: {snapshot['errors']}",
+            f"Tokens: {snapshot['tokens']['total']} total, {snapshot['tokens']['max']} max",
+            f"Max stack depth: operators {snapshot['max_operator_stack_depth']}, "
+            f"operands {snapshot['max_operand_stack_depth']}",
+        ]
+        for error_type, count in sorted(snapshot['errors_by_type'].items()):
+            lines.append(f"  {error_type} errors: {count}")
+        for stage, histogram in snapshot['stages'].items():
+            if not histogram['count']:
+                continue
+            p50, p99 = histogram['p50_ns'], histogram['p99_ns']
+            lines.append(f"{stage:<14} count {histogram['count']:>8}  mean {histogram['mean_ns'] / 1e3:>9.1f} us  "
+                         f"p50 <= {p50 / 1e3 if p50 else float('inf'):.0f} us  "
+                         f"p99 <= {p99 / 1e3 if p99 else float('inf'):.0f} us")
+        return '\n'.join(lines)
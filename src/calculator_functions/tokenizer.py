@@ -1,15 +1,216 @@
 from .errors import ParsingError
 from .operators import OPERATORS, MAX_LENGTH_OF_NUMBER, CHARS_OF_OPERATOR
+from .registry import OperatorRegistry, DEFAULT_REGISTRY, FUNCTION
+
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from fractions import Fraction
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TextIO
+import re
+
+# Types of number literals of every numeric backend (see backends.py)
+NUMBER_TYPES = (int, float, Fraction, Decimal)
+
+# Captures the whitespace before a token and the token itself in the group of its kind:
+# number, operator, name or an unknown symbol. Tokens follow each other without gaps,
+# so positions are restored by summing the lengths of the captured strings
+_TOKEN_PATTERN = re.compile(
+    r'(\s*)(?:'
+    r'(\d+(?:\.\d+)?|\.\d+)'
+    rf'|(\*\*|//|[{re.escape(CHARS_OF_OPERATOR)}])'
+    r'|([^\W\d]\w*)'
+    r'|(\S))'
+)
+
+# The same for postfix input: no brackets or commas, '~' and '$' are the unary minus and plus
+_POSTFIX_PATTERN = re.compile(
+    r'(\s*)(?:'
+    r'(\d+(?:\.\d+)?|\.\d+)'
+    r'|(\*\*|//|[-+*/%~$])'
+    r'|([^\W\d]\w*)'
+    r'|(\S))'
+)
 
-from typing import Any
 
 class Token:
-    def __init__(self, value: Any, position: int):
+    """
+    A number, a variable, a bracket, a comma, an operator or a function name
+    at a position of the expression. Operators and functions have an opcode
+    of the OperatorRegistry, the default registry's one if it is not given
+
+    """
+    __slots__ = ('value', 'position', 'opcode')
+
+    def __init__(self, value: Any, position: int, opcode: int | None = None):
         self.value = value
         self.position = position
+        if opcode is None and type(value) is str:
+            opcode = DEFAULT_REGISTRY.opcodes.get(value)
+        self.opcode = opcode
+
+
+class Variable:
+    """
+    A named operand of an expression, its value is bound at evaluation time
+
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Variable) and other.name == self.name
+
+    def __hash__(self) -> int:
+        return hash((Variable, self.name))
+
+    def __repr__(self) -> str:
+        return f'Variable({self.name!r})'
+
+
+OPERAND_TYPES = (*NUMBER_TYPES, Variable)
+
+
+class Lexeme(NamedTuple):
+    """
+    The text of a token in the field of its kind, the other fields are empty.
+    dot is the position of a '.' right after a number, which makes it invalid
+
+    """
+    position: int
+    number: str
+    operator: str
+    name: str
+    unknown: str
+    dot: int | None
+
+
+def scan(expression: str) -> Iterator[Lexeme]:
+    """
+    Splits an infix expression into lexemes without checking or converting them,
+    for checks that report errors instead of raising them (see Validator).
+    """
+
+    n = len(expression)
+    i = 0
+    for space, number, operator, name, unknown in _TOKEN_PATTERN.findall(expression):
+        i += len(space)
+        dot = None
+        if number:
+            j = i + len(number)
+            if j < n and expression[j] == '.':
+                dot = j
+        yield Lexeme(i, number, operator, name, unknown, dot)
+        i += len(number or operator or name or unknown)
+
+
+def read_chunks(file: TextIO, size: int = 1 << 16) -> Iterator[str]:
+    """
+    Reads a text file in chunks of a fixed size, for Tokenizer.iter_tokens.
+    """
+
+    while chunk := file.read(size):
+        yield chunk
+
+
+class _ChunkTokenizer(ABC):
+    """
+    Tokenizes an expression given in chunks: checks and converts numbers, tells
+    functions from variables. Operators are classified by the subclasses (_operator)
+
+    """
+    def __init__(self, max_length: int = MAX_LENGTH_OF_NUMBER, convert: Callable[[str], Any] | None = None,
+                 registry: OperatorRegistry = DEFAULT_REGISTRY):
+        self.max_length = max_length
+        self.convert = convert
+        self.registry = registry
+        self.functions = {name: opcode for name, opcode in registry.opcodes.items()
+                          if registry.kinds[opcode] == FUNCTION}
+
+    @abstractmethod
+    def _operator(self, operator: str, previous: Any, position: int) -> str:
+        """
+        Value of an operator token, previous is the value of the previous token (None at the start).
+        """
+
+    def _scan_tokens(self, chunks: Iterable[str], pattern: re.Pattern[str], buffer: str = '') -> Iterator[Token]:
+        # Yields every token of buffer and the chunks as soon as it is complete, only the
+        # unfinished tail of a chunk is kept
+        findall = pattern.findall
+        finditer = pattern.finditer
+        groups = re.Match.groups
+        max_length = self.max_length
+        convert = self.convert
+        opcodes = self.registry.opcodes
+        functions = self.functions
+        classify = self._operator
+        # Position of buffer[0] in the whole expression
+        offset = 0
+        # Value of the previous token
+        value: Any = None
+
+        for chunk in chain(chunks, (None,)):
+            final = chunk is None
+            if chunk is not None:
+                buffer += chunk
+            n = len(buffer)
+            # End of the last token
+            consumed = 0
+
+            # findall is faster, finditer keeps the memory of a chunk flat. Tokens follow
+            # each other without gaps, so positions are sums of lengths
+            lexemes = findall(buffer) if final else map(groups, finditer(buffer))
+            for space, number, operator, name, unknown in lexemes:
+                i = consumed + len(space)
+                end = i + len(number or operator or name or unknown)
+                # A token that ends at the end of the buffer (or just before a '.')
+                # may continue in the next chunk
+                if not final and end + 1 >= n:
+                    break
+                position = offset + i
+
+                if number:
+                    j = i + len(number)
+                    if j < n and buffer[j] == '.':
+                        raise ParsingError("Invalid number format", offset + j, "Invalid number format")
+                    if len(number) > max_length:
+                        raise ParsingError(f'Number has more than {max_length} digits',position,'Invalid number format')
+
+                    value = convert(number) if convert is not None else float(number) if '.' in number else int(number)
+                    yield Token(value, position)
+
+                elif operator:
+                    value = classify(operator, value, position)
+                    yield Token(value, position, opcodes.get(value))
+
+                elif name:
+                    if name in functions:
+                        value = name
+                        yield Token(name, position, functions[name])
+                    else:
+                        value = Variable(name)
+                        yield Token(value, position)
 
+                else:
+                    raise ParsingError(f'{unknown}', position, 'Unknown symbol')
 
-class Tokenizer:
+                consumed = end
+
+            buffer = buffer[consumed:]
+            offset += consumed
+
+
+class Tokenizer(_ChunkTokenizer):
+    """
+    Parameters:
+        max_length (int): maximum number of characters of a number literal
+        convert (Callable[[str], Any] | None): converts a literal to a number
+            (Fraction, Decimal), None for int and float
+        registry (OperatorRegistry): opcodes of operators, its function names are not variables
+
+    """
     def parse_tokens(self, expression: str) -> list[Token]:
             """
             Tokenizes an infix expression into a list of tokens
@@ -18,7 +219,8 @@ class Tokenizer:
                 expression (str): raw infix expression
 
             Return:
-                List[Token]: a sequence of tokens representing numbers, operators and brackets
+                List[Token]: a sequence of tokens representing numbers, variables, operators,
+                functions, brackets and commas
 
             Exceptions:
                 ParsingError:
@@ -27,74 +229,75 @@ class Tokenizer:
                     - Incorrect operator sequence
             """
 
-            tokens = []
-            n = len(expression)
-            i = 0
-
-            while i < n:
-                symbol = expression[i]
-
-                if symbol.isspace():
-                    i += 1
-                    continue
-
-                if symbol.isdigit() or (symbol == '.' and i + 1 < n and expression[i+1].isdigit()):
-                    j = i
-                    has_dot = False
-
-                    while j < n:
-                        if expression[j].isdigit():
-                            j += 1
-                        elif expression[j] == '.':
-                            if has_dot:
-                                raise ParsingError("Invalid number format", j, "Invalid number format")
-                            if j + 1 < n and expression[j+1].isdigit():
-                                has_dot = True
-                                j += 1
-                            else:
-                                raise ParsingError("Invalid number format", j, "Invalid number format")
-                        else:
-                            break
-
-                    num_str = expression[i:j]
-                    if len(num_str) > MAX_LENGTH_OF_NUMBER:
-                        raise ParsingError('Number has more than 10 digits',i,'Invalid number format')
-                    token_value: int | float
-                    try:
-                        token_value = int(num_str)
-                    except ValueError:
-                        token_value = float(num_str)
-
-                    tokens.append(Token(token_value, i))
-
-                    i = j
-                    continue
-
-                if symbol in CHARS_OF_OPERATOR:
-                    if symbol in '+-':
-                        if not tokens or tokens[-1].value == '(':
-                            if symbol == '+':
-                                tokens.append(Token('$', i))
-                            elif symbol == '-':
-                                tokens.append(Token('~', i))
-                        elif isinstance(tokens[-1].value, str) and tokens[-1].value in OPERATORS and \
-                            tokens[-1].value != ')':
-                            raise ParsingError(f"Incorrect operator sequence '{tokens[-1].value}' followed by '{symbol}'", i)
-                        else:
-                            tokens.append(Token(symbol, i))
-                    else:
-                        if symbol == '*' and i + 1 < n and expression[i+1] == '*':
-                            tokens.append(Token('**', i))
-                            i += 1
-                        elif symbol == '/' and i + 1 < n and expression[i+1] == '/':
-                            tokens.append(Token('//', i))
-                            i += 1
-                        else:
-                            tokens.append(Token(symbol, i))
+            return list(self._scan_tokens((), _TOKEN_PATTERN, expression))
+
+
+    def iter_tokens(self, chunks: Iterable[str]) -> Iterator[Token]:
+            """
+            Tokenizes an infix expression given in chunks, yielding every token
+            as soon as it is complete. Only the unfinished tail of a chunk is kept,
+            so memory does not grow with the length of the expression.
+            Tokens, positions and errors are the same as of parse_tokens on the joined chunks
+
+            Arguments:
+                chunks (Iterable[str]): parts of a raw infix expression
+
+            Return:
+                Iterator[Token]: tokens in order
 
-                    i += 1
-                    continue
+            Exceptions:
+                ParsingError:
+                    - Unknown symbol
+                    - Invalid number format
+                    - Incorrect operator sequence
+            """
+
+            return self._scan_tokens(chunks, _TOKEN_PATTERN)
+
+    def _operator(self, operator: str, previous: Any, position: int) -> str:
+        # '+' and '-' are unary at the start, after '(' and after ','
+        if operator == '+' or operator == '-':
+            if previous is None or previous == '(' or previous == ',':
+                return '$' if operator == '+' else '~'
+            if previous in OPERATORS:
+                raise ParsingError(f"Incorrect operator sequence '{previous}' followed by '{operator}'", position)
+        return operator
+
+
+class PostfixTokenizer(_ChunkTokenizer):
+    """
+    Tokenizes an expression written in postfix notation (RPN), e.g. '3 4 + x *'
+    or '2 ~ 9 max'. The tokens are already in RPN order, so they go to
+    EvaluatorRPN.evaluate_of_rpn without the shunting-yard. '+' and '-' are always
+    binary, '~' and '$' are the unary minus and plus, functions follow their arguments.
+    Numbers are checked as by Tokenizer; brackets and commas are unknown symbols
+
+    Parameters:
+        max_length (int): maximum number of characters of a number literal
+        convert (Callable[[str], Any] | None): converts a literal to a number
+            (Fraction, Decimal), None for int and float
+        registry (OperatorRegistry): opcodes of operators, its function names are not variables
+
+    """
+    def iter_tokens(self, chunks: Iterable[str]) -> Iterator[Token]:
+            """
+            Tokenizes a postfix expression given in chunks, yielding every token
+            as soon as it is complete. Only the unfinished tail of a chunk is kept.
+
+            Arguments:
+                chunks (Iterable[str]): parts of a postfix expression
+
+            Return:
+                Iterator[Token]: tokens in RPN order
+
+            Exceptions:
+                ParsingError:
+                    - Unknown symbol
+                    - Invalid number format
+            """
 
-                raise ParsingError(f'{symbol}', i, 'Unknown symbol')
+            return self._scan_tokens(chunks, _POSTFIX_PATTERN)
 
-            return tokens
+    def _operator(self, operator: str, previous: Any, position: int) -> str:
+        # The signs are binary, '~' and '$' are written out
+        return operator
@@ -0,0 +1,247 @@
+from .tokenizer import scan
+from .errors import ParsingError
+from .operators import OPERATORS, MAX_LENGTH_OF_NUMBER
+from .registry import OperatorRegistry, DEFAULT_REGISTRY, BINARY, UNARY, FUNCTION
+
+from typing import Iterable, NamedTuple
+import re
+
+# Ends the digits and dots of an invalid number, which are skipped to recover
+_NOT_NUMBER = re.compile(r'[^\d.]')
+
+# Kinds of stack entries besides the kinds of the registry
+_BRACKET = '('
+# Priority of a placeholder for an unknown symbol between operands and of a misplaced comma
+_UNKNOWN_PRIORITY = 1
+_COMMA_PRIORITY = 0
+
+
+class Diagnostic(NamedTuple):
+    position: int | None
+    error_type: str
+    message: str
+
+    def to_error(self) -> ParsingError:
+        return ParsingError(self.message, self.position, self.error_type)
+
+    def __str__(self) -> str:
+        return str(self.to_error())
+
+
+class Validator:
+    """
+    Checks an expression in one pass without raising: symbols and numbers, operator
+    sequences, brackets, function calls and the number of operands of every operator
+    (and unknown variables, if the names of the variables are given).
+
+    Diagnostics come in the order Calculator.calculate meets the errors: tokenizer errors,
+    then shunting-yard errors, then evaluator errors in RPN order. So when calculate
+    raises one of these errors, it is the first diagnostic, unless an operation fails
+    on its values before. Errors that depend on values (division by zero, budgets) are
+    not checked. After an error the pass recovers locally: an invalid number counts as
+    a number, a misplaced sign as a unary one, a stray bracket is skipped, a function
+    without brackets counts as an operand and a call with a wrong number of arguments
+    takes the arguments it has
+
+    Parameters:
+        max_length (int): maximum number of characters of a number literal
+        registry (OperatorRegistry): operators and functions
+
+    """
+    def __init__(self, max_length: int = MAX_LENGTH_OF_NUMBER, registry: OperatorRegistry = DEFAULT_REGISTRY):
+        self.max_length = max_length
+        self.registry = registry
+
+    def validate(self, expression: str, variables: Iterable[str] | None = None) -> list[Diagnostic]:
+        """
+        Finds all errors of an expression.
+
+        Parameters:
+            expression (str): raw infix expression.
+            variables (Iterable[str] | None): names of the variables that will be bound,
+                None to skip the check of variables.
+
+        Returns:
+            list[Diagnostic]: position, error type and message of every error,
+            empty if the expression is well-formed.
+        """
+
+        registry = self.registry
+        opcodes = registry.opcodes
+        kinds = registry.kinds
+        arities = registry.arities
+        priorities = registry.priorities
+        right_associative = registry.right_associative
+        max_length = self.max_length
+        names = set(variables) if variables is not None else None
+        n = len(expression)
+
+        lexical: list[Diagnostic] = []
+        syntax: list[Diagnostic] = []
+        operands: list[Diagnostic] = []
+
+        # Operator stack of the shunting-yard: (value, position, kind, arity, priority, right associative)
+        stack: list[tuple] = []
+        # Argument count of every open bracket, None if it does not call a function
+        arguments: list[int | None] = []
+        # A function that must be followed by '('
+        function: tuple | None = None
+        # Depth of the operand stack of the evaluator
+        depth = 0
+        # Value of the previous token for the tokenizer checks, None at the start
+        previous: object = None
+        # Whether the previous token ends an operand, for unknown symbols between operands
+        after_operand = False
+        count = 0
+        # End of an invalid number, lexemes before it are skipped
+        resume = 0
+
+        def operand() -> None:
+            nonlocal depth
+            depth += 1
+
+        def operator(entry: tuple) -> None:
+            nonlocal depth
+            value, position, kind, arity = entry[:4]
+            if depth < arity:
+                if kind == BINARY:
+                    message = f'Not enough operands for a binary operator {value}'
+                elif kind == UNARY:
+                    message = f'Not enough operands for a unary operator {value}'
+                else:
+                    message = f'Not enough arguments for a function {value}'
+                operands.append(Diagnostic(position, 'Calculation', message))
+                depth = arity
+            depth -= arity - 1
+
+        def close_function(position: int) -> None:
+            # A function without '(' counts as an operand
+            nonlocal function
+            assert function is not None
+            syntax.append(Diagnostic(function[1], 'Invalid function call', function[0]))
+            stack.pop()
+            operand()
+            function = None
+
+        def push(entry: tuple) -> None:
+            _, _, _, _, priority, right = entry
+            while stack and stack[-1][2] != _BRACKET:
+                top_priority = stack[-1][4]
+                if priority < top_priority or (priority == top_priority and not right):
+                    operator(stack.pop())
+                else:
+                    break
+            stack.append(entry)
+
+        def pop_to_bracket() -> None:
+            while stack and stack[-1][2] != _BRACKET:
+                operator(stack.pop())
+
+        for i, number, symbol, name, unknown, dot in scan(expression):
+            if i < resume:
+                continue
+            count += 1
+
+            if function is not None and symbol != '(':
+                close_function(i)
+
+            if number:
+                if dot is not None:
+                    lexical.append(Diagnostic(dot, 'Invalid number format', 'Invalid number format'))
+                    tail = _NOT_NUMBER.search(expression, dot)
+                    resume = tail.start() if tail is not None else n
+                if len(number) > max_length:
+                    lexical.append(Diagnostic(i, 'Invalid number format', f'Number has more than {max_length} digits'))
+                operand()
+                previous = number
+                after_operand = True
+
+            elif name:
+                opcode = opcodes.get(name)
+                if opcode is not None and kinds[opcode] == FUNCTION:
+                    function = (name, i, FUNCTION, arities[opcode], None, False)
+                    stack.append(function)
+                    after_operand = False
+                else:
+                    if names is not None and name not in names:
+                        operands.append(Diagnostic(i, 'Unknown variable', name))
+                    operand()
+                    after_operand = True
+                previous = name
+
+            elif symbol == '(':
+                stack.append((symbol, i, _BRACKET, 0, None, False))
+                arguments.append(None if function is None else 1)
+                function = None
+                previous = symbol
+                after_operand = False
+
+            elif symbol == ')':
+                pop_to_bracket()
+                if not stack:
+                    syntax.append(Diagnostic(i, 'Unbalanced brackets', symbol))
+                else:
+                    stack.pop()
+                    argument_count = arguments.pop()
+                    if argument_count is not None:
+                        called = stack.pop()
+                        if argument_count != called[3]:
+                            syntax.append(Diagnostic(called[1], 'Invalid number of arguments', called[0]))
+                        operator(called[:3] + (argument_count,) + called[4:])
+                previous = symbol
+                after_operand = True
+
+            elif symbol == ',':
+                pop_to_bracket()
+                if not stack or arguments[-1] is None:
+                    syntax.append(Diagnostic(i, 'Invalid function call', symbol))
+                    push((symbol, i, BINARY, 2, _COMMA_PRIORITY, False))
+                else:
+                    arguments[-1] += 1
+                previous = symbol
+                after_operand = False
+
+            elif symbol:
+                value = symbol
+                if symbol == '+' or symbol == '-':
+                    if previous is None or previous == '(' or previous == ',':
+                        value = '$' if symbol == '+' else '~'
+                    elif previous in OPERATORS:
+                        lexical.append(Diagnostic(i, 'Parsing',
+                                                  f"Incorrect operator sequence '{previous}' followed by '{symbol}'"))
+                        value = '$' if symbol == '+' else '~'
+                opcode = opcodes[value]
+                push((value, i, kinds[opcode], arities[opcode], priorities[opcode], right_associative[opcode]))
+                previous = value
+                after_operand = False
+
+            else:
+                lexical.append(Diagnostic(i, 'Unknown symbol', unknown))
+                if after_operand:
+                    # Most likely an operator, so the operands around it stay apart
+                    push((unknown, i, BINARY, 2, _UNKNOWN_PRIORITY, False))
+                    after_operand = False
+                else:
+                    count -= 1
+
+        if count == 0 and not lexical:
+            return [Diagnostic(0, 'Invalid expression', 'Empty expression')]
+
+        if function is not None:
+            close_function(n)
+
+        while stack:
+            entry = stack.pop()
+            if entry[2] == _BRACKET:
+                syntax.append(Diagnostic(entry[1], 'Unbalanced brackets', entry[0]))
+                argument_count = arguments.pop()
+                if argument_count is not None:
+                    called = stack.pop()
+                    operator(called[:3] + (argument_count,) + called[4:])
+            else:
+                operator(entry)
+
+        if depth != 1:
+            operands.append(Diagnostic(None, 'Invalid expression', 'Too many operands'))
+
+        return lexical + syntax + operands
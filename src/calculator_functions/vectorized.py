@@ -0,0 +1,216 @@
+from typing import Any, Callable
+
+from .tokenizer import Token, Variable
+from .errors import ParsingError
+from .operators import MAX_POWER
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+# Largest magnitude that int64 holds; integer results beyond it would silently wrap
+_INT64_LIMIT = 2.0 ** 63
+
+
+def _is_float(x: Any) -> bool:
+    return x.dtype.kind == 'f'
+
+
+def _overflow(estimate: Any) -> list:
+    return [(np.abs(estimate) >= _INT64_LIMIT, 'Integer overflow in vectorized evaluation')]
+
+
+def _vec_add(x: Any, y: Any) -> tuple[Any, list]:
+    checks = _overflow(x.astype(float) + y) if not _is_float(x) and not _is_float(y) else []
+    return x + y, checks
+
+
+def _vec_sub(x: Any, y: Any) -> tuple[Any, list]:
+    checks = _overflow(x.astype(float) - y) if not _is_float(x) and not _is_float(y) else []
+    return x - y, checks
+
+
+def _vec_mul(x: Any, y: Any) -> tuple[Any, list]:
+    checks = _overflow(x.astype(float) * y) if not _is_float(x) and not _is_float(y) else []
+    return x * y, checks
+
+
+def _vec_division(x: Any, y: Any) -> tuple[Any, list]:
+    zero = y == 0
+    return np.true_divide(x, np.where(zero, 1, y)), [(zero, 'Division by zero')]
+
+
+def _vec_floor_division(x: Any, y: Any) -> tuple[Any, list]:
+    if _is_float(x) or _is_float(y):
+        raise ValueError("Operator // requires integers")
+    zero = y == 0
+    return np.floor_divide(x, np.where(zero, 1, y)), [(zero, 'Division by zero')]
+
+
+def _vec_mod_division(x: Any, y: Any) -> tuple[Any, list]:
+    if _is_float(x) or _is_float(y):
+        raise ValueError("Operator % requires integers")
+    zero = y == 0
+    return np.mod(x, np.where(zero, 1, y)), [(zero, 'Division by zero')]
+
+
+def _vec_power(x: Any, y: Any) -> tuple[Any, list]:
+    checks = []
+    invalid = y > MAX_POWER
+    if _is_float(y):
+        negative_root = x < 0
+        checks.append((negative_root, 'Negative number under the root'))
+        invalid = invalid | negative_root
+    checks.append((y > MAX_POWER, 'Too high a power to be raised'))
+
+    exponent = np.where(invalid, 0, y)
+    if not _is_float(x) and not _is_float(y):
+        if (exponent < 0).any():
+            # Python turns an integer to a negative power into a float
+            x = x.astype(float)
+        else:
+            estimate = np.abs(x.astype(float)) ** exponent
+            checks.extend(_overflow(np.where(invalid, 0, estimate)))
+            return np.power(x, exponent), checks
+    result = np.power(x, exponent)
+    # A float power raises OverflowError in Python where NumPy gives inf
+    checks.append((np.isinf(result) & np.isfinite(x) & (x != 0), 'Too large a number'))
+    return result, checks
+
+
+VECTORIZED_BINARY_OPERATORS = {
+    '+': _vec_add,
+    '-': _vec_sub,
+    '*': _vec_mul,
+    '/': _vec_division,
+    '**': _vec_power,
+    '//': _vec_floor_division,
+    '%': _vec_mod_division,
+}
+
+VECTORIZED_UNARY_OPERATORS = {
+    '~': lambda x: -x,
+    '$': lambda x: x,
+}
+
+
+def _vec_sqrt(x: Any) -> tuple[Any, list]:
+    negative = x < 0
+    return np.sqrt(np.where(negative, 0, x)), [(negative, 'Negative number under the root')]
+
+
+# Built-in functions with their number of arguments, a function returns its result and its error checks;
+# user-defined ones are not vectorized
+VECTORIZED_FUNCTIONS: dict[str, tuple[Callable[..., tuple[Any, list]], int]] = {
+    'sqrt': (_vec_sqrt, 1),
+    'max': (lambda x, y: (np.maximum(x, y), []), 2),
+    'min': (lambda x, y: (np.minimum(x, y), []), 2),
+}
+
+
+class VectorizedEvaluatorRPN:
+    """
+    Evaluates an RPN once over whole NumPy arrays bound to variables.
+    Each element gets the same result as the scalar EvaluatorRPN would give
+
+    Parameters:
+        errors (str): 'raise' raises the first calculation error found in any element,
+            'mask' returns a masked array where invalid elements are masked
+
+    """
+    def __init__(self, errors: str = 'raise'):
+        if np is None:
+            raise ImportError('NumPy is required for the vectorized evaluator')
+        if errors not in ('raise', 'mask'):
+            raise ValueError(f"Unknown errors mode '{errors}'")
+        self.errors = errors
+
+    def evaluate_of_rpn(self, rpn: list[Token], variables: dict[str, Any]) -> Any:
+        """
+        Evaluates an expression given in RPN over arrays of variable values.
+
+        Integer arrays are computed with int64, results that do not fit are
+        reported as an overflow instead of wrapping around.
+
+        Parameters:
+            rpn (List[Token]): tokens in RPN order.
+            variables (dict[str, array_like]): values of named variables.
+
+        Returns:
+            numpy.ndarray | numpy.ma.MaskedArray: computed results.
+
+        Exceptions:
+            ParsingError:
+                - Not enough operands for operation
+                - If final stack contain more than one result
+                - Unknown variable
+            ValueError:
+                - Arithemtic errors inside operators
+        """
+
+        arrays = {name: self._as_array(value) for name, value in variables.items()}
+        mask_errors = self.errors == 'mask'
+        invalid = np.zeros((), dtype=bool)
+        stack = []
+
+        with np.errstate(all='ignore'):
+            for token in rpn:
+                if isinstance(token.value, (int, float)):
+                    stack.append(np.asarray(token.value))
+                elif isinstance(token.value, Variable):
+                    if token.value.name not in arrays:
+                        raise ParsingError(token.value.name, token.position, 'Unknown variable')
+                    stack.append(arrays[token.value.name])
+                elif token.value in VECTORIZED_UNARY_OPERATORS:
+                    if len(stack) < 1:
+                        raise ParsingError(f'Not enough operands for a unary operator {token.value}',
+                                           token.position, 'Calculation')
+                    stack.append(VECTORIZED_UNARY_OPERATORS[token.value](stack.pop()))
+                elif token.value in VECTORIZED_BINARY_OPERATORS:
+                    if len(stack) < 2:
+                        raise ParsingError(f'Not enough operands for a binary operator {token.value}',
+                                           token.position, 'Calculation')
+                    right = stack.pop()
+                    left = stack.pop()
+                    result, checks = VECTORIZED_BINARY_OPERATORS[token.value](left, right)
+                    invalid = self._check(checks, invalid, mask_errors)
+                    stack.append(result)
+                elif token.value in VECTORIZED_FUNCTIONS:
+                    function, arity = VECTORIZED_FUNCTIONS[token.value]
+                    if len(stack) < arity:
+                        raise ParsingError(f'Not enough arguments for a function {token.value}',
+                                           token.position, 'Calculation')
+                    arguments = stack[-arity:]
+                    del stack[-arity:]
+                    result, checks = function(*arguments)
+                    invalid = self._check(checks, invalid, mask_errors)
+                    stack.append(result)
+                elif token.opcode is not None:
+                    raise ValueError(f'Function {token.value} can not be vectorized')
+
+        if len(stack) != 1:
+            raise ParsingError("Too many operands", None, 'Invalid expression')
+
+        if mask_errors:
+            result = stack[0]
+            return np.ma.masked_array(result, mask=np.broadcast_to(invalid, np.shape(result)))
+        return stack[0]
+
+    @staticmethod
+    def _check(checks: list, invalid: Any, mask_errors: bool) -> Any:
+        for bad, message in checks:
+            if mask_errors:
+                invalid = invalid | bad
+            elif bad.any():
+                raise ValueError(message)
+        return invalid
+
+    @staticmethod
+    def _as_array(value: Any) -> Any:
+        array = np.asarray(value)
+        if array.dtype.kind in 'bu':
+            return array.astype(np.int64)
+        if array.dtype.kind not in 'if':
+            raise ValueError(f'Unsupported array type {array.dtype}')
+        return array
@@ -1,10 +1,56 @@
 from calculator_functions.calculator import Calculator
 from calculator_functions.errors import ParsingError
+from calculator_functions.formatting import format_result, format_plain, format_json
+from calculator_functions.session import Session
+from calculator_functions.tokenizer import read_chunks
 
-def main():
-    calculator = Calculator()
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, TextIO
+import argparse
+import sys
+
+
+def stream(lines: Iterable[str], output: TextIO, calculator: Calculator, output_format: str = 'plain',
+           batch_size: int = 4096, executor: ProcessPoolExecutor | None = None, postfix: bool = False) -> None:
+    """
+    Calculates newline-delimited expressions and writes one result per line.
+    Input is read and written in batches, so memory use does not depend on its size.
+
+    Parameters:
+        lines (Iterable[str]): expressions, one per line.
+        output (TextIO): stream for results.
+        calculator (Calculator): calculator to use.
+        output_format (str): 'plain' or 'json' (JSON lines with error type and position).
+        batch_size (int): number of lines read and written at once.
+        executor (ProcessPoolExecutor | None): pool from calculator.create_pool for parallel calculation.
+        postfix (bool): the expressions are in postfix notation.
+    """
+
+    lines = iter(lines)
+    while True:
+        batch = [line.rstrip('\r\n') for line in islice(lines, batch_size)]
+        if not batch:
+            break
+
+        results = calculator.calculate_many(batch, workers=1, executor=executor, postfix=postfix)
+
+        if output_format == 'json':
+            output.write(''.join(format_json(e, r) + '\n' for e, r in zip(batch, results)))
+        else:
+            output.write(''.join(format_plain(r) + '\n' for r in results))
+
+
+def interactive(calculator: Calculator, postfix: bool = False) -> None:
+    session = Session(calculator)
     print("Calculator")
     print("To exit, write: 'exit'")
+    if postfix:
+        print("Write expressions in postfix notation: '3 4 + 2 *', '~' is the unary minus")
+    else:
+        print("To name a result, write: 'a = 2 ** 10', later lines can use 'a' and the last result 'ans'")
+    if calculator.stats is not None:
+        print("To show statistics, write: 'stats'")
     print("-" * 50)
 
     while True:
@@ -15,18 +61,76 @@ def main():
                 print('Bye-bye!')
                 break
 
-            result = calculator.calculate(expression)
+            if expression.lower() == 'stats' and calculator.stats is not None:
+                print(calculator.stats.format())
+                continue
 
-            if isinstance(result, float):
-                if result.is_integer():
-                    print(f"Result: {int(result)}")
-                else:
-                    print(f"Result: {result}")
+            if postfix:
+                print(f"Result: {format_result(calculator.calculate_postfix(expression))}")
+                continue
+
+            name, result, updated = session.execute(expression)
+
+            if name is None:
+                print(f"Result: {format_result(result)}")
             else:
-                print(f"Result: {result}")
+                print(f"{name} = {format_result(result)}")
+            for dependent, value in updated.items():
+                print(f"  {dependent} = {format_plain(value)}")
 
         except (ParsingError, ValueError) as e:
             print(f"{e}")
 
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Expression calculator')
+    parser.add_argument('--stream', action='store_true',
+                        help='read newline-delimited expressions instead of the interactive prompt')
+    parser.add_argument('--input', default='-', help="file with expressions for --stream, '-' for stdin")
+    parser.add_argument('--format', choices=('plain', 'json'), default='plain', help='output format of --stream')
+    parser.add_argument('--batch-size', type=int, default=4096, help='lines processed at once in --stream')
+    parser.add_argument('--workers', type=int, default=1, help='processes used in --stream')
+    parser.add_argument('--cache-size', type=int, default=4096, help='size of the RPN cache, 0 to disable')
+    parser.add_argument('--expression-file',
+                        help='calculate one (possibly multi-megabyte) expression read from a file in chunks')
+    parser.add_argument('--postfix', action='store_true',
+                        help="expressions are in postfix notation ('3 4 + 2 *'), evaluated without the shunting-yard")
+    parser.add_argument('--stats', action='store_true',
+                        help="collect per-stage statistics, printed to stderr after --stream or by the 'stats' command")
+    args = parser.parse_args(argv)
+
+    calculator = Calculator(cache_size=args.cache_size or None, instrument=args.stats)
+
+    if args.expression_file:
+        with open(args.expression_file, encoding='utf-8') as file:
+            try:
+                if args.postfix:
+                    print(format_result(calculator.calculate_postfix(read_chunks(file))))
+                else:
+                    print(format_result(calculator.calculate_stream(read_chunks(file))))
+            except (ParsingError, ArithmeticError, ValueError) as e:
+                print(f"{e}")
+        return
+
+    if not args.stream:
+        interactive(calculator, args.postfix)
+        return
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    try:
+        if args.workers > 1:
+            with calculator.create_pool(args.workers) as executor:
+                stream(source, sys.stdout, calculator, args.format, args.batch_size, executor, args.postfix)
+        else:
+            stream(source, sys.stdout, calculator, args.format, args.batch_size, postfix=args.postfix)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if calculator.stats is not None:
+        # Calculations made by worker processes are not included
+        print(calculator.stats.format(), file=sys.stderr)
+
+
 if __name__ == "__main__":
     main()
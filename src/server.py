@@ -0,0 +1,162 @@
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.formatting import format_plain, format_json
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+import argparse
+import asyncio
+
+# Size of the largest request line, a longer line is answered with an error and closes the connection
+MAX_LINE_LENGTH = 64 * 1024
+
+
+def format_response(expression: str, result: int | float | ParsingError, output_format: str) -> bytes:
+    if output_format == 'json':
+        return (format_json(expression, result) + '\n').encode()
+    return (format_plain(result) + '\n').encode()
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, calculator: Calculator,
+                            executor: Executor, output_format: str = 'plain', max_pending: int = 256) -> None:
+    """
+    Serves one connection: every request line is an expression, every response line is its result,
+    in the order of the requests.
+
+    Requests are pipelined: a client may send many lines without waiting for the responses.
+    At most max_pending of them are calculated at once; when the queue is full the connection
+    is not read, so a fast client is slowed down by TCP flow control instead of filling memory.
+
+    Parameters:
+        reader (asyncio.StreamReader): requests of the client.
+        writer (asyncio.StreamWriter): responses to the client.
+        calculator (Calculator): calculator to use.
+        executor (Executor): pool the expressions are calculated in, so the event loop is not blocked.
+        output_format (str): 'plain' or 'json' (JSON lines with error type and position).
+        max_pending (int): maximum number of requests read but not answered.
+    """
+
+    pending: asyncio.Queue[tuple[str, asyncio.Future] | None] = asyncio.Queue(max_pending)
+
+    async def respond() -> None:
+        connected = True
+        while (item := await pending.get()) is not None:
+            expression, future = item
+            try:
+                result = await future
+            except Exception as e:
+                # An error outside calculate_or_error (e.g. a broken worker) answers only this request
+                result = ParsingError(f'{e}' or type(e).__name__, 0, 'Calculation')
+            if not connected:
+                # Keep taking requests off the queue, so reading does not wait forever
+                continue
+            try:
+                response = format_response(expression, result, output_format)
+            except Exception as e:
+                response = format_response(expression, ParsingError(f'{e}' or type(e).__name__, None, 'Output'),
+                                           output_format)
+            try:
+                writer.write(response)
+                await writer.drain()
+            except ConnectionError:
+                connected = False
+
+    responder = asyncio.create_task(respond())
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # The line is longer than the stream limit, its remainder can not be told from the next request
+                too_long = asyncio.get_running_loop().create_future()
+                too_long.set_result(ParsingError(f'Line longer than {MAX_LINE_LENGTH} bytes', None,
+                                                 'Invalid expression'))
+                await pending.put(('', too_long))
+                break
+            if not line:
+                break
+            expression = line.decode(errors='replace').rstrip('\r\n')
+            await pending.put((expression, asyncio.wrap_future(calculator.submit(executor, expression))))
+    except ConnectionError:
+        pass
+    finally:
+        await pending.put(None)
+        await responder
+        writer.close()
+
+
+async def start_server(calculator: Calculator, executor: Executor, host: str = '127.0.0.1', port: int = 0,
+                       output_format: str = 'plain', max_pending: int = 256) -> asyncio.Server:
+    """
+    Starts a TCP server of newline-delimited expressions.
+
+    Parameters:
+        calculator (Calculator): calculator to use.
+        executor (Executor): pool the expressions are calculated in, owned and shut down by the caller.
+            A pool from calculator.create_pool uses several processes and must be started
+            with start_workers first.
+        host (str): address to listen on.
+        port (int): port to listen on, 0 picks a free one (see server.sockets).
+        output_format (str): 'plain' or 'json'.
+        max_pending (int): maximum number of requests read but not answered, per connection.
+
+    Returns:
+        asyncio.Server: started server.
+    """
+
+    handler = partial(handle_connection, calculator=calculator, executor=executor,
+                      output_format=output_format, max_pending=max_pending)
+    return await asyncio.start_server(handler, host, port, limit=MAX_LINE_LENGTH)
+
+
+def start_workers(calculator: Calculator, executor: Executor, workers: int) -> None:
+    """
+    Starts every process of a pool before the server accepts connections.
+    Processes forked later would inherit the sockets of open connections
+    and keep them open after the server closes them.
+    """
+
+    for future in [calculator.submit(executor, '0') for _ in range(workers)]:
+        future.result()
+
+
+async def serve(calculator: Calculator, host: str, port: int, workers: int = 1, output_format: str = 'plain',
+                max_pending: int = 256) -> None:
+    if workers > 1:
+        executor: Executor = calculator.create_pool(workers)
+        start_workers(calculator, executor, workers)
+    else:
+        # The calculator is thread-safe, but on a standard build the GIL runs one thread at a time
+        # (measure with benchmarks/threads.py)
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    with executor:
+        server = await start_server(calculator, executor, host, port, output_format, max_pending)
+        address = server.sockets[0].getsockname()
+        print(f"Listening on {address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Expression calculator server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--format', choices=('plain', 'json'), default='plain', help='format of responses')
+    parser.add_argument('--workers', type=int, default=1, help='processes used for calculation')
+    parser.add_argument('--max-pending', type=int, default=256,
+                        help='requests of one connection calculated at once before reading stops')
+    parser.add_argument('--cache-size', type=int, default=4096, help='size of the RPN cache, 0 to disable')
+    parser.add_argument('--max-bits', type=int, help='maximum bit length of an integer result')
+    parser.add_argument('--time-limit', type=float, help='seconds for one evaluation')
+    args = parser.parse_args(argv)
+
+    calculator = Calculator(cache_size=args.cache_size or None, max_bits=args.max_bits, time_limit=args.time_limit)
+    try:
+        asyncio.run(serve(calculator, args.host, args.port, args.workers, args.format, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
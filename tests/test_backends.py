@@ -0,0 +1,148 @@
+import json
+import pickle
+from decimal import Context, Decimal, ROUND_DOWN
+from fractions import Fraction
+
+import pytest
+from calculator_functions.backends import get_backend
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.formatting import format_json
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('0.1 + 0.2', Fraction(3, 10)),
+        pytest.param('1 / 3 * 3', Fraction(1)),
+        pytest.param('-7 // 2', Fraction(-4)),
+        pytest.param('-7 % 2', Fraction(1)),
+        pytest.param('7 % (0 - 2)', Fraction(-1)),
+        pytest.param('4.0 // 2', Fraction(2)),
+        pytest.param('(2 / 3) ** 2', Fraction(4, 9)),
+        pytest.param('12345678901234567890 * 10', Fraction(123456789012345678900)),
+    )
+)
+def test_fraction_backend(expression, expected):
+    result = Calculator(backend='fraction').calculate(expression)
+    assert result == expected
+    assert isinstance(result, Fraction)
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('0.1 + 0.2', Decimal('0.3')),
+        pytest.param('1 / 3', Decimal('0.3333333333333333333333333333')),
+        pytest.param('-7 // 2', Decimal(-4)),
+        pytest.param('-7 % 2', Decimal(1)),
+        pytest.param('7 // (0 - 2)', Decimal(-4)),
+        pytest.param('7 % (0 - 2)', Decimal(-1)),
+        pytest.param('-(1.5)', Decimal('-1.5')),
+        pytest.param('2 ** 10', Decimal(1024)),
+    )
+)
+def test_decimal_backend(expression, expected):
+    result = Calculator(backend='decimal').calculate(expression)
+    assert result == expected
+    assert isinstance(result, Decimal)
+
+
+def test_decimal_context():
+    calculator = Calculator(backend='decimal', decimal_context=Context(prec=5, rounding=ROUND_DOWN))
+    assert str(calculator.calculate('2 / 3')) == '0.66666'
+    assert str(calculator.calculate('123456 + 0')) == '1.2345E+5'
+
+
+@pytest.mark.parametrize('backend', ('native', 'fraction', 'decimal'))
+@pytest.mark.parametrize(
+    ('expression', 'message', 'position'),
+    (
+        pytest.param('1 / 0', 'Division by zero', 0),
+        pytest.param('1.5 // 2', 'Operator // requires integers', 0),
+        pytest.param('5 % 0.5', 'Operator % requires integers', 0),
+        pytest.param('2 ** 0.5 // 1', 'Operator // requires integers', 0),
+        pytest.param('sqrt(2) % 1', 'Operator % requires integers', 0),
+        pytest.param('(0 - 2) ** sqrt(2)', 'Negative number under the root', 0),
+        pytest.param('(0 - 2) ** 0.5', 'Negative number under the root', 0),
+        pytest.param('2 ** 1000', 'Too high a power to be raised', 0),
+        pytest.param('(1 + 2', '(', 0),
+        pytest.param('x + 1', 'x', 0),
+    )
+)
+def test_backend_errors(backend, expression, message, position):
+    with pytest.raises(ParsingError) as e:
+        Calculator(backend=backend).calculate(expression)
+    assert e.value.message == message
+    assert e.value.position == position
+
+
+@pytest.mark.parametrize(
+    ('expression', 'message'),
+    (
+        pytest.param('10000000000 ** 4 // 3', 'Quotient has more digits than the decimal precision'),
+        pytest.param('(9999999999 ** 999) ** 999', 'Too large a number'),
+        pytest.param(' * '.join(['9999999999 ** 999'] * 101), 'Too large a number', id='multiply'),
+        pytest.param('(9999999999 ** 999) ** 99 * (9999999999 ** 999) ** 99 / 0.0000001', 'Too large a number',
+                     id='divide'),
+        pytest.param(' + '.join(['(9999999999 ** 999) ** 100 * 10 ** 999 * 9'] * 2), 'Too large a number', id='add'),
+        pytest.param('(9999999999 ** 999) ** 100 * 10 ** 999 * 9 - (0 - 1) * (9999999999 ** 999) ** 100 * 10 ** 999 * 9',
+                     'Too large a number', id='subtract'),
+    )
+)
+def test_decimal_context_errors(expression, message):
+    with pytest.raises(ParsingError) as e:
+        Calculator(backend='decimal').calculate(expression)
+    assert e.value.message == message
+    assert e.value.error_type == 'Calculation'
+
+
+@pytest.mark.parametrize(
+    ('backend', 'max_number_length', 'literal', 'valid'),
+    (
+        pytest.param('native', None, '1' * 10, True),
+        pytest.param('native', None, '1' * 11, False),
+        pytest.param('native', 12, '1' * 12, True),
+        pytest.param('fraction', None, '1' * 100, True),
+        pytest.param('decimal', None, '1' * 101, False),
+        pytest.param('decimal', 5, '1.234', True),
+        pytest.param('decimal', 5, '1.2345', False),
+    )
+)
+def test_max_number_length(backend, max_number_length, literal, valid):
+    calculator = Calculator(backend=backend, max_number_length=max_number_length)
+    if valid:
+        calculator.calculate(literal)
+        return
+    with pytest.raises(ParsingError) as e:
+        calculator.calculate(literal)
+    length = max_number_length or calculator.backend.max_length
+    assert str(e.value) == f'Invalid number format error: Number has more than {length} digits at position 0'
+
+
+@pytest.mark.parametrize('backend', ('fraction', 'decimal'))
+@pytest.mark.parametrize('options', ({'optimize': True}, {'engine': 'pratt'}, {'cache_size': 8}))
+def test_backend_with_options(backend, options):
+    calculator = Calculator(backend=backend, **options)
+    reference = Calculator(backend=backend)
+    for expression in ('0.1 + 0.2 * 3', '-(1 / 3) + 2 ** 3', '10 // 3 % 2', '1 / 0'):
+        assert repr(calculator.calculate_or_error(expression)) == repr(reference.calculate_or_error(expression))
+    assert calculator.compile('x / 3')({'x': 1}) == reference.calculate('1 / 3')
+
+
+def test_backend_in_worker_settings():
+    calculator = Calculator(backend='decimal', decimal_context=Context(prec=6))
+    copy = Calculator(**pickle.loads(pickle.dumps(calculator._settings())))
+    assert copy.calculate('1 / 7') == Decimal('0.142857')
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend('complex')
+    with pytest.raises(ValueError):
+        get_backend('fraction', Context())
+
+
+def test_format_json_exact():
+    assert json.loads(format_json('1/3', Fraction(1, 3)))['result'] == '1/3'
+    assert json.loads(format_json('0.1+0.2', Decimal('0.3')))['result'] == '0.3'
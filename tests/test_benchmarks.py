@@ -0,0 +1,51 @@
+import copy
+
+import pytest
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks import threads
+from benchmarks.pipeline import benchmark_corpus, compare, run
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+
+
+def test_corpus_is_deterministic():
+    spec = CorpusSpec(count=20, length=10, depth=3, seed=5)
+    assert generate_corpus(spec) == generate_corpus(spec)
+    assert generate_corpus(spec) != generate_corpus(CorpusSpec(count=20, length=10, depth=3, seed=6))
+
+
+@pytest.mark.parametrize(('error_rate', 'expect_errors'), ((0.0, False), (1.0, True)))
+def test_corpus_error_rate(error_rate, expect_errors):
+    operators = {'+': 1, '-': 1, '*': 1}
+    expressions = generate_corpus(CorpusSpec(count=50, operators=operators, error_rate=error_rate))
+    results = Calculator().calculate_many(expressions, workers=1)
+    assert all(isinstance(r, ParsingError) for r in results) is expect_errors
+    assert any(isinstance(r, ParsingError) for r in results) is expect_errors
+
+
+def test_compare_flags_regressions():
+    report = run(['short'], count=20, repeat=1)
+    assert compare(report, report) == []
+
+    slower = copy.deepcopy(report)
+    stage = slower['corpora']['short']['stages']['evaluate']
+    stage['latency_ns']['p50'] *= 2
+    stage['throughput_per_s'] /= 2
+    regressions = compare(report, slower, threshold=0.4)
+    assert len(regressions) == 2
+    assert all(r.startswith('short/evaluate') for r in regressions)
+
+
+def test_benchmark_counts_arithmetic_errors():
+    stages = benchmark_corpus(['1 + 2', '10.0 ** 999', '2.5 * 3'], repeat=1)
+    assert stages['evaluate']['count'] == 3
+    assert stages['evaluate']['errors'] == 1
+    assert stages['calculate']['errors'] == 1
+
+
+def test_thread_scaling_report():
+    report = threads.run('short', count=50, threads=[1, 3], rounds=1, processes=False)
+    assert [row['threads'] for row in report['threads']] == [1, 3]
+    assert all(row['mismatches'] == 0 and row['count'] == 50 for row in report['threads'])
+    assert report['meta']['gil_enabled'] in (True, False)
+    assert 'threads' in threads.format_report(report)
@@ -0,0 +1,126 @@
+import pickle
+
+import pytest
+from decimal import Decimal
+from fractions import Fraction
+from calculator_functions.budget import EvaluationBudget, estimate_bits
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import BudgetExceededError, ParsingError
+from calculator_functions.evaluator import EvaluatorRPN
+from calculator_functions.tokenizer import Token
+
+
+@pytest.mark.parametrize(
+    ('operator', 'left', 'right', 'expected'),
+    (
+        pytest.param('*', 2 ** 100, 2 ** 50, 152),
+        pytest.param('**', 2, 100, 100),
+        pytest.param('**', -8, 10, 30),
+        pytest.param('**', 1, 999, 0),
+        pytest.param('**', 2, -3, 0),
+        pytest.param('**', 2, 1000, 0),
+        pytest.param('+', 2 ** 100, 1, 0),
+        pytest.param('*', Fraction(2 ** 100, 3), Fraction(1, 2 ** 50), 155),
+        pytest.param('**', Fraction(1, 2), Fraction(100), 100),
+        pytest.param('**', Fraction(2), Fraction(-100), 100),
+        pytest.param('**', Fraction(2), Fraction(1, 2), 0),
+        pytest.param('*', Decimal('1e100'), Decimal('0.5'), 336),
+        pytest.param('**', Decimal('1e9'), Decimal(100), 3322),
+        pytest.param('**', Decimal('0.5'), Decimal(100), 0),
+    )
+)
+def test_estimate_bits(operator, left, right, expected):
+    assert estimate_bits(operator, left, right) == expected
+
+
+@pytest.mark.parametrize(
+    ('expression', 'max_bits', 'position'),
+    (
+        pytest.param('999999999 ** 999 * 999999999 ** 999', 4096, 10),
+        pytest.param('999999999 ** 999 * 999999999 ** 999', 40000, 17),
+        pytest.param('2 ** 999 * 2 ** 999 * 2 ** 999', 2500, 20),
+        pytest.param('(2 ** 999) ** 5', 4096, 11),
+    )
+)
+def test_max_bits(expression, max_bits, position):
+    calculator = Calculator(max_bits=max_bits)
+    with pytest.raises(BudgetExceededError) as e:
+        calculator.calculate(expression)
+    assert e.value.position == position
+    assert str(e.value) == f'Budget exceeded error: Result would exceed {max_bits} bits at position {position}'
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('2 ** 999 * 2 ** 999', 2 ** 1998),
+        pytest.param('2.5 ** 99', 2.5 ** 99),
+        pytest.param('1 ** 999 * 7', 7),
+    )
+)
+def test_max_bits_allows(expression, expected):
+    assert Calculator(max_bits=4096).calculate(expression) == expected
+
+
+@pytest.mark.parametrize('backend', ('fraction', 'decimal'))
+def test_max_bits_of_exact_backends(backend):
+    calculator = Calculator(backend=backend, max_bits=4096)
+    with pytest.raises(BudgetExceededError) as e:
+        calculator.calculate('(9999999999 ** 999) ** 999')
+    assert e.value.position == 12
+    assert calculator.calculate('2 ** 999 * 2 ** 999') > 2 ** 1997
+    # Denominators of fractions grow, decimals are rounded
+    if backend == 'fraction':
+        with pytest.raises(BudgetExceededError):
+            calculator.calculate('(1 / 7) ** 999 * (1 / 5) ** 999')
+    else:
+        assert calculator.calculate('(1 / 7) ** 999 * (1 / 5) ** 999') > 0
+
+
+def test_max_power_keeps_priority():
+    with pytest.raises(ParsingError) as e:
+        Calculator(max_bits=8).calculate('2 ** 1000')
+    assert not isinstance(e.value, BudgetExceededError)
+    assert e.value.error_type == 'Calculation'
+
+
+def test_max_operations():
+    calculator = Calculator(max_operations=3)
+    assert calculator.calculate('1 + 2 + 3 + 4') == 10
+    with pytest.raises(BudgetExceededError) as e:
+        calculator.calculate('1 + 2 + 3 + 4 + 5')
+    assert e.value.position == 14
+
+
+def test_time_limit():
+    evaluator = EvaluatorRPN(EvaluationBudget(time_limit=0.0))
+    rpn = [Token(1, 0), Token(2, 4), Token('+', 2)]
+    with pytest.raises(BudgetExceededError, match='Time limit'):
+        evaluator.evaluate_of_rpn(rpn)
+
+
+@pytest.mark.parametrize('engine_options', ({}, {'optimize': True}, {'cache_size': 8}))
+def test_budget_with_options(engine_options):
+    calculator = Calculator(max_bits=64, **engine_options)
+    with pytest.raises(BudgetExceededError):
+        calculator.calculate('3 ** 50 * 3 ** 50')
+    with pytest.raises(BudgetExceededError):
+        calculator.compile('3 ** 50 * x')({'x': 3 ** 50})
+
+
+@pytest.mark.parametrize('limit', ({'max_operations': 1}, {'time_limit': 0.05}))
+def test_optimizer_does_not_fold_past_budget(limit):
+    calculator = Calculator(optimize=True, **limit)
+    with pytest.raises(BudgetExceededError):
+        calculator.calculate('(9999999999 ** 999) ** 99 * 3')
+
+
+def test_pratt_engine_rejects_budget():
+    with pytest.raises(ValueError):
+        Calculator(engine='pratt', max_operations=10)
+
+
+def test_budget_error_is_picklable():
+    error = pickle.loads(pickle.dumps(BudgetExceededError('Result would exceed 8 bits', 3)))
+    assert isinstance(error, BudgetExceededError)
+    assert str(error) == 'Budget exceeded error: Result would exceed 8 bits at position 3'
@@ -0,0 +1,109 @@
+import sys
+import threading
+
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.cache import RPNCache
+from calculator_functions.errors import ParsingError
+
+
+@pytest.mark.parametrize(
+    ('first', 'second'),
+    (
+        pytest.param('2+2', '2+2   '),
+        pytest.param('2\t+ 2', '2 + 2'),
+        pytest.param('(1+3)/(2.5-2)\n', '(1+3)/(2.5-2)'),
+    )
+)
+def test_cache_hits_on_normalized_expression(first, second):
+    calculator = Calculator(cache_size=8)
+    assert calculator.calculate(first) == calculator.calculate(second)
+    info = calculator.cache.info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+
+
+def test_cache_keeps_positions_of_leading_whitespace():
+    calculator = Calculator(cache_size=8)
+    calculator.calculate('1+2')
+    with pytest.raises(ParsingError) as e_info:
+        calculator.calculate('  1+2)')
+    assert str(e_info.value) == 'Unbalanced brackets error: ) at position 5'
+
+
+def test_cache_stores_parsing_errors():
+    calculator = Calculator(cache_size=8)
+    for _ in range(3):
+        with pytest.raises(ParsingError) as e_info:
+            calculator.calculate('1&2')
+        assert str(e_info.value) == 'Unknown symbol error: & at position 1'
+    info = calculator.cache.info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_cache_does_not_store_calculation_errors_as_results():
+    calculator = Calculator(cache_size=8)
+    for _ in range(2):
+        with pytest.raises(ParsingError) as e_info:
+            calculator.calculate('1/0')
+        assert str(e_info.value) == 'Calculation error: Division by zero at position 0'
+    assert calculator.cache.info().hits == 1
+
+
+def test_cache_evicts_least_recently_used():
+    calculator = Calculator(cache_size=2)
+    calculator.calculate('1+1')
+    calculator.calculate('2+2')
+    calculator.calculate('1+1')
+    calculator.calculate('3+3')
+    assert calculator.cache.info().evictions == 1
+    calculator.calculate('1+1')
+    calculator.calculate('2+2')
+    info = calculator.cache.info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (2, 4, 2, 2)
+
+
+def test_cache_is_disabled_by_default():
+    assert Calculator().cache is None
+
+
+def test_cache_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        RPNCache(0)
+
+
+def _result(calculator, expression):
+    try:
+        return str(calculator.calculate(expression, {'x': 2}))
+    except ParsingError as e:
+        return str(e)
+
+
+def test_calculator_shared_by_threads():
+    expressions = [f'{i % 13} * (x + {i % 7}) - {i % 5}' for i in range(60)] + ['1 +', '(2', '3 / 0']
+    expected = {expression: _result(Calculator(), expression) for expression in expressions}
+    # A small cache, so threads evict each other's entries all the time
+    calculator = Calculator(cache_size=16, instrument=True)
+    mismatches = []
+
+    def work(offset: int) -> None:
+        for i in range(400):
+            expression = expressions[(i * 7 + offset) % len(expressions)]
+            if _result(calculator, expression) != expected[expression]:
+                mismatches.append(expression)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert mismatches == []
+    info = calculator.cache.info()
+    assert info.hits + info.misses == 8 * 400
+    assert info.size <= 16
+    assert calculator.stats.snapshot()['calls'] == 8 * 400
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+from calculator_functions import calculator as calculator_module
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+
+EXPRESSIONS = ['2+2', '1/0', '2 ** 10', '1&2', '(1+3)/(2.5-2)', '', '7//2']
+
+
+def _as_comparable(results):
+    return [str(r) if isinstance(r, ParsingError) else r for r in results]
+
+
+def test_calculate_many_serial():
+    results = Calculator().calculate_many(EXPRESSIONS, workers=1)
+    assert _as_comparable(results) == [
+        4,
+        'Calculation error: Division by zero at position 0',
+        1024,
+        'Unknown symbol error: & at position 1',
+        8,
+        'Invalid expression error: Empty expression at position 0',
+        3,
+    ]
+
+
+@pytest.mark.parametrize('cache_size', (None, 16))
+def test_calculate_many_process_pool_keeps_order(monkeypatch, cache_size):
+    monkeypatch.setattr(calculator_module, 'PARALLEL_THRESHOLD', 1)
+    calculator = Calculator(cache_size=cache_size)
+    batch = EXPRESSIONS * 20
+    expected = _as_comparable(calculator.calculate_many(batch, workers=1))
+    assert _as_comparable(calculator.calculate_many(batch, workers=2, chunksize=7)) == expected
+
+
+def test_calculate_many_accepts_generators():
+    results = Calculator().calculate_many(f'{i} * 2' for i in range(5))
+    assert results == [0, 2, 4, 6, 8]
+
+
+def test_parsing_error_is_picklable():
+    error = ParsingError('Division by zero', 3, 'Calculation')
+    restored = pickle.loads(pickle.dumps(error))
+    assert (restored.message, restored.position, restored.error_type) == ('Division by zero', 3, 'Calculation')
+    assert str(restored) == str(error)
+
+
+@pytest.mark.parametrize('workers', (1, 2))
+def test_arithmetic_errors_do_not_stop_the_batch(monkeypatch, workers):
+    monkeypatch.setattr(calculator_module, 'PARALLEL_THRESHOLD', 1)
+    results = Calculator().calculate_many(['1+1', '10.0**999', '2*3'], workers=workers)
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ParsingError)
+    assert results[1].error_type == 'Calculation'
+    assert 'range' in results[1].message
@@ -74,3 +74,37 @@ def test_calculate_exceptions(expression, expected_exception):
     with pytest.raises(ParsingError) as e_info:
         calculator.calculate(expression)
     assert str(e_info.value) == expected_exception
+
+
+@pytest.mark.parametrize(
+    ('expression', 'variables', 'expected_result'),
+    (
+        pytest.param('x + 1', {'x': 2}, 3),
+        pytest.param('-x ** 2', {'x': 3}, 9),
+        pytest.param('(a + b) * c', {'a': 1, 'b': 2, 'c': 0.5}, 1.5),
+        pytest.param('x // y + x % y', {'x': 7, 'y': 2}, 4),
+    )
+)
+def test_calculate_variables(expression, variables, expected_result):
+    calculator = Calculator()
+    assert calculator.calculate(expression, variables) == expected_result
+    assert calculator.compile(expression)(variables) == expected_result
+
+
+@pytest.mark.parametrize(
+    ('expression', 'variables', 'expected_exception'),
+    (
+        pytest.param('x + 1', None, 'Unknown variable error: x at position 0'),
+        pytest.param('1 + y', {'x': 1}, 'Unknown variable error: y at position 4'),
+        pytest.param('x / y', {'x': 1, 'y': 0}, 'Calculation error: Division by zero at position 0'),
+        pytest.param('1/0 + y', {}, 'Calculation error: Division by zero at position 0'),
+    )
+)
+def test_calculate_variables_exceptions(expression, variables, expected_exception):
+    calculator = Calculator()
+    with pytest.raises(ParsingError) as e_info:
+        calculator.calculate(expression, variables)
+    assert str(e_info.value) == expected_exception
+    with pytest.raises(ParsingError) as e_info:
+        calculator.compile(expression)(variables)
+    assert str(e_info.value) == expected_exception
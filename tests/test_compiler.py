@@ -0,0 +1,85 @@
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.compiler import CompiledExpression
+from calculator_functions.errors import ParsingError
+from calculator_functions.tokenizer import Token
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        pytest.param('2+2'),
+        pytest.param('2 + 2 * 2'),
+        pytest.param('2 ** 2 ** 3'),
+        pytest.param('-(-3)'),
+        pytest.param('+5 + 1'),
+        pytest.param('7/2'),
+        pytest.param('10%3'),
+        pytest.param('10//3'),
+        pytest.param('(1+3)/(2.5-2)'),
+        pytest.param('1 2 +'),
+    )
+)
+def test_compiled_matches_calculate(expression):
+    calculator = Calculator()
+    compiled = calculator.compile(expression)
+    expected = calculator.calculate(expression)
+    assert compiled() == expected
+    assert compiled.evaluate() == expected
+    assert type(compiled()) is type(expected)
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        pytest.param('1/0'),
+        pytest.param('2//0'),
+        pytest.param('4.5//5'),
+        pytest.param('5%2.5'),
+        pytest.param('-2 ** 0.5'),
+        pytest.param('2 ** 11111111'),
+        pytest.param('1-*'),
+        pytest.param('(-)'),
+        pytest.param('1 2'),
+        pytest.param('1/0 +'),
+    )
+)
+def test_compiled_keeps_error_semantics(expression):
+    calculator = Calculator()
+    compiled = calculator.compile(expression)
+    with pytest.raises(ParsingError) as expected:
+        calculator.calculate(expression)
+    with pytest.raises(ParsingError) as e_info:
+        compiled()
+    assert str(e_info.value) == str(expected.value)
+
+
+@pytest.mark.parametrize(
+    ('rpn_values', 'is_valid'),
+    (
+        pytest.param([2, 3, '+'], True),
+        pytest.param([2, '~'], True),
+        pytest.param([2, '+'], False),
+        pytest.param([2, 3], False),
+    )
+)
+def test_compiled_static_stack_check(rpn_values, is_valid):
+    rpn = [Token(v, i) for i, v in enumerate(rpn_values)]
+    assert CompiledExpression(rpn).is_valid is is_valid
+
+
+def test_compile_reports_parsing_errors():
+    with pytest.raises(ParsingError) as e_info:
+        Calculator().compile('((1+2)')
+    assert str(e_info.value) == 'Unbalanced brackets error: ( at position 0'
+
+
+def test_key_error_of_a_function_is_not_an_unknown_variable():
+    def lookup(x):
+        return {}[x]
+
+    compiled = Calculator(functions={'lookup': (lookup, 1)}).compile('lookup(x) + y')
+    with pytest.raises(KeyError):
+        compiled.evaluate({'x': 1, 'y': 2})
+    with pytest.raises(ParsingError, match='Unknown variable error: y at position 12'):
+        Calculator().compile('x * 2 + 1 + y').evaluate({'x': 1})
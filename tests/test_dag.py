@@ -0,0 +1,95 @@
+import pytest
+from benchmarks.corpus import PRESETS, generate_corpus
+from calculator_functions.calculator import Calculator
+from calculator_functions.dag import ExpressionDAG
+from calculator_functions.errors import BudgetExceededError, ParsingError
+
+
+def _outcome(calculator, expression, variables=None):
+    try:
+        return calculator.calculate(expression, variables)
+    except ParsingError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize(
+    ('expression', 'nodes'),
+    (
+        pytest.param('(1 + 2) * (1 + 2)', 4),
+        pytest.param('x * x + x * x', 3),
+        pytest.param('(2 ** 10 - 1) + (2 ** 10 - 1) * (2 ** 10 - 1)', 7),
+        pytest.param('1 + 1.0', 3),
+        pytest.param('(-x) * (-x)', 3),
+    )
+)
+def test_shared_nodes(expression, nodes):
+    assert len(Calculator(cse=True).compile(expression).nodes) == nodes
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        '(1 + 2) * (1 + 2)',
+        '1 + 1.0 + 1',
+        '(7 // 2) + (7 / 2)',
+        '-(0.0) * 1 + 0.0 * 1',
+        '(x + 1) / (x - 1) + (x + 1) / (x - 1)',
+        '(1 / 0) + (1 / 0)',
+        '(2 ** 0.5) + (2 ** 1000) + (2 ** 1000)',
+        '(y + 1) * (x + 1)',
+        'x + 1 2',
+        '(1 + 2',
+    )
+)
+@pytest.mark.parametrize('backend', ('native', 'fraction', 'decimal'))
+def test_same_results_and_errors(expression, backend):
+    variables = {'x': 3}
+    assert _outcome(Calculator(cse=True, backend=backend), expression, variables) == \
+        _outcome(Calculator(backend=backend), expression, variables)
+
+
+def test_same_results_on_corpora():
+    calculator = Calculator(cse=True)
+    reference = Calculator()
+    for name in ('short', 'nested', 'errors'):
+        for expression in generate_corpus(PRESETS[name])[:200]:
+            assert _outcome(calculator, expression) == _outcome(reference, expression)
+
+
+def test_decimal_keys_keep_representation():
+    assert str(Calculator(cse=True, backend='decimal').calculate('(1.0 * 2) + (1.00 * 2)')) == '4.00'
+
+
+def test_unknown_variable_position():
+    with pytest.raises(ParsingError) as e:
+        Calculator(cse=True).calculate('(x + y) * (x + y)', {'x': 1})
+    assert (e.value.error_type, e.value.message, e.value.position) == ('Unknown variable', 'y', 5)
+
+
+def test_budget_positions():
+    expression = '(3 ** 50 * 3 ** 50) + (3 ** 50 * 3 ** 50)'
+    with pytest.raises(BudgetExceededError) as e:
+        Calculator(cse=True, max_bits=100).calculate(expression)
+    assert e.value.position == 9
+    # Repeated subexpressions count as one operation
+    assert Calculator(cse=True, max_operations=4).calculate(expression) == 2 * 3 ** 100
+
+
+def test_malformed_rpn_falls_back():
+    calculator = Calculator(cse=True)
+    with pytest.raises(ParsingError) as e:
+        ExpressionDAG(calculator.to_rpn('1 2'), calculator.evaluator).evaluate()
+    assert e.value.message == 'Too many operands'
+
+
+def test_compile_and_session_with_cse():
+    calculator = Calculator(cse=True)
+    compiled = calculator.compile('(x * x) + (x * x)')
+    assert isinstance(compiled, ExpressionDAG)
+    assert compiled({'x': 3}) == 18
+    assert compiled.variables == ['x']
+
+
+def test_pratt_engine_rejects_cse():
+    with pytest.raises(ValueError):
+        Calculator(engine='pratt', cse=True)
@@ -1,6 +1,6 @@
 import pytest
 from calculator_functions.evaluator import EvaluatorRPN
-from calculator_functions.tokenizer import Token
+from calculator_functions.tokenizer import Token, Variable
 from calculator_functions.errors import ParsingError
 
 @pytest.mark.parametrize(
@@ -59,3 +59,17 @@ def test_evaluator_value_exceptions(rpn_values, expected):
     with pytest.raises(ValueError) as e_info:
         evaluator.evaluate_of_rpn(rpn)
     assert expected in str(e_info.value)
+
+
+def test_evaluator_variables():
+    evaluator = EvaluatorRPN()
+    rpn = [Token(v, i) for i, v in enumerate([Variable('x'), 2, '*', Variable('y'), '+'])]
+    assert evaluator.evaluate_of_rpn(rpn, {'x': 5, 'y': 0.5}) == 10.5
+
+
+def test_evaluator_unknown_variable():
+    evaluator = EvaluatorRPN()
+    rpn = [Token(v, i) for i, v in enumerate([1, Variable('x'), '+'])]
+    with pytest.raises(ParsingError) as e_info:
+        evaluator.evaluate_of_rpn(rpn, {'y': 1})
+    assert str(e_info.value) == "Unknown variable error: x at position 1"
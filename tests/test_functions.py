@@ -0,0 +1,95 @@
+import math
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.registry import DEFAULT_REGISTRY, OperatorRegistry, FUNCTION
+from decimal import Decimal
+from fractions import Fraction
+
+
+def clamp(x, low, high):
+    return max(low, min(x, high))
+
+
+FUNCTIONS = {'clamp': (clamp, 3), 'hypot': (math.hypot, 2)}
+
+ENGINES = (
+    pytest.param({}, id='rpn'),
+    pytest.param({'optimize': True}, id='optimize'),
+    pytest.param({'engine': 'pratt'}, id='pratt'),
+    pytest.param({'cse': True}, id='cse'),
+    pytest.param({'max_operations': 100}, id='budget'),
+)
+
+
+@pytest.mark.parametrize('settings', ENGINES)
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('sqrt(16) + 1', 5.0),
+        pytest.param('max(1, 2) * min(3, -x)', -10),
+        pytest.param('-max(-1, +2) ** 2', 4),
+        pytest.param('hypot(3, 4) * clamp(x, 0, 1)', 5.0),
+        pytest.param('clamp(max(x, 7), sqrt(4), 2 * 3)', 6),
+    )
+)
+def test_functions(settings, expression, expected):
+    calculator = Calculator(functions=FUNCTIONS, **settings)
+    assert calculator.calculate(expression, {'x': 5}) == expected
+    assert calculator.compile(expression).evaluate({'x': 5}) == expected
+
+
+@pytest.mark.parametrize('settings', ENGINES)
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('sqrt(-4)', ('Calculation', 'Negative number under the root', 0)),
+        pytest.param('1 + sqrt 4', ('Invalid function call', 'sqrt', 4)),
+        pytest.param('clamp(1, 2)', ('Invalid number of arguments', 'clamp', 0)),
+        pytest.param('max(1,)', ('Calculation', 'Not enough arguments for a function max', 0)),
+        pytest.param('(1, 2)', ('Invalid function call', ',', 2)),
+        pytest.param('max(1, 2', ('Unbalanced brackets', '(', 3)),
+    )
+)
+def test_function_errors(settings, expression, expected):
+    with pytest.raises(ParsingError) as e:
+        Calculator(functions=FUNCTIONS, **settings).calculate(expression)
+    assert (e.value.error_type, e.value.message, e.value.position) == expected
+
+
+@pytest.mark.parametrize(
+    ('backend', 'expression', 'expected'),
+    (
+        pytest.param('fraction', 'max(1/3, 1/4)', Fraction(1, 3)),
+        pytest.param('decimal', 'sqrt(2)', Decimal('1.414213562373095048801688724')),
+    )
+)
+def test_backend_functions(backend, expression, expected):
+    assert Calculator(backend=backend).calculate(expression) == expected
+
+
+def test_registry():
+    registry = DEFAULT_REGISTRY.copy()
+    opcode = registry.register_function('clamp', clamp, 3)
+    assert opcode == len(DEFAULT_REGISTRY.names)
+    assert registry.opcodes['sqrt'] == DEFAULT_REGISTRY.opcodes['sqrt']
+    assert (registry.kinds[opcode], registry.arities[opcode]) == (FUNCTION, 3)
+    assert 'clamp' not in DEFAULT_REGISTRY.opcodes
+    assert registry.copy().opcodes == registry.opcodes
+
+    for name, arity in (('max', 2), ('2x', 1), ('f', 0)):
+        with pytest.raises(ValueError):
+            OperatorRegistry().register_function(name, clamp, arity)
+
+
+def test_function_names_are_not_variables():
+    with pytest.raises(ParsingError) as e:
+        Calculator().calculate('max + 1', {'max': 1})
+    assert e.value.error_type == 'Invalid function call'
+    assert Calculator().calculate('clamp + 1', {'clamp': 1}) == 2
+
+
+def test_functions_in_worker_processes():
+    calculator = Calculator(functions=FUNCTIONS)
+    results = calculator.calculate_many(['hypot(3, 4)', 'clamp(9, 0, 1)'] * 1500, workers=2)
+    assert results[:2] == [5.0, 1]
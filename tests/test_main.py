@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from calculator_functions.calculator import Calculator
+from main import interactive, main, stream
+
+INPUT = '2+2\n7/2\n1/0\n\n4.0*2\n'
+
+
+def test_stream_plain():
+    output = io.StringIO()
+    stream(io.StringIO(INPUT), output, Calculator(cache_size=8), batch_size=2)
+    assert output.getvalue().splitlines() == [
+        '4',
+        '3.5',
+        'Calculation error: Division by zero at position 0',
+        'Invalid expression error: Empty expression at position 0',
+        '8',
+    ]
+
+
+def test_stream_json():
+    output = io.StringIO()
+    stream(io.StringIO('1+2\n(1+2\n'), output, Calculator(), output_format='json')
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records == [
+        {'expression': '1+2', 'result': 3},
+        {'expression': '(1+2', 'error': {'type': 'Unbalanced brackets', 'message': '(', 'position': 0}},
+    ]
+
+
+def test_stream_with_process_pool():
+    calculator = Calculator()
+    expected = io.StringIO()
+    stream(io.StringIO(INPUT * 10), expected, calculator)
+    output = io.StringIO()
+    with calculator.create_pool(2) as executor:
+        stream(io.StringIO(INPUT * 10), output, calculator, batch_size=7, executor=executor)
+    assert output.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize('output_format', ('plain', 'json'))
+def test_main_stream_from_file(tmp_path, capsys, output_format):
+    path = tmp_path / 'expressions.txt'
+    path.write_text('2 ** 10\n1&2\n')
+    main(['--stream', '--input', str(path), '--format', output_format])
+    lines = capsys.readouterr().out.splitlines()
+    if output_format == 'plain':
+        assert lines == ['1024', 'Unknown symbol error: & at position 1']
+    else:
+        assert json.loads(lines[1])['error']['type'] == 'Unknown symbol'
+
+
+def test_main_stream_prints_stats(tmp_path, capsys):
+    path = tmp_path / 'expressions.txt'
+    path.write_text('1+2\n1/0\n')
+    main(['--stream', '--input', str(path), '--stats'])
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ['3', 'Calculation error: Division by zero at position 0']
+    assert 'Calls: 2, errors: 1' in captured.err
+    assert 'Calculation errors: 1' in captured.err
+
+
+def test_interactive_named_results(monkeypatch, capsys):
+    lines = iter(['a = 2 ** 3', 'b = a + 1', 'a = 1', 'ans * 10', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(lines))
+    interactive(Calculator())
+    output = capsys.readouterr().out.splitlines()
+    assert output[-6:] == ['a = 8', 'b = 9', 'a = 1', '  b = 2', 'Result: 10', 'Bye-bye!']
+
+
+@pytest.mark.parametrize('output_format', ('plain', 'json'))
+def test_stream_survives_results_that_can_not_be_written(output_format):
+    # More than 4300 digits, a float overflow error and an infinite float
+    lines = '2+2\n9999999999 ** 999\n10.0 ** 999\n99999.0 ** 60 * 99999.0 ** 60\n3*3\n'
+    output = io.StringIO()
+    stream(io.StringIO(lines), output, Calculator(), output_format=output_format, batch_size=2)
+    records = output.getvalue().splitlines()
+    if output_format == 'plain':
+        assert records[0] == '4' and records[3:] == ['inf', '9']
+        assert records[1].startswith('Output error: Exceeds the limit')
+        assert records[2].startswith('Calculation error:')
+    else:
+        records = [json.loads(record) for record in records]
+        assert records[0]['result'] == 4 and records[4]['result'] == 9
+        assert [record.get('error', {}).get('type') for record in records] == [
+            None, 'Output', 'Calculation', 'Output', None]
@@ -0,0 +1,95 @@
+import itertools
+from decimal import Decimal
+
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.optimizer import RPNOptimizer
+from calculator_functions.tokenizer import Token, Variable
+
+X = Variable('x')
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected_values'),
+    (
+        pytest.param('2 + 3 * 4', [14]),
+        pytest.param('x * (2 + 3)', [X, 5, '*']),
+        pytest.param('+x', [X]),
+        pytest.param('-(-x)', [X]),
+        pytest.param('-(-(-x))', [X, '~']),
+        pytest.param('-(2)', [-2]),
+        pytest.param('x * 1', [X]),
+        pytest.param('1 * x', [X]),
+        pytest.param('x + 0', [X]),
+        pytest.param('0 + x', [X]),
+        pytest.param('x - 0', [X]),
+        pytest.param('0 - x', [0, X, '-']),
+        pytest.param('x * (3 - 2)', [X]),
+        pytest.param('x * 1.0', [X, 1.0, '*']),
+        pytest.param('x / 1', [X, 1, '/']),
+        pytest.param('x + 1 / 0', [X, 1, 0, '/', '+']),
+        pytest.param('2 ** 1000 * x', [2, 1000, '**', X, '*']),
+        pytest.param('4.5 // 5 + x', [4.5, 5, '//', X, '+']),
+    )
+)
+def test_optimizer_rpn(expression, expected_values):
+    rpn = Calculator(optimize=True).to_rpn(expression)
+    assert [t.value for t in rpn] == expected_values
+
+
+@pytest.mark.parametrize(
+    'rpn_values',
+    (
+        pytest.param([2, '+']),
+        pytest.param([2, 3]),
+        pytest.param(['~']),
+    )
+)
+def test_optimizer_keeps_malformed_rpn(rpn_values):
+    rpn = [Token(v, i) for i, v in enumerate(rpn_values)]
+    assert RPNOptimizer().optimize(rpn) is rpn
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        pytest.param('(1+3)/(2.5-2) * x'),
+        pytest.param('x * 1 + 0 - -(-x)'),
+        pytest.param('2 ** 2 ** 3 + x // 1'),
+        pytest.param('x / (2 - 2)'),
+        pytest.param('x ** (0.5 - 1)'),
+        pytest.param('-2 ** 0.5 + x'),
+        pytest.param('2 ** 11111111 * 0'),
+        pytest.param('1-*'),
+        pytest.param('1 2 x'),
+        pytest.param('y * 1'),
+    )
+)
+def test_optimizer_keeps_results_and_errors(expression):
+    plain = Calculator()
+    optimized = Calculator(optimize=True)
+    variables = {'x': 3}
+    try:
+        expected = plain.calculate(expression, variables)
+    except ParsingError as e:
+        with pytest.raises(ParsingError) as e_info:
+            optimized.calculate(expression, variables)
+        assert str(e_info.value) == str(e)
+    else:
+        result = optimized.calculate(expression, variables)
+        assert result == expected
+        assert type(result) is type(expected)
+
+
+def test_identities_only_on_native_backend():
+    calculator = Calculator(backend='decimal', optimize=True)
+    assert [t.value for t in calculator.to_rpn('x * 1 + 0')][1:] == [1, '*', 0, '+']
+    x = Decimal('1.00000000000000000000000000001')
+    assert calculator.calculate('x * 1', {'x': x}) == Calculator(backend='decimal').calculate('x * 1', {'x': x})
+
+
+def test_user_functions_are_not_folded():
+    counter = itertools.count()
+    calculator = Calculator(functions={'tick': (lambda x: x + next(counter), 1)}, optimize=True)
+    assert [calculator.calculate('tick(0) + 2 * 3') for _ in range(3)] == [6, 7, 8]
@@ -0,0 +1,79 @@
+import pytest
+from benchmarks import corpus
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.parallel import ParallelEvaluator, multiplication_cost
+from concurrent.futures import ThreadPoolExecutor
+
+VARIABLES = {'a': 3 ** 2000, 'b': 7 ** 1500, 'c': 5 ** 1700, 'd': 11 ** 1200}
+
+
+def _outcome(function, *args, **kwargs):
+    try:
+        return function(*args, **kwargs)
+    except (ParsingError, ArithmeticError) as e:
+        return type(e), str(e)
+
+
+def test_plan_submits_independent_heavy_subtrees():
+    calculator = Calculator()
+    rpn = calculator.to_rpn('(a**9 * b**9) + (c**9 * d**9) + 1')
+    with ThreadPoolExecutor(2) as executor:
+        evaluator = ParallelEvaluator(calculator.evaluator, executor, min_cost=1000)
+        # a**9 * b**9 is submitted, then c**9 next to the more expensive d**9
+        assert evaluator.plan(rpn, VARIABLES) == [(0, 6), (7, 9)]
+        assert ParallelEvaluator(calculator.evaluator, executor).plan(rpn, VARIABLES) == []
+        assert evaluator.plan(calculator.to_rpn('1 + 2 * 3'), {}) == []
+
+
+def test_cost_estimate():
+    assert multiplication_cost(60, 60) == 9
+    assert multiplication_cost(300_000, 300_000) > 1000 * multiplication_cost(3000, 3000)
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        '(a**9 * b**9) + (c**9 * d**9)',
+        'max(a**5 - b**6, c**7) // (d**3 % a**2)',
+        '(a * b) ** 3 - (c * d) ** 2 + sqrt(a) * 0',
+        # Every subtree fails inline or in a submitted slice, the first in RPN order wins
+        '(a**9 // 0) + (c**9 % 1.5)',
+        '(a**9 * b**9) + (c**9 * d**99 % 1.5) + x',
+        '(a**9 * b) ** 0.5 + (c**9 * d**9 * (-1)) ** 0.5',
+        '(a**9 * q) + (c**9 * z)',
+    )
+)
+def test_same_results_and_errors(expression):
+    calculator = Calculator()
+    expected = _outcome(calculator.calculate, expression, VARIABLES)
+    with ThreadPoolExecutor(2) as executor:
+        for min_cost in (0, 1000, 10 ** 12):
+            assert _outcome(calculator.calculate_parallel, expression, VARIABLES,
+                            executor=executor, min_cost=min_cost) == expected
+
+
+def test_corpus_matches_serial_evaluation():
+    calculator = Calculator()
+    expressions = corpus.generate_corpus(corpus.CorpusSpec(count=60, length=6, depth=2,
+                                                           float_ratio=0.2, bigint_ratio=0.3, error_rate=0.2))
+    with ThreadPoolExecutor(4) as executor:
+        for expression in expressions:
+            assert (_outcome(calculator.calculate_parallel, expression, executor=executor, min_cost=100)
+                    == _outcome(calculator.calculate, expression))
+
+
+def test_process_pool():
+    calculator = Calculator(functions={'twice': (abs, 1)})
+    expression = 'twice(a**9 * b**9) - (c**9 * d**9)'
+    with calculator.create_pool(2) as executor:
+        assert (calculator.calculate_parallel(expression, VARIABLES, executor=executor, min_cost=1000)
+                == calculator.calculate(expression, VARIABLES))
+        assert (_outcome(calculator.calculate_parallel, '(a**9 * b) // 0 + c**9 * y', VARIABLES,
+                         executor=executor, min_cost=1000)
+                == (ParsingError, 'Calculation error: Division by zero at position 0'))
+
+
+def test_budgets_are_not_supported():
+    with pytest.raises(ValueError):
+        Calculator(max_bits=100).calculate_parallel('1 + 2', executor=ThreadPoolExecutor(1))
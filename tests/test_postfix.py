@@ -0,0 +1,109 @@
+import io
+
+import pytest
+from benchmarks import corpus
+from calculator_functions.budget import BudgetExceededError
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.tokenizer import PostfixTokenizer, Tokenizer, Variable, _ChunkTokenizer
+from fractions import Fraction
+from main import main, stream
+
+
+def _postfix(rpn):
+    return ' '.join(token.value.name if isinstance(token.value, Variable) else str(token.value) for token in rpn)
+
+
+def _outcome(function, *args):
+    try:
+        return function(*args)
+    except ParsingError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('3 4 + 2 *', 14),
+        pytest.param('2 ~ 9 max 16 sqrt +', 13.0),
+        pytest.param('2 3 2 ** **', 512),
+        pytest.param('7 2 // 7 2 % -', 2),
+        pytest.param('x 1 + $', 6),
+        pytest.param('  .5\t2   /', 0.25),
+    )
+)
+def test_calculate_postfix(expression, expected):
+    assert Calculator().calculate_postfix(expression, {'x': 5}) == expected
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('', 'Invalid expression error: Empty expression at position 0'),
+        pytest.param('1 +', 'Calculation error: Not enough operands for a binary operator + at position 2'),
+        pytest.param('~', 'Calculation error: Not enough operands for a unary operator ~ at position 0'),
+        pytest.param('1 max', 'Calculation error: Not enough arguments for a function max at position 2'),
+        pytest.param('1 2', 'Invalid expression error: Too many operands'),
+        pytest.param('( 1 2 +', 'Unknown symbol error: ( at position 0'),
+        pytest.param('1 2 , +', 'Unknown symbol error: , at position 4'),
+        pytest.param('1.5.5 1 +', 'Invalid number format error: Invalid number format at position 3'),
+        pytest.param('1 0 / &', 'Calculation error: Division by zero at position 0'),
+        pytest.param('1 + &', 'Calculation error: Not enough operands for a binary operator + at position 2'),
+        pytest.param('y', 'Unknown variable error: y at position 0'),
+    )
+)
+def test_errors_in_input_order(expression, expected):
+    assert _outcome(Calculator().calculate_postfix, expression) == expected
+
+
+def test_matches_infix_on_corpus():
+    calculator = Calculator()
+    for expression in corpus.generate_corpus(corpus.PRESETS['nested']):
+        rpn = calculator.to_rpn(expression)
+        assert repr(_outcome(calculator.calculate_postfix, _postfix(rpn))) == repr(_outcome(calculator.calculate, expression))
+
+
+@pytest.mark.parametrize('size', (1, 2, 3, 7))
+def test_chunks(size):
+    expression = '1225 3 ** 1000 x - // 4 5 max +'
+    chunks = [expression[i:i + size] for i in range(0, len(expression), size)]
+    calculator = Calculator()
+    assert calculator.calculate_postfix(iter(chunks), {'x': 2}) == calculator.calculate_postfix(expression, {'x': 2})
+    tokens = list(PostfixTokenizer().iter_tokens(chunks))
+    assert [token.position for token in tokens] == [0, 5, 7, 10, 15, 17, 19, 22, 24, 26, 30]
+    assert _outcome(calculator.calculate_postfix, iter(['1 2', '3.', '5. +'])) == \
+        'Invalid number format error: Invalid number format at position 6'
+
+
+def test_backends_functions_and_budgets():
+    assert Calculator(backend='fraction').calculate_postfix('1 3 / 1 6 / +') == Fraction(1, 2)
+    calculator = Calculator(functions={'clamp': (lambda x, low, high: max(low, min(x, high)), 3)})
+    assert calculator.calculate_postfix('15 0 10 clamp') == 10
+    with pytest.raises(BudgetExceededError):
+        Calculator(max_operations=2).calculate_postfix('1 2 + 3 + 4 +')
+
+
+def test_calculate_many_and_cli(tmp_path, capsys):
+    calculator = Calculator()
+    lines = ['3 4 +', '1 +', '2 10 **']
+    assert [str(result) for result in calculator.calculate_many(lines, workers=1, postfix=True)] == [
+        '7', 'Calculation error: Not enough operands for a binary operator + at position 2', '1024']
+    with calculator.create_pool(2) as executor:
+        assert ([str(result) for result in calculator.calculate_many(lines, executor=executor, postfix=True)]
+                == [str(result) for result in calculator.calculate_many(lines, workers=1, postfix=True)])
+
+    output = io.StringIO()
+    stream(io.StringIO('\n'.join(lines) + '\n'), output, calculator, postfix=True)
+    assert output.getvalue().splitlines()[2] == '1024'
+
+    path = tmp_path / 'expression.txt'
+    path.write_text(' '.join(['1'] * 1000) + ' +' * 999)
+    main(['--expression-file', str(path), '--postfix'])
+    assert capsys.readouterr().out.strip() == '1000'
+
+
+def test_tokenizers_classify_operators():
+    with pytest.raises(TypeError):
+        _ChunkTokenizer()
+    assert [token.value for token in PostfixTokenizer().iter_tokens(['1 -'])] == [1, '-']
+    assert [token.value for token in Tokenizer().iter_tokens(['-1'])] == ['~', 1]
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+
+
+def _outcome(calculator, expression, variables=None):
+    try:
+        result = calculator.calculate(expression, variables)
+        return type(result), result
+    except ParsingError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        pytest.param('2 + 2 * 2'),
+        pytest.param('(2 + 2) * 2'),
+        pytest.param('2 ** 2 ** 3'),
+        pytest.param('2 ** 3 ** 2 ** 0'),
+        pytest.param('-2 ** 2'),
+        pytest.param('10 - 4 - 3'),
+        pytest.param('100 / 10 / 5'),
+        pytest.param('7 // 2 * 3 % 4'),
+        pytest.param('-(-3) + +(5)'),
+        pytest.param('(((((((2 + 5))))) * 7)) + 0'),
+        pytest.param('x * (y - 1)'),
+        pytest.param('1 2 +'),
+        pytest.param('1 2'),
+        pytest.param('1-*'),
+        pytest.param('(-)'),
+        pytest.param('+'),
+        pytest.param('((1+2)'),
+        pytest.param('(1+2))'),
+        pytest.param('()'),
+        pytest.param('1/0 + (2'),
+        pytest.param('1/0 + 2 ** 11111111'),
+        pytest.param('-2 ** 0.5'),
+        pytest.param('z + 1/0'),
+        pytest.param('1/0 + z'),
+        pytest.param('(' * 600 + '1' + ')' * 600),
+    )
+)
+def test_pratt_matches_rpn(expression):
+    variables = {'x': 3, 'y': 0.5}
+    assert _outcome(Calculator(engine='pratt'), expression, variables) == \
+        _outcome(Calculator(), expression, variables)
+
+
+def test_pratt_matches_rpn_on_random_expressions():
+    generator = random.Random(8)
+    parts = ['1', '2', '0', '2.5', 'x', '+', '-', '*', '/', '//', '%', '**', '(', ')', ' ']
+    rpn, pratt = Calculator(), Calculator(engine='pratt')
+    for _ in range(3000):
+        expression = ''.join(generator.choice(parts) for _ in range(generator.randint(1, 9)))
+        assert _outcome(pratt, expression, {'x': 4}) == _outcome(rpn, expression, {'x': 4}), expression
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Calculator(engine='fast')
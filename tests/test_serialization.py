@@ -0,0 +1,159 @@
+import pickle
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import BudgetExceededError, LibraryFormatError, ParsingError
+from calculator_functions.serialization import HEADER, ExpressionLibrary
+
+EXPRESSIONS = ['1 + 2 * 3', 'x * (y - 1.5)', '2 ** 10 // 3 % 7', '-(4) + 5', '1 / z', '12345 * 678',
+               'sqrt(max(x, 4)) + min(y, 1)']
+
+
+def _library(tmp_path, expressions=EXPRESSIONS, calculator=None):
+    calculator = calculator or Calculator()
+    path = str(tmp_path / 'library.bin')
+    assert calculator.save_library(path, expressions) == len(expressions)
+    return path
+
+
+def test_round_trip(tmp_path):
+    calculator = Calculator()
+    with calculator.load_library(_library(tmp_path)) as library:
+        assert len(library) == len(EXPRESSIONS)
+        for index, expression in enumerate(EXPRESSIONS):
+            expected = calculator.to_rpn(expression)
+            assert [(t.value, t.position) for t in library.rpn(index)] == [(t.value, t.position) for t in expected]
+        assert library.evaluate(1, {'x': 2, 'y': 3}) == 3.0
+        with pytest.raises(ParsingError) as e:
+            library.evaluate(4)
+        assert (e.value.error_type, e.value.message, e.value.position) == ('Unknown variable', 'z', 4)
+        assert library.evaluate(6, {'x': 9, 'y': 3}) == 4.0
+        with pytest.raises(IndexError):
+            library.rpn(len(EXPRESSIONS))
+
+
+@pytest.mark.parametrize(
+    ('backend', 'expected'),
+    (
+        pytest.param('fraction', Fraction(1, 3) + Fraction(1, 10)),
+        pytest.param('decimal', Decimal('0.4333333333333333333333333333')),
+    )
+)
+def test_exact_backends(tmp_path, backend, expected):
+    calculator = Calculator(backend=backend, optimize=True)
+    path = _library(tmp_path, ['1 / 3 + 0.1', '2 ** 200 * x'], calculator)
+    with calculator.load_library(path) as library:
+        assert library.evaluate(0) == expected
+        assert type(library.evaluate(0)) is type(expected)
+        assert library.evaluate(1, {'x': 1}) == calculator.calculate('2 ** 200 * x', {'x': 1})
+
+
+def test_user_functions_are_not_stored(tmp_path):
+    calculator = Calculator(functions={'half': (lambda x: x / 2, 1)})
+    with pytest.raises(TypeError, match="user-defined function 'half'"):
+        _library(tmp_path, ['half(4)'], calculator)
+
+
+def test_pickled_library_in_worker(tmp_path):
+    path = _library(tmp_path)
+    library = ExpressionLibrary(path)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(pickle.loads(pickle.dumps(library)).evaluate, 2).result() == 5
+    library.close()
+
+
+def test_pickled_library_keeps_backend_and_budget(tmp_path):
+    path = _library(tmp_path, ['1 / 3 + x', '2 ** 999 * 2 ** 999'])
+    with Calculator(backend='fraction', max_bits=1000).load_library(path) as library:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            copy = pickle.loads(pickle.dumps(library))
+            assert executor.submit(copy.evaluate, 0, {'x': Fraction(2, 3)}).result() == Fraction(1)
+            with pytest.raises(BudgetExceededError):
+                executor.submit(copy.evaluate, 1).result()
+            copy.close()
+
+
+def _rewrite(path, data: bytearray, fix_checksum: bool = True) -> None:
+    if fix_checksum:
+        fields = list(HEADER.unpack_from(data))
+        fields[-1] = zlib.crc32(bytes(data[HEADER.size:]))
+        HEADER.pack_into(data, 0, *fields)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def _field(data: bytearray, index: int, value: int) -> bytearray:
+    fields = list(HEADER.unpack_from(data))
+    fields[index] = value
+    HEADER.pack_into(data, 0, *fields)
+    return data
+
+
+@pytest.mark.parametrize(
+    ('corrupt', 'message'),
+    (
+        pytest.param(lambda data: data[:0], 'not a library'),
+        pytest.param(lambda data: data[:10], 'not a library'),
+        pytest.param(lambda data: b'XXXX' + data[4:], 'not a library'),
+        pytest.param(lambda data: _field(data, 1, 2), 'unsupported version 2'),
+        pytest.param(lambda data: data[:-1], 'does not match the header'),
+        pytest.param(lambda data: data + b'\0', 'does not match the header'),
+    )
+)
+def test_rejects_corrupt_header(tmp_path, corrupt, message):
+    path = _library(tmp_path)
+    with open(path, 'rb') as file:
+        data = bytearray(file.read())
+    with open(path, 'wb') as file:
+        file.write(corrupt(data))
+    with pytest.raises(LibraryFormatError, match=message):
+        ExpressionLibrary(path)
+
+
+def test_rejects_checksum_mismatch(tmp_path):
+    path = _library(tmp_path)
+    with open(path, 'rb') as file:
+        data = bytearray(file.read())
+    data[-1] ^= 0xFF
+    _rewrite(path, data, fix_checksum=False)
+    with pytest.raises(LibraryFormatError, match='checksum'):
+        ExpressionLibrary(path)
+
+
+def test_rejects_invalid_instructions(tmp_path):
+    path = _library(tmp_path, ['1 + 2'])
+    with open(path, 'rb') as file:
+        data = bytearray(file.read())
+    _, _, _, expressions, instructions, constants, _, _ = HEADER.unpack_from(data)
+    opcodes_start = HEADER.size + 8 * expressions + 8 * instructions + 4 * (constants + 1)
+
+    invalid_opcode = bytearray(data)
+    invalid_opcode[opcodes_start + 2] = 200
+    _rewrite(path, invalid_opcode)
+    with pytest.raises(LibraryFormatError, match='invalid opcode 200 at instruction 2'):
+        ExpressionLibrary(path)
+
+    invalid_operand = bytearray(data)
+    struct.pack_into('<I', invalid_operand, HEADER.size + 8 * expressions, 99)
+    _rewrite(path, invalid_operand)
+    with pytest.raises(LibraryFormatError, match='invalid operand at instruction 0'):
+        ExpressionLibrary(path)
+
+
+def test_rejects_invalid_constant(tmp_path):
+    path = _library(tmp_path, ['1 + 2'])
+    with open(path, 'rb') as file:
+        data = bytearray(file.read())
+    _, _, _, expressions, instructions, constants, _, _ = HEADER.unpack_from(data)
+    data_start = HEADER.size + 8 * expressions + 8 * instructions + 4 * (constants + 1) + instructions
+    # The integer 1 read as a float of one byte
+    data[data_start] = 1
+    _rewrite(path, data)
+    with ExpressionLibrary(path) as library:
+        with pytest.raises(LibraryFormatError, match='invalid constant 0: a float must have 8 bytes, not 1'):
+            library.rpn(0)
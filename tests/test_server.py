@@ -0,0 +1,109 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
+import json
+
+import pytest
+from benchmarks.loadgen import run_local
+from calculator_functions.calculator import Calculator
+from calculator_functions.formatting import format_plain
+from server import MAX_LINE_LENGTH, start_server, start_workers
+
+
+async def _exchange(lines: list[str], calculator: Calculator | None = None, executor: Executor | None = None,
+                    **options) -> list[str]:
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return await _exchange(lines, calculator, executor, **options)
+    server = await start_server(calculator or Calculator(cache_size=8), executor, **options)
+    async with server:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        # Every request is sent before any response is read
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        await writer.drain()
+        writer.write_eof()
+        responses = (await reader.read()).decode().splitlines()
+        writer.close()
+        await writer.wait_closed()
+    return responses
+
+
+def test_server_pipelined_plain():
+    responses = asyncio.run(_exchange(['2+2', '7/2', '1/0', '', '(1+2']))
+    assert responses == [
+        '4',
+        '3.5',
+        'Calculation error: Division by zero at position 0',
+        'Invalid expression error: Empty expression at position 0',
+        'Unbalanced brackets error: ( at position 0',
+    ]
+
+
+def test_server_json():
+    responses = asyncio.run(_exchange(['1+2', '1&2'], output_format='json'))
+    assert [json.loads(line) for line in responses] == [
+        {'expression': '1+2', 'result': 3},
+        {'expression': '1&2', 'error': {'type': 'Unknown symbol', 'message': '&', 'position': 1}},
+    ]
+
+
+class _FailingCalculator(Calculator):
+    def calculate_or_error(self, expression, postfix=False):
+        if expression == 'fail':
+            raise OverflowError('broken')
+        return super().calculate_or_error(expression, postfix)
+
+
+@pytest.mark.parametrize('output_format', ('plain', 'json'))
+def test_server_answers_after_failed_requests(output_format):
+    lines = ['1+1', '9999999999 ** 999', '10.0 ** 999', 'fail', '2*3']
+    responses = asyncio.run(_exchange(lines, _FailingCalculator(), output_format=output_format))
+    assert len(responses) == 5
+    if output_format == 'plain':
+        assert responses[0] == '2' and responses[4] == '6'
+        assert responses[1].startswith('Output error: Exceeds the limit')
+        assert responses[3] == 'Calculation error: broken at position 0'
+    else:
+        records = [json.loads(line) for line in responses]
+        assert [record.get('error', {}).get('type') for record in records] == [
+            None, 'Output', 'Calculation', 'Calculation', None]
+
+
+@pytest.mark.parametrize('output_format', ('plain', 'json'))
+def test_server_answers_too_long_line(output_format):
+    responses = asyncio.run(_exchange(['1+2', '1' * (MAX_LINE_LENGTH + 1), '2+3'], output_format=output_format))
+    message = f'Line longer than {MAX_LINE_LENGTH} bytes'
+    if output_format == 'plain':
+        assert responses == ['3', f'Invalid expression error: {message}']
+    else:
+        assert [json.loads(line) for line in responses] == [
+            {'expression': '1+2', 'result': 3},
+            {'expression': '', 'error': {'type': 'Invalid expression', 'message': message, 'position': None}},
+        ]
+
+
+@pytest.mark.parametrize('max_pending', (1, 3, 256))
+def test_server_keeps_order_under_backpressure(max_pending):
+    lines = [f'{i} * 2' for i in range(500)]
+    responses = asyncio.run(_exchange(lines, max_pending=max_pending))
+    assert responses == [str(i * 2) for i in range(500)]
+
+
+def test_server_with_process_pool():
+    calculator = Calculator()
+    lines = ['2 ** 10', '1 // 0', '3.5 * 2'] * 20
+
+    async def exchange():
+        with calculator.create_pool(2) as executor:
+            start_workers(calculator, executor, 2)
+            return await _exchange(lines, executor=executor)
+
+    assert asyncio.run(exchange()) == [format_plain(calculator.calculate_or_error(line)) for line in lines]
+
+
+def test_loadgen():
+    expressions = ['1 + 1', '2 * 3', '1 / 0'] * 50
+    report = asyncio.run(run_local(expressions, connections=3, pipeline=8))
+    assert report['count'] == 150
+    assert report['errors'] == 50
+    assert 0 < report['latency_ns']['p50'] <= report['latency_ns']['p99'] <= report['latency_ns']['max']
@@ -0,0 +1,91 @@
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.session import Session
+
+
+def test_assignments_and_ans():
+    session = Session()
+    assert session.execute('a = 2 ** 10') == ('a', 1024, {})
+    assert session.execute('b = a * 3') == ('b', 3072, {})
+    assert session.execute('ans + 1') == (None, 3073, {})
+    assert session.execute('ans * 2') == (None, 6146, {})
+
+
+def test_redefinition_recomputes_dependents_in_order():
+    session = Session()
+    for line in ('a = 1', 'b = a + 1', 'c = b * 10', 'd = a + c', 'e = 5'):
+        session.execute(line)
+    name, value, updated = session.execute('a = 2')
+    assert (name, value) == ('a', 2)
+    assert updated == {'b': 3, 'c': 30, 'd': 32}
+    assert list(updated).index('c') < list(updated).index('d')
+    assert session.values['e'] == 5
+
+
+def test_recompute_uses_compiled_expressions(monkeypatch):
+    calculator = Calculator()
+    session = Session(calculator)
+    session.execute('a = 1')
+    session.execute('b = a * 2')
+    session.execute('c = b + a')
+
+    compiled = []
+    original = calculator.compile
+    monkeypatch.setattr(calculator, 'compile', lambda expression: compiled.append(expression) or original(expression))
+    assert session.execute('a = 10').updated == {'b': 20, 'c': 30}
+    assert len(compiled) == 1
+
+
+def test_ans_is_bound_at_definition():
+    session = Session()
+    session.execute('5')
+    session.execute('x = 1')
+    session.execute('y = ans + x')
+    assert session.values['y'] == 2
+    session.execute('100')
+    assert session.execute('x = 2').updated == {'y': 3}
+
+
+def test_failed_dependent_is_undefined_until_fixed():
+    session = Session()
+    session.execute('a = 1')
+    session.execute('b = 1 / a')
+    session.execute('c = b + 1')
+    _, _, updated = session.execute('a = 0')
+    assert isinstance(updated['b'], ParsingError)
+    assert updated['c'].error_type == 'Unknown variable'
+    assert 'b' not in session.values
+    assert session.execute('a = 4').updated == {'b': 0.25, 'c': 1.25}
+
+
+@pytest.mark.parametrize(
+    ('lines', 'error_type', 'message', 'position'),
+    (
+        pytest.param(['a = a + 1'], 'Circular reference', 'a', 4),
+        pytest.param(['a = 1', 'b = a', 'a = 2 * b'], 'Circular reference', 'b', 8),
+        pytest.param(['ans = 1'], 'Invalid assignment', 'ans', 0),
+        pytest.param(['max = 3'], 'Invalid assignment', 'max', 0),
+        pytest.param(['  sqrt = 4'], 'Invalid assignment', 'sqrt', 2),
+        pytest.param(['b = a * 3'], 'Unknown variable', 'a', 4),
+        pytest.param(['x =  1 & 2'], 'Unknown symbol', '&', 7),
+        pytest.param(['x ='], 'Invalid expression', 'Empty expression', 0),
+    )
+)
+def test_errors(lines, error_type, message, position):
+    session = Session()
+    for line in lines[:-1]:
+        session.execute(line)
+    with pytest.raises(ParsingError) as e:
+        session.execute(lines[-1])
+    assert (e.value.error_type, e.value.message, e.value.position) == (error_type, message, position)
+
+
+def test_failed_assignment_keeps_old_definition():
+    session = Session()
+    session.execute('a = 1')
+    session.execute('b = a + 1')
+    with pytest.raises(ParsingError):
+        session.execute('a = 1 / 0')
+    assert session.values['a'] == 1
+    assert session.execute('a = 5').updated == {'b': 6}
@@ -1,6 +1,6 @@
 import pytest
 from calculator_functions.shunting_yard import ShunringYardAlgorithm
-from calculator_functions.tokenizer import Token
+from calculator_functions.tokenizer import Token, Variable
 from calculator_functions.errors import ParsingError
 
 @pytest.mark.parametrize(
@@ -13,6 +13,9 @@ from calculator_functions.errors import ParsingError
         pytest.param([10, '//', 3], [10, 3, '//']),
         pytest.param([10, '%', 3], [10, 3, '%']),
         pytest.param(['~', 5, '+', 10], [5, '~', 10, '+']),
+        pytest.param([Variable('x'), '*', 2, '+', Variable('y')], [Variable('x'), 2, '*', Variable('y'), '+']),
+        pytest.param(['max', '(', 1, ',', 2, '+', 3, ')', '*', 2], [1, 2, 3, '+', 'max', 2, '*']),
+        pytest.param(['sqrt', '(', 'min', '(', 4, ',', 9, ')', ')'], [4, 9, 'min', 'sqrt']),
     ]
 )
 def test_shunting_yard_success(values, expected_values):
@@ -27,6 +30,11 @@ def test_shunting_yard_success(values, expected_values):
         pytest.param(['(', 1, '+', 2], "Unbalanced brackets error: ( at position 0"),
         pytest.param([1, '+', 2, ')'], "Unbalanced brackets error: ) at position 3"),
         pytest.param([1, '&', 2], "Unknown operator error: & at position 1"),
+        pytest.param(['sqrt', 4], "Invalid function call error: sqrt at position 0"),
+        pytest.param([1, '+', 'sqrt'], "Invalid function call error: sqrt at position 2"),
+        pytest.param(['(', 1, ',', 2, ')'], "Invalid function call error: , at position 2"),
+        pytest.param(['max', '(', 1, ')'], "Invalid number of arguments error: max at position 0"),
+        pytest.param(['sqrt', '(', 1, ',', 2, ')'], "Invalid number of arguments error: sqrt at position 0"),
     ]
 )
 def test_shunting_yard_exceptions(values, expected):
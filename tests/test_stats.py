@@ -0,0 +1,70 @@
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.stats import LatencyHistogram, operand_stack_depth
+
+
+def _run(calculator, expressions):
+    for expression in expressions:
+        try:
+            calculator.calculate(expression)
+        except ParsingError:
+            pass
+
+
+@pytest.mark.parametrize('engine', ('rpn', 'pratt'))
+def test_stats_counts_calls_tokens_and_errors(engine):
+    calculator = Calculator(engine=engine, instrument=True)
+    _run(calculator, ['1 + 2', '((1 + 2) * 3)', '1/0', '1&2', '(1'])
+    snapshot = calculator.stats.snapshot()
+    assert snapshot['calls'] == 5
+    assert snapshot['errors_by_type'] == {'Calculation': 1, 'Unknown symbol': 1, 'Unbalanced brackets': 1}
+    assert snapshot['errors'] == 3
+    assert snapshot['tokens']['max'] == 9
+    assert snapshot['stages']['total']['count'] == 5
+    assert snapshot['stages']['tokenize']['count'] == 4
+
+
+def test_stats_stack_depths():
+    calculator = Calculator(instrument=True)
+    _run(calculator, ['((1 + 2) * 3)', '1 + 2 * 3 ** 4'])
+    snapshot = calculator.stats.snapshot()
+    assert snapshot['max_operator_stack_depth'] == 3
+    assert snapshot['max_operand_stack_depth'] == 4
+    assert snapshot['stages']['shunting_yard']['count'] == 2
+    assert snapshot['stages']['evaluate']['count'] == 2
+
+
+def test_stats_skip_parsing_stages_on_cache_hits():
+    calculator = Calculator(cache_size=4, instrument=True)
+    _run(calculator, ['1 + 2'] * 3)
+    stages = calculator.stats.snapshot()['stages']
+    assert (stages['tokenize']['count'], stages['evaluate']['count'], stages['total']['count']) == (1, 3, 3)
+
+
+def test_stats_disabled_by_default():
+    assert Calculator().stats is None
+
+
+@pytest.mark.parametrize(
+    ('rpn', 'expected'),
+    (
+        pytest.param('1 + 2 * 3 ** 4', 4),
+        pytest.param('1 * 2 + 3 * 4', 3),
+        pytest.param('-(1)', 1),
+    )
+)
+def test_operand_stack_depth(rpn, expected):
+    assert operand_stack_depth(Calculator().to_rpn(rpn)) == expected
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for elapsed in (500, 1500, 1500, 3000, 10 ** 12):
+        histogram.record(elapsed)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 5
+    assert snapshot['buckets'] == {'<=1000': 1, '<=2000': 2, '<=4000': 1}
+    assert snapshot['overflow'] == 1
+    assert histogram.percentile(0.5) == 2000
+    assert histogram.percentile(0.99) is None
@@ -0,0 +1,90 @@
+import io
+import tracemalloc
+
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.shunting_yard import ShunringYardAlgorithm
+from calculator_functions.tokenizer import Tokenizer, read_chunks
+from main import main
+
+EXPRESSIONS = (
+    '1 + 2 * 3',
+    '(1 + 2) * 3 ** 2 ** 2',
+    '-(12.75 // 2) + .5',
+    '123456 // 7 % 5 - 1.25',
+    'x * (y + 1)',
+    '1 / 0 + (2',
+    ') 1 &',
+    '1 / 0 +* 2',
+    '1.5.5',
+    '12345678901',
+    '1 +* 2',
+    '1 2',
+    '(',
+    '',
+    '   ',
+    'x + z',
+)
+
+
+def _chunks(expression: str, size: int) -> list[str]:
+    return [expression[i:i + size] for i in range(0, len(expression), size)]
+
+
+def _outcome(func):
+    try:
+        return func()
+    except ParsingError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+@pytest.mark.parametrize('size', (1, 2, 3, 64))
+def test_stream_matches_calculate(expression, size):
+    calculator = Calculator()
+    variables = {'x': 2, 'y': 3}
+    expected = _outcome(lambda: calculator.calculate(expression, variables))
+    assert _outcome(lambda: calculator.calculate_stream(_chunks(expression, size), variables)) == expected
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS[:5])
+@pytest.mark.parametrize('size', (1, 4))
+def test_iter_tokens_and_rpn(expression, size):
+    tokenizer = Tokenizer()
+    expected = tokenizer.parse_tokens(expression)
+    tokens = list(tokenizer.iter_tokens(_chunks(expression, size)))
+    assert [(t.value, t.position) for t in tokens] == [(t.value, t.position) for t in expected]
+
+    shunting_yard = ShunringYardAlgorithm()
+    rpn = list(shunting_yard.iter_rpn(iter(tokens)))
+    assert [(t.value, t.position) for t in rpn] == \
+        [(t.value, t.position) for t in shunting_yard.shunting_yard(expected)]
+
+
+def test_memory_does_not_grow_with_length():
+    chunk = ' + (2 * 3 - 5)' * 256
+
+    def chunks():
+        yield '0'
+        for _ in range(40):
+            yield chunk
+
+    tracemalloc.start()
+    result = Calculator().calculate_stream(chunks())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert result == 40 * 256
+    assert peak < 40 * len(chunk) // 4
+
+
+def test_read_chunks():
+    assert list(read_chunks(io.StringIO('abcdefg'), 3)) == ['abc', 'def', 'g']
+
+
+def test_main_expression_file(tmp_path, capsys):
+    path = tmp_path / 'expression.txt'
+    path.write_text('1' + ' + 1' * 20000 + '\n')
+    main(['--expression-file', str(path)])
+    assert capsys.readouterr().out == '20001\n'
@@ -1,6 +1,7 @@
 import pytest
-from calculator_functions.tokenizer import Tokenizer
+from calculator_functions.tokenizer import Lexeme, Tokenizer, Variable, scan
 from calculator_functions.errors import ParsingError
+from calculator_functions.registry import DEFAULT_REGISTRY
 
 @pytest.mark.parametrize(
     ("expression", "expected"),
@@ -14,6 +15,10 @@ from calculator_functions.errors import ParsingError
         pytest.param("-5 + 10", [('~', 0), (5, 1), ('+', 3), (10, 5)]),
         pytest.param("+5 + 1", [('$', 0), (5, 1), ('+', 3), (1, 5)]),
         pytest.param("3 + 2.5", [(3, 0), ('+', 2), (2.5, 4)]),
+        pytest.param("x + 2", [(Variable('x'), 0), ('+', 2), (2, 4)]),
+        pytest.param("-rate_1*_t", [('~', 0), (Variable('rate_1'), 1), ('*', 7), (Variable('_t'), 8)]),
+        pytest.param("(x)-1", [('(', 0), (Variable('x'), 1), (')', 2), ('-', 3), (1, 4)]),
+        pytest.param("max(1,-x)", [('max', 0), ('(', 3), (1, 4), (',', 5), ('~', 6), (Variable('x'), 7), (')', 8)]),
     ]
 )
 def test_tokenizer_success(expression, expected):
@@ -37,3 +42,18 @@ def test_tokenizer_exceptions(expression, expected):
     with pytest.raises(ParsingError) as e_info:
         tokenizer.parse_tokens(expression)
     assert str(e_info.value) == expected
+
+def test_tokenizer_opcodes():
+    tokens = Tokenizer().parse_tokens("sqrt(x) + 1")
+    assert [tok.opcode is not None for tok in tokens] == [True, False, False, False, True, False]
+    assert tokens[0].opcode == DEFAULT_REGISTRY.opcodes['sqrt']
+    assert tokens[4].opcode == DEFAULT_REGISTRY.opcodes['+']
+
+def test_scan():
+    assert list(scan(" 1.5.2 +x & ")) == [
+        Lexeme(1, '1.5', '', '', '', 4),
+        Lexeme(4, '.2', '', '', '', None),
+        Lexeme(7, '', '+', '', '', None),
+        Lexeme(8, '', '', 'x', '', None),
+        Lexeme(10, '', '', '', '&', None),
+    ]
@@ -0,0 +1,81 @@
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+from calculator_functions.validation import Diagnostic, Validator
+
+
+@pytest.mark.parametrize(
+    'expression',
+    (
+        pytest.param('1 + 2 * 3', id='operators'),
+        pytest.param('-(4 - x) ** 2 // 3 % 5', id='unary and variables'),
+        pytest.param('max(1, sqrt(4)) - min(-1, +2)', id='functions'),
+        pytest.param('10 / 0', id='values are not checked'),
+    )
+)
+def test_valid(expression):
+    assert Calculator().validate(expression) == []
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    (
+        pytest.param('', [(0, 'Invalid expression', 'Empty expression')], id='empty'),
+        pytest.param('1 & 2', [(2, 'Unknown symbol', '&')], id='unknown symbol'),
+        pytest.param('1.2.3 + 4', [(3, 'Invalid number format', 'Invalid number format')], id='number format'),
+        pytest.param('12345678901', [(0, 'Invalid number format', 'Number has more than 10 digits')], id='long number'),
+        pytest.param('1 * -2', [(4, 'Parsing', "Incorrect operator sequence '*' followed by '-'")], id='sequence'),
+        pytest.param('(1 + 2', [(0, 'Unbalanced brackets', '(')], id='open bracket'),
+        pytest.param('1 + 2)', [(5, 'Unbalanced brackets', ')')], id='close bracket'),
+        pytest.param('sqrt 4', [(0, 'Invalid function call', 'sqrt'), (None, 'Invalid expression', 'Too many operands')],
+                     id='call without brackets'),
+        pytest.param('(1, 2)', [(2, 'Invalid function call', ',')], id='comma'),
+        pytest.param('max(1)', [(0, 'Invalid number of arguments', 'max')], id='arguments'),
+        pytest.param('1 +', [(2, 'Calculation', 'Not enough operands for a binary operator +')], id='operand'),
+        pytest.param('1 2', [(None, 'Invalid expression', 'Too many operands')], id='too many operands'),
+    )
+)
+def test_single_error(expression, expected):
+    assert Calculator().validate(expression) == expected
+
+
+def test_all_errors_in_one_pass():
+    diagnostics = Calculator().validate('(1 & 2 + max(3) * 4.5. + y ))')
+    assert diagnostics == [
+        (3, 'Unknown symbol', '&'),
+        (21, 'Invalid number format', 'Invalid number format'),
+        (9, 'Invalid number of arguments', 'max'),
+        (28, 'Unbalanced brackets', ')'),
+    ]
+    assert all(isinstance(diagnostic, Diagnostic) for diagnostic in diagnostics)
+
+
+def test_unknown_variables():
+    calculator = Calculator()
+    assert calculator.validate('x + y * z') == []
+    assert calculator.validate('x + y * z', ['x', 'z']) == [(4, 'Unknown variable', 'y')]
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ('', '1 & 2', '1.2.3', '2 ** -1', '((1)', '1 + 2)', 'sqrt + 1', 'max(1, 2, 3)', 'min(1,)',
+     '* 2', '(1)(2)', '()', '1 + x ^ (', 'max(1, 2', '-', '1, 2', 'y + x')
+)
+def test_first_diagnostic_is_the_error_of_calculate(expression):
+    calculator = Calculator()
+    diagnostics = calculator.validate(expression, ['x'])
+    with pytest.raises(ParsingError) as error:
+        calculator.calculate(expression, {'x': 1})
+    assert str(error.value) == str(diagnostics[0])
+    assert diagnostics[0].to_error().error_type == error.value.error_type
+
+
+def test_check_many():
+    calculator = Calculator(functions={'twice': (lambda x: 2 * x, 1)})
+    results = calculator.check_many(['twice(x)', 'twice(1, 2)', 'y'], ['x'])
+    assert results == [[], [(0, 'Invalid number of arguments', 'twice')], [(0, 'Unknown variable', 'y')]]
+
+
+def test_validator_limits():
+    assert Validator(max_length=3).validate('1234') == [(0, 'Invalid number format', 'Number has more than 3 digits')]
+    assert Calculator(backend='fraction').validate('1234567890123') == []
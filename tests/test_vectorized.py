@@ -0,0 +1,62 @@
+import pytest
+from calculator_functions.calculator import Calculator
+from calculator_functions.errors import ParsingError
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize(
+    ('expression', 'variables'),
+    (
+        pytest.param('x + y * 2', {'x': [1, 2, 3], 'y': [4, 5, 6]}),
+        pytest.param('-x ** 2 - y', {'x': [1, -2, 3], 'y': [0.5, 1.5, 2.5]}),
+        pytest.param('x / y', {'x': [1, 7, 9], 'y': [2, 2, 3]}),
+        pytest.param('x // y + x % y', {'x': [7, -7, 9], 'y': [2, 2, -4]}),
+        pytest.param('x ** y', {'x': [2, 3, 4], 'y': [-1, 0, 3]}),
+        pytest.param('x ** 0.5', {'x': [4.0, 9.0, 2.0]}),
+        pytest.param('(x + 1) * 3.5', {'x': [0.1, 0.2, 0.3]}),
+        pytest.param('sqrt(x) + max(x, y) - min(1, y)', {'x': [4, 9, 2], 'y': [5, -1, 2.5]}),
+    )
+)
+def test_vectorized_matches_scalar(expression, variables):
+    calculator = Calculator()
+    result = calculator.calculate_vectorized(expression, variables)
+    for i in range(len(result)):
+        row = {name: values[i] for name, values in variables.items()}
+        assert result[i] == pytest.approx(calculator.calculate(expression, row))
+
+
+@pytest.mark.parametrize(
+    ('expression', 'variables', 'expected_exception'),
+    (
+        pytest.param('x / y', {'x': [1, 2], 'y': [1, 0]}, 'Calculation error: Division by zero at position 0'),
+        pytest.param('x // y', {'x': [1.5, 2], 'y': [1, 1]}, 'Calculation error: Operator // requires integers at position 0'),
+        pytest.param('x % y', {'x': [1, 2], 'y': [0, 1]}, 'Calculation error: Division by zero at position 0'),
+        pytest.param('x ** 0.5', {'x': [4.0, -1.0]}, 'Calculation error: Negative number under the root at position 0'),
+        pytest.param('2 ** x', {'x': [1, 1000]}, 'Calculation error: Too high a power to be raised at position 0'),
+        pytest.param('x ** 99', {'x': [1, 10]},
+                     'Calculation error: Integer overflow in vectorized evaluation at position 0'),
+        pytest.param('x ** 999', {'x': [1.5, 10.5]}, 'Calculation error: Too large a number at position 0'),
+        pytest.param('x ** (0 - 999)', {'x': [2, 0.01]}, 'Calculation error: Too large a number at position 0'),
+        pytest.param('x + z', {'x': [1, 2]}, 'Unknown variable error: z at position 4'),
+        pytest.param('sqrt(x)', {'x': [4, -1]}, 'Calculation error: Negative number under the root at position 0'),
+    )
+)
+def test_vectorized_exceptions(expression, variables, expected_exception):
+    calculator = Calculator()
+    with pytest.raises(ParsingError) as e_info:
+        calculator.calculate_vectorized(expression, variables)
+    assert str(e_info.value) == expected_exception
+
+
+def test_vectorized_mask_mode():
+    calculator = Calculator()
+    result = calculator.calculate_vectorized('x / y + 1', {'x': [1, 2, 3], 'y': [1, 0, 3]}, errors='mask')
+    assert list(result.mask) == [False, True, False]
+    assert list(result.compressed()) == [2.0, 2.0]
+
+
+def test_vectorized_mask_mode_power_overflow():
+    calculator = Calculator()
+    result = calculator.calculate_vectorized('x ** 999', {'x': [1.5, 10.5, -0.5]}, errors='mask')
+    assert list(result.mask) == [False, True, False]